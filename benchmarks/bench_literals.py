@@ -0,0 +1,78 @@
+"""
+Micro‑benchmark: literal handling on the GraphDB query path.
+
+Compares the original regex ``lowercase_literals`` with the
+Cypher‑aware ``lowercase_literals`` and ``parameterize_literals`` in
+``my_doctor_assistant.utils.helper``, and shows how many distinct query
+texts (i.e. Neo4j plans) a batch of per‑patient queries turns into.
+
+Run with:
+    python benchmarks/bench_literals.py [--number 20000]
+"""
+
+import argparse
+import functools
+import re
+import timeit
+
+from my_doctor_assistant.utils.helper import lowercase_literals, parameterize_literals
+
+
+def regex_lowercase_literals(query: str) -> str:
+    """The pre‑tokenizer implementation, kept here for comparison."""
+    return re.sub(r"['\"]([^'\"]*)['\"]", lambda m: f"'{m.group(1).lower()}'", query)
+
+
+QUERIES = {
+    "short": "MATCH (p:Patient {patient_id: 42}) RETURN p.patient_name",
+    "typical": (
+        "MATCH (p:Patient {patient_id: 1093})-[:HAS_MEASUREMENT]->(:VitalSignsRecord)"
+        "-[:HAS_BLOOD_PRESSURE]->(bp) WHERE bp.bp_recorded_date_time CONTAINS '2023-12' "
+        "RETURN MAX(toInteger(bp.bp_systolic)) AS maxSys"
+    ),
+    "escaped": (
+        "MATCH (hp:HealthcareProvider) WHERE toLower(hp.provider_full_name) "
+        "CONTAINS 'O\\'Brien' // provider lookup\n"
+        "MATCH (hp)-[:ADDED_REPORT]->(r) WHERE r.report_date STARTS WITH '2024' "
+        "RETURN r.report_id, r.report_value LIMIT 25"
+    ),
+    "long": " UNION ALL ".join(
+        f"MATCH (p:Patient {{patient_id: {pid}}})-[:HAS_PRESCRIPTION]->(rx) "
+        f"WHERE toLower(rx.prescription_status) = 'Active' RETURN rx.prescription_id AS id"
+        for pid in range(20)
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args()
+
+    funcs = {
+        "old lowercase": regex_lowercase_literals,
+        "new lowercase": lowercase_literals,
+        "parameterize": parameterize_literals,
+    }
+    print(f"{'query':<10}{'chars':>7}" + "".join(f"{name:>18}" for name in funcs) + "   (µs/call)")
+    for label, query in QUERIES.items():
+        row = f"{label:<10}{len(query):>7}"
+        for fn in funcs.values():
+            seconds = min(timeit.repeat(functools.partial(fn, query), number=args.number, repeat=3))
+            row += f"{seconds / args.number * 1e6:>18.2f}"
+        print(row)
+
+    print("\nescaped quote handling")
+    print("  old:", regex_lowercase_literals(QUERIES["escaped"]).splitlines()[0])
+    print("  new:", lowercase_literals(QUERIES["escaped"]).splitlines()[0])
+
+    template = QUERIES["typical"]
+    batch = [template.replace("1093", str(pid)).replace("2023-12", f"2023-{m:02d}")
+             for pid in range(100) for m in range(1, 13)]
+    print(f"\ndistinct query texts for {len(batch)} per-patient queries")
+    print("  old lowercase:  ", len({regex_lowercase_literals(q) for q in batch}))
+    print("  parameterize:   ", len({parameterize_literals(q)[0] for q in batch}))
+
+
+if __name__ == "__main__":
+    main()
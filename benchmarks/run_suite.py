@@ -0,0 +1,296 @@
+"""
+Component benchmark suite: hot paths timed offline, results as JSON.
+
+Runs without network or API keys: GraphDB queries hit an in‑memory Neo4j
+stand‑in (``standins.py``), MCP round trips go to a real stdio / SSE server
+subprocess backed by that stand‑in, and the agent step uses a scripted chat
+model.  Save one run per commit and compare them to spot regressions.
+
+Run with:
+    python benchmarks/run_suite.py -o before.json
+    python benchmarks/run_suite.py -o after.json --compare before.json
+    python benchmarks/run_suite.py --compare before.json --against after.json
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import standins  # noqa: E402
+from bench_literals import QUERIES  # noqa: E402
+
+standins.install()
+
+from my_doctor_assistant.utils.helper import (  # noqa: E402
+    lowercase_literals,
+    parameterize_literals,
+    percentile,
+)
+
+warnings.filterwarnings("ignore", message="LangChain agents")  # initialize_agent deprecation
+
+# (name, fn, calls per sample); a group's ``finally`` releases its fixtures
+Benchmark = tuple[str, Callable[[], Any], int]
+
+
+# ── benchmark groups ──────────────────────────────────────────────────
+def literals(quick: bool) -> Iterator[Benchmark]:
+    for label, query in QUERIES.items():
+        yield f"literals.lowercase.{label}", lambda q=query: lowercase_literals(q), 2000
+        yield f"literals.parameterize.{label}", lambda q=query: parameterize_literals(q), 2000
+
+
+def agent_prompting(quick: bool) -> Iterator[Benchmark]:
+    from langchain.agents import StructuredChatAgent
+    from langchain.agents.structured_chat.output_parser import StructuredChatOutputParser
+
+    from my_doctor_assistant.mcp.stdio import testagentMCPstdio as agent
+
+    parser = StructuredChatOutputParser()
+    yield "parser.parse.action", lambda: parser.parse(standins.ACTION), 2000
+    yield "parser.parse.final_answer", lambda: parser.parse(standins.FINAL), 2000
+
+    tools = [
+        *agent.make_fast_path_tools(),
+        agent.make_prepared_tool(),
+        agent.make_graph_tool(),
+        *agent.make_paged_tools(),
+        agent.make_batch_tool(),
+    ]
+    yield "agent.create_prompt", lambda: StructuredChatAgent.create_prompt(tools), 50
+
+
+def serialization(quick: bool) -> Iterator[Benchmark]:
+    from my_doctor_assistant.mcp.tools.graphdb import _execute
+
+    for rows in (10, 100, 1000):
+        query = f"MATCH (p:Patient) RETURN p LIMIT {rows}"
+        yield f"graphdb.execute.rows_{rows}", lambda q=query: _execute(q), max(1, 2000 // rows)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def _server_env(**extra: str) -> dict[str, str]:
+    path = os.pathsep.join(p for p in (os.environ.get("PYTHONPATH"), HERE) if p)
+    return {**os.environ, "PYTHONPATH": path, **extra}
+
+
+def mcp_round_trips(quick: bool) -> Iterator[Benchmark]:
+    from mcp import StdioServerParameters
+    from mcp.client.sse import sse_client
+    from mcp.client.stdio import stdio_client
+
+    from my_doctor_assistant.mcp.session import MCPSessionManager, first_text
+    from my_doctor_assistant.mcp.stdio import testagentMCPstdio as agent
+
+    for noisy in ("httpx", "mcp.client"):  # a log line per SSE post
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+    server = os.path.join(HERE, "standin_server.py")
+    params = StdioServerParameters(
+        command=sys.executable, args=[server, "stdio"], env=_server_env()
+    )
+    quiet = open(os.devnull, "w")  # the server logs every request to stderr
+    stdio = MCPSessionManager(
+        lambda: stdio_client(params, errlog=quiet), name="bench-stdio"
+    ).start()
+    agent._session = stdio  # the agent step below talks to the stand‑in too
+
+    port, sse = _free_port(), None
+    proc = subprocess.Popen(
+        [sys.executable, server, "sse"],
+        env=_server_env(MCP_HOST="127.0.0.1", MCP_PORT=str(port)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port)
+        sse = MCPSessionManager(lambda: sse_client(f"http://127.0.0.1:{port}/sse"), name="bench-sse")
+        sse.start()
+        for transport, session in (("stdio", stdio), ("sse", sse)):
+            for rows in (1, 100):
+                args = {"query": f"MATCH (p:Patient) RETURN p LIMIT {rows}"}
+                yield (
+                    f"mcp.{transport}.graphdb.rows_{rows}",
+                    lambda s=session, a=args: first_text(s.call_tool(agent.TOOL_NAME, a)),
+                    1,
+                )
+
+        from langchain.agents import AgentType, initialize_agent
+
+        executor = initialize_agent(
+            tools=[agent.make_graph_tool()],
+            llm=standins.fake_chat_model(),
+            agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=False,
+        )
+        yield "agent.step.stdio", lambda: executor.invoke({"input": "max systolic?"}), 1
+        yield (
+            "agent.step.stdio.async",
+            lambda: asyncio.run(executor.ainvoke({"input": "max systolic?"})),
+            1,
+        )
+    finally:
+        if sse is not None:
+            sse.close()
+        stdio.close()
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:  # uvicorn waits for open SSE streams
+            proc.kill()
+        quiet.close()
+
+
+GROUPS = [literals, agent_prompting, serialization, mcp_round_trips]
+
+
+# ── measurement ───────────────────────────────────────────────────────
+def measure(fn: Callable[[], Any], number: int, samples: int) -> list[float]:
+    """Per‑call seconds for *samples* batches of *number* calls each."""
+    for _ in range(10):
+        fn()  # warm caches, imports and connections
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return times
+
+
+def summarize(times: list[float], number: int) -> dict[str, Any]:
+    us = [t * 1e6 for t in times]
+    return {
+        "unit": "us",
+        "min": round(min(us), 3),
+        "median": round(statistics.median(us), 3),
+        "p95": round(percentile(us, 95), 3),
+        "mean": round(statistics.fmean(us), 3),
+        "samples": len(us),
+        "calls_per_sample": number,
+    }
+
+
+def run(patterns: list[str], quick: bool) -> dict[str, dict[str, Any]]:
+    results = {}
+    for group in GROUPS:
+        for name, fn, number in group(quick):
+            if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            if number == 1:  # round trips: one sample per call, for the tail
+                samples = 20 if quick else 200
+            else:
+                number, samples = (max(2, number // 10), 5) if quick else (number, 15)
+            results[name] = r = summarize(measure(fn, number, samples), number)
+            print(f"{name:<42}{r['median']:>12.1f}{r['p95']:>12.1f}   µs (median, p95)", flush=True)
+    return results
+
+
+def metadata(quick: bool) -> dict[str, Any]:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=HERE, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+    }
+
+
+# ── comparison ────────────────────────────────────────────────────────
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print median ratios; return how many benchmarks slowed past *threshold* %."""
+    base, cur = baseline["results"], current["results"]
+    print(
+        f"\n{'benchmark':<42}{'base µs':>12}{'now µs':>12}{'change':>9}"
+        f"   ({baseline['meta']['commit'][:8] or '?'} → {current['meta']['commit'][:8] or '?'})"
+    )
+    regressions = 0
+    for name in sorted(base.keys() | cur.keys()):
+        if name not in base or name not in cur:
+            print(f"{name:<42}{'only in ' + ('baseline' if name in base else 'current'):>33}")
+            continue
+        before, after = base[name]["median"], cur[name]["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        mark = ""
+        if change > threshold:
+            mark, regressions = "  ▲ slower", regressions + 1
+        elif change < -threshold:
+            mark = "  ▼ faster"
+        print(f"{name:<42}{before:>12.1f}{after:>12.1f}{change:>+8.1f}%{mark}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "-k", "--filter", action="append", default=[], metavar="GLOB",
+        help="only run benchmarks matching GLOB (repeatable), e.g. 'mcp.*'",
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer samples, for a smoke run")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier JSON run")
+    parser.add_argument("--against", metavar="CURRENT", help="with --compare: compare two saved runs, run nothing")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0,
+        help="median slowdown in %% reported as a regression (default 10)",
+    )
+    args = parser.parse_args()
+
+    if args.against:
+        if not args.compare:
+            parser.error("--against needs --compare")
+        with open(args.compare) as fh, open(args.against) as gh:
+            sys.exit(1 if compare(json.load(fh), json.load(gh), args.threshold) else 0)
+
+    report = {"meta": metadata(args.quick), "results": run(args.filter, args.quick)}
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    if args.compare:
+        with open(args.compare) as fh:
+            sys.exit(1 if compare(json.load(fh), report, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
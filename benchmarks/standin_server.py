@@ -0,0 +1,20 @@
+"""
+Run the MCP server against the Neo4j stand‑in, for round‑trip benchmarks.
+
+Run with:
+    python benchmarks/standin_server.py stdio
+    MCP_PORT=18080 python benchmarks/standin_server.py sse
+"""
+
+import sys
+
+from standins import install
+
+install()
+
+if sys.argv[1:] == ["sse"]:
+    from my_doctor_assistant.mcp.sse.server.medical_graph_server import main
+else:
+    from my_doctor_assistant.mcp.stdio.server.medical_graph_server import main
+
+main()
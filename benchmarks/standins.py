@@ -0,0 +1,110 @@
+"""
+Offline stand‑ins for the benchmark suite: a Neo4j driver that serves
+synthetic rows from memory and a scripted chat model.
+
+``install()`` puts the fake graph behind ``Neo4jDBConnection`` so the real
+GraphDB code path (executor, payload rendering, MCP tools) runs unchanged
+with no database.  A query returns as many rows as its ``LIMIT`` asks for
+(inline or as a parameter), one row otherwise.
+"""
+
+import os
+import re
+from typing import Any
+
+_LIMIT = re.compile(r"\bLIMIT\s+(\d+|\$\w+)", re.IGNORECASE)
+
+
+class FakeRecord:
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def keys(self) -> list[str]:
+        return list(self._data)
+
+    def values(self) -> list[Any]:
+        return list(self._data.values())
+
+    def data(self) -> dict[str, Any]:
+        return dict(self._data)
+
+
+class FakeResult:
+    def __init__(self, rows: int) -> None:
+        self._rows = rows
+
+    def keys(self) -> list[str]:
+        return ["patient_id", "patient_name", "bp_systolic", "bp_diastolic", "recorded_at"]
+
+    def __iter__(self):
+        for i in range(self._rows):
+            yield FakeRecord(
+                {
+                    "patient_id": 1000 + i,
+                    "patient_name": f"patient {i:05d}",
+                    "bp_systolic": 110 + i % 50,
+                    "bp_diastolic": 70 + i % 25,
+                    "recorded_at": f"2023-12-{1 + i % 28:02d}T08:{i % 60:02d}:00",
+                }
+            )
+
+    def consume(self) -> None:
+        return None
+
+
+def rows_for(query: str, params: dict | None) -> int:
+    m = _LIMIT.search(query)
+    if not m:
+        return 1
+    limit = m.group(1)
+    if limit.startswith("$"):
+        return int((params or {}).get(limit[1:], 1))
+    return int(limit)
+
+
+class FakeSession:
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def run(self, query: Any, parameters: dict | None = None, **kwargs: Any) -> FakeResult:
+        text = getattr(query, "text", query)  # neo4j.Query or plain string
+        return FakeResult(rows_for(text, {**(parameters or {}), **kwargs}))
+
+
+class FakeDriver:
+    def session(self, **kwargs: Any) -> FakeSession:
+        return FakeSession()
+
+    def close(self) -> None:
+        return None
+
+
+def install() -> None:
+    """Serve every GraphDB query from the stand‑in, uncached and unchecked."""
+    # before the cache / admission singletons read them
+    os.environ["GRAPHDB_CACHE_TTL"] = "0"
+    os.environ["GRAPHDB_ADMISSION_CONTROL"] = "false"
+    from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+
+    Neo4jDBConnection._shared_driver = FakeDriver()
+
+
+ACTION = (
+    "Action:\n```\n"
+    '{"action": "GraphDB", "action_input": '
+    '{"query": "MATCH (p:Patient {patient_id: 1093}) RETURN p LIMIT 5"}}\n'
+    "```"
+)
+FINAL = 'Action:\n```\n{"action": "Final Answer", "action_input": "Systolic peaked at 142."}\n```'
+
+
+def fake_chat_model():
+    """A chat model that asks for one GraphDB call, then answers – forever."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    return FakeListChatModel(responses=[ACTION, FINAL])
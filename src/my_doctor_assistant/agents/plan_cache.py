@@ -0,0 +1,393 @@
+"""
+Question‑to‑plan cache: reuse the tool calls the agent worked out, not
+its answers.
+
+Most of an answer's cost is the ReAct loop deciding which Cypher to run;
+the data itself must always be fresh.  After a successful answer the
+tool calls the agent made are stored under the question's *template* –
+the question with every entity (a word outside the clinical vocabulary:
+names, ids, dates, numbers) replaced by a slot::
+
+    "latest BP for Siri"  ->  "latest blood pressure <e0>"   e0 = "siri"
+
+Inside the stored calls the entity values become slots too, and ids the
+agent copied from an earlier result (``resolve_person`` → ``patient_id``)
+become references to that result.  A later question with the same
+template ("latest bp for john") replays the calls with the new entities
+against the live database and has the LLM word the answer from the
+fresh results in one call, skipping the ReAct loop.  A failing call, an
+unresolved reference or an empty final result falls back to the full
+agent, and so does a reference into a result with more than one row:
+several ``resolve_person`` candidates are the agent's to weigh (and
+perhaps ask about), not the replay's.
+
+A plan is only stored when every entity of the question occurs in it –
+otherwise it would silently answer for the original entity – and when
+none of its calls wrote to the graph or used a cursor.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from my_doctor_assistant.agents.semantic_cache import (
+    Dependency,
+    default_vocabulary,
+    is_stopword,
+    record_tool_call,
+    tokenize,
+    words,
+)
+from my_doctor_assistant.utils.helper import (
+    get_plan_cache_max_entries,
+    get_plan_cache_max_steps,
+    get_plan_cache_ttl,
+)
+
+ANSWER_FROM_RESULTS_PROMPT = """\
+You are a medical assistant. Answer the clinician's question using only the
+tool results below; they were just read from the patient database.
+If the results are empty, say that no matching records were found.
+Return only the final answer (plain text or a small table).
+
+Question: {question}
+
+Tool results:
+{results}
+"""
+
+# Entity values only ever contain [a-z0-9] and -./: (see ``words``), so
+# substituting them into Cypher text cannot break out of a string literal.
+_SLOT = re.compile(r"<<e(\d+)>>")
+_NUM_SLOT = re.compile(r"^<<e(\d+):num>>$")
+_REF = re.compile(r"^<<ref:(\d+):([^>]+)>>$")
+_ID_COLUMN = re.compile(r"(^|[._])id$", re.IGNORECASE)
+_MAX_RESULT_CHARS = 8000
+
+
+class PlanReplayError(Exception):
+    """
+    A cached plan could not be replayed for the new entities.  ``stale``
+    marks a failing tool call, after which the plan is dropped; a missing
+    reference (say, an unknown name) only falls back for this question.
+    """
+
+    def __init__(self, message: str, stale: bool = False) -> None:
+        super().__init__(message)
+        self.stale = stale
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    tool: str
+    args: str  # JSON with <<eN>>, <<eN:num>> and <<ref:step:column>> markers
+
+
+@dataclass
+class _Plan:
+    steps: tuple[PlanStep, ...]
+    expires_at: float
+
+
+def template(question: str, vocabulary: frozenset[str]) -> tuple[str, list[str]]:
+    """
+    ``("latest blood pressure <e0>", ["siri"])`` for "What's the latest BP for Siri?".
+    Repeated entities share a slot; stopwords are dropped.
+    """
+    parts: list[str] = []
+    values: list[str] = []
+    for word in words(question):
+        tokens = tokenize(word)
+        if all(t in vocabulary for t in tokens):
+            parts.extend(t for t in tokens if not is_stopword(t))
+            continue
+        if word not in values:
+            values.append(word)
+        parts.append(f"<e{values.index(word)}>")
+    return " ".join(parts), values
+
+
+def _rows(result: str) -> tuple[list[str], list[list[Any]]] | None:
+    """Column names and rows of a GraphDB payload, or ``None`` for anything else."""
+    try:
+        payload = json.loads(result)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or "rows" not in payload:
+        return None
+    columns = [c["name"] if isinstance(c, dict) else str(c) for c in payload.get("columns", [])]
+    return columns, payload["rows"]
+
+
+def _first_row_ids(step: int, result: str) -> dict[Any, str]:
+    """Id‑like values of the first result row → ``<<ref:step:column>>``."""
+    parsed = _rows(result)
+    if not parsed or not parsed[1]:
+        return {}
+    columns, rows = parsed
+    return {
+        value: f"<<ref:{step}:{column}>>"
+        for column, value in zip(columns, rows[0])
+        if _ID_COLUMN.search(column) and isinstance(value, (int, str)) and not isinstance(value, bool)
+    }
+
+
+def _generalize(value: Any, values: list[str], refs: dict[Any, str], used: set[int]) -> Any:
+    if isinstance(value, dict):
+        return {k: _generalize(v, values, refs, used) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_generalize(v, values, refs, used) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        for i, entity in enumerate(values):
+            if entity == str(value):
+                used.add(i)
+                return f"<<e{i}:num>>"
+        return refs.get(value, value)
+    if isinstance(value, str):
+        if value in refs:
+            return refs[value]
+        for i, entity in enumerate(values):
+            pattern = rf"(?<![\w.-]){re.escape(entity)}(?![\w-])"
+            value, n = re.subn(pattern, f"<<e{i}>>", value, flags=re.IGNORECASE)
+            if n:
+                used.add(i)
+        return value
+    return value
+
+
+def _bind(value: Any, values: list[str], results: list[str]) -> Any:
+    if isinstance(value, dict):
+        return {k: _bind(v, values, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_bind(v, values, results) for v in value]
+    if not isinstance(value, str):
+        return value
+    m = _NUM_SLOT.match(value)
+    if m:
+        entity = values[int(m.group(1))]
+        try:
+            return float(entity) if "." in entity else int(entity)
+        except ValueError:
+            raise PlanReplayError(f"{entity!r} is not a number") from None
+    m = _REF.match(value)
+    if m:
+        step, column = int(m.group(1)), m.group(2)
+        parsed = _rows(results[step])
+        if not parsed or not parsed[1] or column not in parsed[0]:
+            raise PlanReplayError(f"step {step} returned no {column!r}")
+        if len(parsed[1]) > 1:
+            raise PlanReplayError(f"step {step} returned {len(parsed[1])} candidates for {column!r}")
+        return parsed[1][0][parsed[0].index(column)]
+    return _SLOT.sub(lambda m: values[int(m.group(1))], value)
+
+
+def _checked(result: str) -> str:
+    if result.lstrip().startswith('{"error"'):
+        raise PlanReplayError(result, stale=True)
+    return result
+
+
+class QueryPlanCache:
+    """LRU of question templates → tool‑call plans."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        max_steps: int = 6,
+        vocabulary: frozenset[str] | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_steps = max_steps
+        self._vocabulary = vocabulary
+        self._plans: OrderedDict[tuple[str, str], _Plan] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "fallbacks", "stores", "skipped", "evictions"), 0
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @property
+    def vocabulary(self) -> frozenset[str]:
+        if self._vocabulary is None:
+            self._vocabulary = default_vocabulary()
+        return self._vocabulary
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    # ── storing ───────────────────────────────────────────────────────
+    def store(self, question: str, calls: Iterable[Dependency], scope: str = "") -> bool:
+        """
+        Remember the successful calls behind an answer to *question*.
+        Returns ``False`` when they cannot be generalised safely.
+        """
+        if not self.enabled:
+            return False
+        key, values = template(question, self.vocabulary)
+        calls = list(calls)
+        if not calls or not all(c.cacheable or c.result.lstrip().startswith('{"error"') for c in calls):
+            self._count("skipped")  # a write or a cursor – never replay
+            return False
+        # calls that failed were the agent's detours; the plan keeps the rest
+        calls = [c for c in calls if c.cacheable][-self.max_steps :]
+        steps: list[PlanStep] = []
+        refs: dict[Any, str] = {}
+        used: set[int] = set()
+        for i, call in enumerate(calls):
+            args = _generalize(json.loads(call.args), values, refs, used)
+            steps.append(PlanStep(call.tool, json.dumps(args, sort_keys=True)))
+            for value, marker in _first_row_ids(i, call.result).items():
+                refs.setdefault(value, marker)
+        if not steps or len(used) != len(values):
+            self._count("skipped")  # an entity the plan does not carry
+            return False
+        with self._lock:
+            self._plans[(scope, key)] = _Plan(tuple(steps), time.monotonic() + self.ttl)
+            self._plans.move_to_end((scope, key))
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+                self._counters["evictions"] += 1
+            self._counters["stores"] += 1
+        return True
+
+    # ── replaying ─────────────────────────────────────────────────────
+    def _get(self, scope: str, key: str) -> _Plan | None:
+        with self._lock:
+            plan = self._plans.get((scope, key))
+            if plan is not None and plan.expires_at <= time.monotonic():
+                del self._plans[(scope, key)]
+                plan = None
+            if plan is None:
+                self._counters["misses"] += 1
+                return None
+            self._plans.move_to_end((scope, key))
+            return plan
+
+    def _drop(self, scope: str, key: str, plan: _Plan) -> None:
+        with self._lock:
+            if self._plans.get((scope, key)) is plan:
+                del self._plans[(scope, key)]
+
+    def execute(
+        self,
+        question: str,
+        call: Callable[[str, dict[str, Any]], str],
+        phrase: Callable[[str], str],
+        scope: str = "",
+    ) -> str | None:
+        """
+        Answer *question* from a cached plan, or return ``None`` so the
+        caller runs the full agent.  *call* runs one tool and returns its
+        text; *phrase* turns the prompt built from the fresh results into
+        the final answer.
+        """
+        found = self._lookup(question, scope)
+        if found is None:
+            return None
+        key, values, plan = found
+        bound: list[dict[str, Any]] = []
+        results: list[str] = []
+        try:
+            for step in plan.steps:
+                args = _bind(json.loads(step.args), values, results)
+                results.append(_checked(call(step.tool, args)))
+                bound.append(args)
+        except PlanReplayError as exc:
+            return self._fail(scope, key, plan, exc)
+        prompt = self._finish(question, plan, bound, results)
+        return None if prompt is None else phrase(prompt)
+
+    async def aexecute(
+        self,
+        question: str,
+        call: Callable[[str, dict[str, Any]], Awaitable[str]],
+        phrase: Callable[[str], Awaitable[str]],
+        scope: str = "",
+    ) -> str | None:
+        """:meth:`execute` with an async *call* and *phrase*."""
+        found = self._lookup(question, scope)
+        if found is None:
+            return None
+        key, values, plan = found
+        bound: list[dict[str, Any]] = []
+        results: list[str] = []
+        try:
+            for step in plan.steps:  # sequential: later steps may reference earlier results
+                args = _bind(json.loads(step.args), values, results)
+                results.append(_checked(await call(step.tool, args)))
+                bound.append(args)
+        except PlanReplayError as exc:
+            return self._fail(scope, key, plan, exc)
+        prompt = self._finish(question, plan, bound, results)
+        return None if prompt is None else await phrase(prompt)
+
+    def _lookup(self, question: str, scope: str) -> tuple[str, list[str], _Plan] | None:
+        if not self.enabled:
+            return None
+        key, values = template(question, self.vocabulary)
+        plan = self._get(scope, key)
+        return None if plan is None else (key, values, plan)
+
+    def _fail(self, scope: str, key: str, plan: _Plan, exc: PlanReplayError) -> None:
+        if exc.stale:
+            self._drop(scope, key, plan)  # e.g. the schema or a tool moved on
+        self._count("fallbacks")
+        return None
+
+    def _finish(
+        self, question: str, plan: _Plan, bound: list[dict[str, Any]], results: list[str]
+    ) -> str | None:
+        """Record the replayed calls and build the answer prompt; ``None`` if nothing was found."""
+        final = _rows(results[-1])
+        if final is not None and not final[1]:
+            self._count("fallbacks")  # nothing found – let the agent look harder
+            return None
+        for step, args, result in zip(plan.steps, bound, results):
+            record_tool_call(step.tool, args, result)
+        self._count("hits")
+        listing = "\n\n".join(
+            f"{step.tool}({json.dumps(args)}) ->\n{result[:_MAX_RESULT_CHARS]}"
+            for step, args, result in zip(plan.steps, bound, results)
+        )
+        return ANSWER_FROM_RESULTS_PROMPT.format(question=question, results=listing)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"] + self._counters["fallbacks"]
+            return {
+                "ttl_seconds": self.ttl,
+                "max_entries": self.max_entries,
+                "entries": len(self._plans),
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache: QueryPlanCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> QueryPlanCache:
+    """Return the process‑wide plan cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryPlanCache(
+                    ttl=get_plan_cache_ttl(),
+                    max_entries=get_plan_cache_max_entries(),
+                    max_steps=get_plan_cache_max_steps(),
+                )
+    return _cache
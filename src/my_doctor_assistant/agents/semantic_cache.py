@@ -0,0 +1,460 @@
+"""
+Semantic answer cache in front of ``MedicalQAAgent.answer``.
+
+Clinicians ask the same thing in many words ("what's the latest BP for
+Siri", "latest blood pressure for siri"); each phrasing costs several LLM calls.
+Questions are embedded locally with a hashing embedder (no model, no
+network) and answers are reused when a cached question is close enough
+by cosine similarity – searched with one matrix product over every entry.
+
+Two guards keep a paraphrase from returning someone else's answer:
+
+* **Entities.**  Words that are not part of the clinical vocabulary
+  (names, ids, dates, numbers) must be identical, so "latest BP for siri"
+  never matches "latest BP for john" however similar the vectors are.
+  So must possessives with the noun they own ("siri's doctor" is not
+  siri), negations ("not", "without", ...) and measurement qualifiers
+  ("systolic", "diastolic", "highest", ...), which change the answer
+  while barely moving the vector.
+* **Dependencies.**  While an answer is produced every tool call is
+  recorded as (tool, arguments, digest of the result).  On a hit the calls
+  are replayed and the entry is dropped if any result changed, so an
+  answer expires as soon as the data behind it does.  Answers that used
+  writes, cursors or failed calls are never stored.
+
+The cache is opt‑in (``SEMANTIC_CACHE_ENABLED``) and bounded by entry
+count and TTL; the least recently used entry is evicted first.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+
+import numpy as np
+
+from my_doctor_assistant.utils.helper import (
+    get_semantic_cache_max_entries,
+    get_semantic_cache_revalidate,
+    get_semantic_cache_threshold,
+    get_semantic_cache_ttl,
+)
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-./:][a-z0-9]+)*")
+_CAMEL = re.compile(r"([a-z])([A-Z])")
+_DIGIT = re.compile(r"\d")
+_POSSESSIVE = re.compile(r"([a-z0-9]+)'s\b")
+
+_SYNONYMS = {
+    "bp": ("blood", "pressure"),
+    "hr": ("heart", "rate"),
+    "meds": ("medication",),
+    "med": ("medication",),
+    "rx": ("prescription",),
+    "appt": ("appointment",),
+    "dr": ("doctor",),
+    "labs": ("lab",),
+    "newest": ("latest",),
+    "recent": ("latest",),
+    "last": ("latest",),
+    "earliest": ("first",),
+    "oldest": ("first",),
+    "current": ("active",),
+    "currently": ("active",),
+}
+
+# carry no meaning for matching, but are not entities either
+_STOPWORDS = frozenset(
+    """
+    a an the of for to in on at by with from about is are was were be been do does did
+    what whats which who whom how when where show give get tell list find me my i we
+    our you your his her their its this that these those please any all some and or
+    has have had can could would should will there it s
+    """.split()
+)
+
+# vocabulary words that flip or narrow the answer; they must match exactly
+_GUARD_WORDS = frozenset(
+    """
+    not no never without except excluding
+    systolic diastolic fasting resting
+    highest lowest max min maximum minimum average mean first latest
+    """.split()
+)
+
+# skipped when looking for the noun a possessive owns ("siri's latest bp" owns bp)
+_MODIFIERS = _GUARD_WORDS | frozenset("active previous next upcoming prior".split())
+
+# everyday question words the prompts do not happen to contain
+_COMMON_WORDS = frozenset(
+    """
+    many much most more less least than top highest lowest max min maximum minimum
+    average mean today yesterday week month day year ever still now taking taken
+    take off due upcoming next previous prior earlier later being
+    measured measurement reading readings result results value values level levels
+    """.split()
+)
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _normalize(text: str) -> str:
+    return text.lower().replace("’", "'").replace("n't", " not")
+
+
+def words(text: str) -> list[str]:
+    """Lower‑cased, possessive‑stripped words; only ``[a-z0-9]`` and ``-./:`` survive."""
+    return _WORD.findall(_normalize(text).replace("'s", ""))
+
+
+def tokenize(text: str) -> list[str]:
+    """Abbreviation‑expanded stems of :func:`words`."""
+    out: list[str] = []
+    for word in words(text):
+        out.extend(_SYNONYMS.get(word, (word,)))
+    return [_stem(w) for w in out]
+
+
+def possessives(text: str) -> list[str]:
+    """
+    ``"owner's noun"`` for every possessive in *text*, the noun being the
+    first following token that is not a stopword or modifier
+    ("what's siri's latest bp" → ``["siri's blood"]``).  Contractions such
+    as "what's" are not possessives.
+    """
+    text = _normalize(text)
+    out = []
+    for m in _POSSESSIVE.finditer(text):
+        owner = _stem(m.group(1))
+        if is_stopword(owner):
+            continue
+        owned = (t for t in tokenize(text[m.end():]) if not is_stopword(t) and t not in _MODIFIERS)
+        out.append(f"{owner}'s {next(owned, '')}".rstrip())
+    return out
+
+
+def is_stopword(token: str) -> bool:
+    return token in _STOPWORDS
+
+
+@lru_cache(maxsize=1)
+def default_vocabulary() -> frozenset[str]:
+    """
+    Every word in the domain prompts plus common question words.  Numbers
+    and dates from the prompts' examples are left out: they are entities.
+    """
+    from my_doctor_assistant.mcp.prompts import domain_prompts as dp
+
+    text = " ".join(v for k, v in vars(dp).items() if k.isupper() and isinstance(v, str))
+    vocabulary = {w for w in tokenize(_CAMEL.sub(r"\1 \2", text)) if not _DIGIT.search(w)}
+    return frozenset(vocabulary) | frozenset(map(_stem, _STOPWORDS | _COMMON_WORDS))
+
+
+class HashingEmbedder:
+    """
+    Offline text embedder: signed feature hashing of word stems (weight 1)
+    and their character trigrams (weight 0.25, a little typo tolerance
+    without letting "systolic" match "diastolic"), L2‑normalised.
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        return h % self.dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+    def embed(self, tokens: Iterable[str]) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in tokens:
+            if is_stopword(word):
+                continue
+            i, sign = self._bucket("w:" + word)
+            vec[i] += sign
+            padded = f"#{word}#"
+            for j in range(len(padded) - 2):
+                i, sign = self._bucket("c:" + padded[j : j + 3])
+                vec[i] += 0.25 * sign
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+# ── dependency recording ─────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Dependency:
+    tool: str
+    args: str  # canonical JSON, so it can be replayed and compared
+    digest: str
+    cacheable: bool
+    result: str = field(default="", compare=False, repr=False)  # kept while recording only
+
+
+_recorder: ContextVar[list[Dependency] | None] = ContextVar("semantic_cache_recorder", default=None)
+
+
+def digest(result: str) -> str:
+    return hashlib.sha256(result.encode()).hexdigest()
+
+
+def record_tool_call(tool: str, args: dict[str, Any], result: str, replayable: bool = True) -> None:
+    """
+    Note a tool call made while an answer is being produced.  Pass
+    ``replayable=False`` for calls that must not be repeated (writes) or
+    whose result is not reproducible (cursors).  No‑op outside
+    :func:`recording`.
+    """
+    deps = _recorder.get()
+    if deps is None:
+        return
+    failed = result.lstrip().startswith('{"error"')
+    deps.append(
+        Dependency(
+            tool,
+            json.dumps(args, sort_keys=True, default=str),
+            digest(result),
+            cacheable=replayable and not failed,
+            result=result,
+        )
+    )
+
+
+@contextmanager
+def recording() -> Iterator[list[Dependency]]:
+    """
+    Collect the tool calls made in this context (and tasks it spawns).
+    Nested recordings also report their calls to the enclosing one.
+    """
+    deps: list[Dependency] = []
+    parent = _recorder.get()
+    token = _recorder.set(deps)
+    try:
+        yield deps
+    finally:
+        _recorder.reset(token)
+        if parent is not None:
+            parent.extend(deps)
+
+
+def _unchanged(entry: "_Entry", results: list[str]) -> bool:
+    return all(digest(r) == dep.digest for dep, r in zip(entry.dependencies, results))
+
+
+# ── cache ────────────────────────────────────────────────────────────────
+@dataclass
+class _Entry:
+    question: str
+    scope: str
+    entities: frozenset[str]
+    answer: str
+    dependencies: tuple[Dependency, ...]
+
+
+class SemanticAnswerCache:
+    """Bounded, TTL'd nearest‑neighbour cache of agent answers."""
+
+    def __init__(
+        self,
+        threshold: float,
+        ttl: float,
+        max_entries: int,
+        revalidate: bool = True,
+        embedder: HashingEmbedder | None = None,
+        vocabulary: frozenset[str] | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.revalidate = revalidate
+        self.embedder = embedder or HashingEmbedder()
+        self._vocabulary = vocabulary
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._expires = np.zeros(max_entries)  # 0 marks a free slot
+        self._last_used = np.zeros(max_entries)
+        self._entries: list[_Entry | None] = [None] * max_entries
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "stale", "stores", "skipped", "evictions"), 0
+        )
+
+    @property
+    def vocabulary(self) -> frozenset[str]:
+        if self._vocabulary is None:
+            self._vocabulary = default_vocabulary()
+        return self._vocabulary
+
+    def _features(self, question: str) -> tuple[np.ndarray, frozenset[str]]:
+        tokens = tokenize(question)
+        entities = frozenset(
+            t for t in tokens if t not in self.vocabulary or t in _GUARD_WORDS
+        ).union(possessives(question))
+        return self.embedder.embed(tokens), entities
+
+    # ── lookups ───────────────────────────────────────────────────────
+    def lookup(
+        self,
+        question: str,
+        scope: str = "",
+        replay: Callable[[str, dict[str, Any]], str] | None = None,
+    ) -> str | None:
+        """
+        Cached answer for *question* in *scope*, or ``None``.  With *replay*
+        (``(tool, args) -> result``) the entry's dependencies are re‑run
+        first and a changed result turns the hit into a miss.
+        """
+        slot, entry = self._find(question, scope)
+        if entry is None:
+            return None
+        valid = True
+        if self.revalidate and replay is not None:
+            try:
+                valid = _unchanged(
+                    entry, [replay(dep.tool, json.loads(dep.args)) for dep in entry.dependencies]
+                )
+            except Exception:
+                valid = False
+        return self._settle(slot, entry, valid)
+
+    async def alookup(
+        self,
+        question: str,
+        scope: str = "",
+        replay: Callable[[str, dict[str, Any]], Awaitable[str]] | None = None,
+    ) -> str | None:
+        """:meth:`lookup` with an async *replay*; dependencies are re‑run concurrently."""
+        slot, entry = self._find(question, scope)
+        if entry is None:
+            return None
+        valid = True
+        if self.revalidate and replay is not None:
+            try:
+                valid = _unchanged(
+                    entry,
+                    await asyncio.gather(
+                        *(replay(dep.tool, json.loads(dep.args)) for dep in entry.dependencies)
+                    ),
+                )
+            except Exception:
+                valid = False
+        return self._settle(slot, entry, valid)
+
+    def _find(self, question: str, scope: str) -> tuple[int, _Entry | None]:
+        vec, entities = self._features(question)
+        with self._lock:
+            slot, entry = self._nearest(vec, entities, scope)
+            if entry is None:
+                self._counters["misses"] += 1
+            return slot, entry
+
+    def _settle(self, slot: int, entry: _Entry, valid: bool) -> str | None:
+        """Count a hit, or drop the entry when its data changed."""
+        with self._lock:
+            if not valid:
+                if self._entries[slot] is entry:
+                    self._free(slot)
+                self._counters["stale"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._last_used[slot] = time.monotonic()
+            self._counters["hits"] += 1
+        return entry.answer
+
+    def _nearest(self, vec: np.ndarray, entities: frozenset[str], scope: str) -> tuple[int, _Entry | None]:
+        live = self._expires > time.monotonic()
+        if not live.any():
+            return -1, None
+        scores = self._vectors @ vec
+        scores[~live] = -np.inf
+        candidates = np.flatnonzero(scores >= self.threshold)
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            entry = self._entries[slot]
+            if entry is not None and entry.scope == scope and entry.entities == entities:
+                return int(slot), entry
+        return -1, None
+
+    # ── updates ───────────────────────────────────────────────────────
+    def store(
+        self,
+        question: str,
+        answer: str,
+        dependencies: Iterable[Dependency] = (),
+        scope: str = "",
+    ) -> bool:
+        """Cache *answer*; returns ``False`` when its dependencies make it uncacheable."""
+        # same call twice → one replay; results are only needed while recording
+        deps = tuple(replace(d, result="") for d in dict.fromkeys(dependencies))
+        if self.max_entries <= 0 or self.ttl <= 0 or not all(d.cacheable for d in deps):
+            with self._lock:
+                self._counters["skipped"] += 1
+            return False
+        vec, entities = self._features(question)
+        now = time.monotonic()
+        with self._lock:
+            slot, _ = self._nearest(vec, entities, scope)
+            if slot < 0:
+                slot = self._free_slot(now)
+            self._vectors[slot] = vec
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._entries[slot] = _Entry(question, scope, entities, answer, deps)
+            self._counters["stores"] += 1
+        return True
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            for slot in range(self.max_entries):
+                self._free(slot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "max_entries": self.max_entries,
+                "entries": int((self._expires > time.monotonic()).sum()),
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    # ── internals (caller holds the lock) ─────────────────────────────
+    def _free_slot(self, now: float) -> int:
+        expired = np.flatnonzero(self._expires <= now)
+        if expired.size:
+            return int(expired[0])
+        slot = int(np.argmin(self._last_used))
+        self._counters["evictions"] += 1
+        return slot
+
+    def _free(self, slot: int) -> None:
+        self._expires[slot] = 0.0
+        self._entries[slot] = None
+
+
+_cache: SemanticAnswerCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticAnswerCache:
+    """Return the process‑wide answer cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticAnswerCache(
+                    threshold=get_semantic_cache_threshold(),
+                    ttl=get_semantic_cache_ttl(),
+                    max_entries=get_semantic_cache_max_entries(),
+                    revalidate=get_semantic_cache_revalidate(),
+                )
+    return _cache
@@ -0,0 +1,158 @@
+"""
+Trace spans for the LangChain side of an answer.
+
+:class:`AgentTracingHandler` turns the callbacks of the structured‑chat
+agent into spans: one per chain, LLM call and tool call, plus an
+``agent.parse`` span from the end of each LLM call to the action the
+output parser produced from it.  While a tool runs, its span is the
+current span, so the MCP call it makes – and through ``traceparent`` the
+server's GraphDB spans – nest underneath it.
+
+Pass the handler at invocation time (``run(..., callbacks=[handler])``);
+callbacks given to the executor's constructor are not inherited by the
+LLM and tool runs inside it.
+"""
+
+from contextvars import Token
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from my_doctor_assistant.utils.tracing import Span, get_tracer, restore_span, use_span
+
+
+class AgentTracingHandler(BaseCallbackHandler):
+    """Record LangChain runs as child spans of the current span."""
+
+    # called in the agent's own context, not a worker thread, so the
+    # current span a tool sets is the one its MCP call sees
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._spans: dict[UUID, Span] = {}
+        self._parents: dict[UUID, UUID | None] = {}
+        self._tokens: dict[UUID, Token] = {}
+        self._parsing: dict[UUID, Span] = {}  # executor run → open agent.parse span
+
+    # ── bookkeeping ───────────────────────────────────────────────────
+    def _start(
+        self,
+        run_id: UUID,
+        parent_run_id: UUID | None,
+        name: str,
+        kind: str = "internal",
+        attributes: dict[str, Any] | None = None,
+    ) -> Span | None:
+        tracer = get_tracer()
+        if not tracer.active:
+            return None
+        parent = self._spans.get(parent_run_id) if parent_run_id else None
+        span = tracer.start_span(name, kind, attributes, parent)  # no parent run: the current span
+        self._spans[run_id] = span
+        self._parents[run_id] = parent_run_id
+        return span
+
+    def _end(self, run_id: UUID, error: BaseException | None = None) -> None:
+        self._parents.pop(run_id, None)
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        if error is not None:
+            span.set_error(f"{type(error).__name__}: {error}")
+        span.end()
+
+    def _root(self, run_id: UUID) -> UUID:
+        while self._parents.get(run_id) is not None:
+            run_id = self._parents[run_id]
+        return run_id
+
+    def _end_parse(self, run_id: UUID, action: str) -> None:
+        span = self._parsing.pop(run_id, None)
+        if span is not None:
+            span.set("agent.action", action)
+            if action == "_Exception":  # the output parser failed
+                span.set_error("parse_error")
+            span.end()
+
+    # ── chains ────────────────────────────────────────────────────────
+    def on_chain_start(
+        self, serialized: dict[str, Any] | None, inputs: Any, *, run_id: UUID,
+        parent_run_id: UUID | None = None, **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+        self._start(run_id, parent_run_id, f"chain {name}")
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_parse(run_id, "none")
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_parse(run_id, "none")
+        self._end(run_id, error)
+
+    # ── LLM calls and the parser step after them ──────────────────────
+    def _start_llm(self, run_id: UUID, parent_run_id: UUID | None, kwargs: dict[str, Any]) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            (kwargs.get("metadata") or {}).get("ls_model_name")
+            or params.get("model_name") or params.get("model") or "model"
+        )
+        self._start(run_id, parent_run_id, f"llm {model}", "client", {"llm.model": model})
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any] | None, messages: Any, *, run_id: UUID,
+        parent_run_id: UUID | None = None, **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, parent_run_id, kwargs)
+
+    def on_llm_start(
+        self, serialized: dict[str, Any] | None, prompts: Any, *, run_id: UUID,
+        parent_run_id: UUID | None = None, **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, parent_run_id, kwargs)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.get(run_id)
+        if span is None:
+            return
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        for key in ("prompt_tokens", "completion_tokens"):
+            if isinstance(usage.get(key), int):
+                span.set(f"llm.{key}", usage[key])
+        root = self._root(run_id)
+        self._end(run_id)
+        if root != run_id and root in self._spans:
+            # inside an agent: the output parser runs next, until the executor reports the action
+            self._parsing[root] = get_tracer().start_span("agent.parse", parent=self._spans[root])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_parse(run_id, getattr(action, "tool", "action"))
+
+    def on_agent_finish(self, finish: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_parse(run_id, "final_answer")
+
+    # ── tools ─────────────────────────────────────────────────────────
+    def on_tool_start(
+        self, serialized: dict[str, Any] | None, input_str: str, *, run_id: UUID,
+        parent_run_id: UUID | None = None, **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        span = self._start(run_id, parent_run_id, f"tool {name}", attributes={"tool.input": str(input_str)[:1000]})
+        if span is not None:
+            self._tokens[run_id] = use_span(span)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        token = self._tokens.pop(run_id, None)
+        if token is not None:
+            restore_span(token)
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        token = self._tokens.pop(run_id, None)
+        if token is not None:
+            restore_span(token)
+        self._end(run_id, error)
@@ -1,3 +1,8 @@
+import asyncio
+import json
+import os
+import time
+
 import typer
 
 app = typer.Typer(help="Doctor‑Assistant command‑line tools")
@@ -63,10 +68,23 @@ def shell(
         metavar="stdio|sse",
         help="Required: choose the transport layer the shell will use",
     ),
+    timings: bool = typer.Option(
+        False,
+        "--timings",
+        help="After each answer, print how long every step took (LLM, parser, MCP, Neo4j)",
+    ),
 ):
     """Open an interactive QA shell using the selected transport."""
     transport = _validate_transport(transport)
 
+    from my_doctor_assistant.utils.helper import get_trace_exporters, get_trace_file
+    from my_doctor_assistant.utils.tracing import get_tracer, read_spans, timings_report
+
+    if timings and transport == "stdio" and "file" not in get_trace_exporters():
+        # the server subprocess inherits this and appends its spans to the
+        # same file, where they are read back for the breakdown
+        os.environ["TRACE_EXPORTER"] = ",".join(sorted(get_trace_exporters() | {"file"}))
+
     if transport == "stdio":
         from my_doctor_assistant.mcp.stdio.testagentMCPstdio import MedicalQAAgent
     else:
@@ -85,7 +103,413 @@ def shell(
             break
         if q.strip().lower() in {"exit", "quit"}:
             break
-        typer.echo(agent.answer(q))
+        if not timings:
+            typer.echo(agent.answer(q))
+            continue
+        trace_file = get_trace_file()
+        offset = os.path.getsize(trace_file) if os.path.exists(trace_file) else 0
+        with get_tracer().collect() as spans:
+            typer.echo(agent.answer(q))
+        if "file" in get_trace_exporters():  # server spans, when the server writes to the same file
+            spans = spans + read_spans(trace_file, {s.trace_id for s in spans}, offset)
+        typer.echo(timings_report(spans))
+
+# ──────────────────────────────────────────────────────────────
+# Batch question answering
+# ──────────────────────────────────────────────────────────────
+def _read_questions(path: str) -> list[dict]:
+    """Questions from a JSONL file; ``id`` defaults to the line number."""
+    items, seen = [], set()
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as exc:
+                raise typer.BadParameter(f"{path}:{lineno}: {exc}") from None
+            if isinstance(item, str):
+                item = {"question": item}
+            if not isinstance(item, dict) or not item.get("question"):
+                raise typer.BadParameter(f"{path}:{lineno}: expected an object with a 'question'")
+            item.setdefault("id", lineno)
+            if item["id"] in seen:
+                raise typer.BadParameter(f"{path}:{lineno}: duplicate id {item['id']!r}")
+            seen.add(item["id"])
+            items.append(item)
+    return items
+
+
+def _answered_ids(path: str) -> set:
+    """Ids already answered in an earlier (possibly interrupted) run."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # the line a crash cut short
+            if "answer" in record:
+                done.add(record["id"])
+    return done
+
+
+def _end_last_line(path: str) -> None:
+    """Terminate a line a crash left half‑written so the next append starts clean."""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+    with open(path, "rb+") as fh:
+        fh.seek(-1, os.SEEK_END)
+        if fh.read(1) != b"\n":
+            fh.write(b"\n")
+
+
+async def _answer_all(items: list[dict], agents: dict, out, concurrency: int) -> tuple[list[float], int]:
+    limit = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failed = 0
+
+    async def one(item: dict) -> None:
+        nonlocal failed
+        async with limit:
+            record = {"id": item["id"], "domain": item["domain"], "question": item["question"]}
+            start = time.perf_counter()
+            try:
+                record["answer"] = await agents[item["domain"]].aanswer(item["question"])
+            except Exception as exc:
+                record["error"] = f"{type(exc).__name__}: {exc}"
+                failed += 1
+            record["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            latencies.append(record["latency_ms"])
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()  # one line per answer, so a crash loses only what was in flight
+            mark = "✅" if "answer" in record else "❌"
+            typer.echo(f"{mark}  {item['id']}  {record['latency_ms']:.0f} ms", err=True)
+
+    await asyncio.gather(*(one(item) for item in items))
+    return latencies, failed
+
+
+@app.command()
+def batch(
+    input_path: str = typer.Argument(
+        ..., metavar="QUESTIONS.jsonl", help='One JSON object per line: {"id", "question", "domain"?}'
+    ),
+    output_path: str = typer.Option(..., "--output", "-o", help="JSONL file answers are appended to"),
+    domain: str = typer.Option("schema", "--domain", "-d", help="Prompt slice for lines without a 'domain'"),
+    transport: str | None = typer.Option(
+        None, "--transport", "-t", metavar="stdio|sse", help="Required: choose the transport layer"
+    ),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="Questions answered at once"),
+    resume: bool = typer.Option(
+        True, "--resume/--restart", help="Skip ids already answered in OUTPUT (default) or start over"
+    ),
+):
+    """Answer a JSONL file of questions concurrently and write the answers as JSONL."""
+    transport = _validate_transport(transport)
+    if transport == "stdio":
+        from my_doctor_assistant.mcp.stdio.testagentMCPstdio import MedicalQAAgent
+    else:
+        from my_doctor_assistant.mcp.sse.testagentMCPsse import MedicalQAAgent
+    from my_doctor_assistant.utils.helper import percentile
+
+    items = _read_questions(input_path)
+    for item in items:
+        item.setdefault("domain", domain)
+    if resume:
+        _end_last_line(output_path)
+        done = _answered_ids(output_path)
+        todo = [item for item in items if item["id"] not in done]
+        if done:
+            typer.echo(f"Resuming: {len(items) - len(todo)} of {len(items)} already answered.")
+    else:
+        todo = items
+        open(output_path, "w").close()
+    if not todo:
+        typer.echo("Nothing to do.")
+        return
+
+    agents = {d: MedicalQAAgent(domain=d, verbose=False) for d in {item["domain"] for item in todo}}
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out:
+        latencies, failed = asyncio.run(_answer_all(todo, agents, out, concurrency))
+    elapsed = time.perf_counter() - start
+
+    typer.echo(
+        f"\n{len(latencies) - failed} answered, {failed} failed in {elapsed:.1f} s "
+        f"({len(latencies) / elapsed:.2f} questions/s, concurrency {concurrency})"
+    )
+    typer.echo(
+        "latency ms  "
+        + "  ".join(f"p{q}={percentile(latencies, q):.0f}" for q in (50, 95, 99))
+        + f"  max={max(latencies):.0f}"
+    )
+    if failed:
+        raise typer.Exit(code=1)
+
+# ──────────────────────────────────────────────────────────────
+# Load testing
+# ──────────────────────────────────────────────────────────────
+def _latency_line(label: str, latency: dict) -> str:
+    return f"{label:<30}" + "".join(f"{k}={v:>9,.1f}  " for k, v in latency.items())
+
+
+@app.command()
+def loadtest(
+    url: str | None = typer.Option(None, "--url", help="SSE server base URL (defaults to MCP_URL)"),
+    clients: int = typer.Option(10, "--clients", "-n", min=1, help="Concurrent MCP sessions"),
+    rate: float = typer.Option(20.0, "--rate", "-r", min=0.01, help="Target requests/s across all clients"),
+    duration: float = typer.Option(60.0, "--duration", min=1, help="Seconds measured after the warm-up"),
+    warmup: float = typer.Option(5.0, "--warmup", min=0, help="Seconds of load before measuring"),
+    mix_path: str | None = typer.Option(
+        None, "--mix", metavar="MIX.json", help="Weighted operations to replay (default: built-in mix)"
+    ),
+    patients: int = typer.Option(
+        100, "--patients", min=1, help="Patient ids 1..N used in requests (100 matches `seed --scale 0.01`)"
+    ),
+    timeout: float = typer.Option(30.0, "--timeout", min=0.1, help="Seconds before a request counts as failed"),
+    random_seed: int = typer.Option(0, "--seed", help="Seed for the operation and argument choices"),
+    output_path: str | None = typer.Option(None, "--output", "-o", help="Also write the summary as JSON"),
+    max_error_rate: float = typer.Option(
+        0.01, "--max-error-rate", min=0, help="Exit 1 if more than this share of requests failed or went unsent"
+    ),
+    max_p99: float | None = typer.Option(
+        None, "--max-p99", metavar="MS", help="Exit 1 if the corrected p99 latency exceeds MS"
+    ),
+):
+    """Drive the SSE server with concurrent MCP clients at a target rate and report latency."""
+    from my_doctor_assistant.mcp.loadtest import DEFAULT_MIX, load_mix, run_load
+    from my_doctor_assistant.utils.helper import get_mcp_url
+
+    try:
+        mix = load_mix(mix_path) if mix_path else DEFAULT_MIX
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--mix") from None
+    endpoint = f"{(url or get_mcp_url()).rstrip('/')}/sse"
+    typer.echo(
+        f"{clients} clients → {endpoint} at {rate:g} req/s for {warmup:g}+{duration:g} s "
+        f"({len(mix)} operations in the mix)"
+    )
+
+    def progress(p: dict) -> None:
+        typer.echo(
+            f"  {p['elapsed_s']:>4} s  {p['completed']:,} done  "
+            f"{p['recent_rps']:.1f} req/s  {p['recent_errors']} errors",
+            err=True,
+        )
+
+    try:
+        report = asyncio.run(run_load(
+            endpoint, mix, clients=clients, rate=rate, duration=duration, warmup=warmup,
+            patients=patients, timeout=timeout, seed=random_seed, progress=progress,
+        ))
+    except Exception as exc:  # connection refused, handshake failures, ...
+        while isinstance(exc, BaseExceptionGroup) and exc.exceptions:
+            exc = exc.exceptions[0]  # anyio wraps transport errors in task-group errors
+        typer.echo(f"❌  Could not run the load: {type(exc).__name__}: {exc}", err=True)
+        raise typer.Exit(code=1)
+    summary = report.summary()
+
+    typer.echo(
+        f"\n{summary['requests']:,} requests, {summary['throughput_rps']:.1f} req/s achieved "
+        f"(target {rate:g}), {summary['errors']:,} errors ({summary['error_rate']:.2%}), "
+        f"max lag {summary['max_lag_ms']:,.0f} ms"
+    )
+    for code, n in summary["errors_by_code"].items():
+        typer.echo(f"  {code}: {n:,}")
+    if summary["unsent"]:
+        typer.echo(f"⚠️   {summary['unsent']:,} requests fell due but were never sent: clients could not keep up")
+    typer.echo(_latency_line("latency ms  service", summary["service_ms"]))
+    typer.echo(_latency_line("            corrected", summary["corrected_ms"]))
+    typer.echo("\nper operation (corrected ms):")
+    for name, op in summary["operations"].items():
+        typer.echo(_latency_line(f"  {name}", op["corrected_ms"]) + f"n={op['requests']:,}  errors={op['errors']:,}")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+
+    p99 = summary["corrected_ms"].get("p99", 0.0)
+    due = summary["requests"] + summary["unsent"]
+    failed = (summary["errors"] + summary["unsent"]) / due if due else 0.0
+    if failed > max_error_rate or (max_p99 is not None and p99 > max_p99):
+        raise typer.Exit(code=1)
+
+# ──────────────────────────────────────────────────────────────
+# Database maintenance
+# ──────────────────────────────────────────────────────────────
+@app.command()
+def index(
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Only report; print the statements that would run"
+    ),
+):
+    """Create the constraints and indexes the schema relies on, and report unused ones."""
+    from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+    from my_doctor_assistant.infrastructure.database.neo4j.indexes import (
+        derive_index_specs,
+        sync_indexes,
+    )
+    from my_doctor_assistant.mcp.prompts.medical_schema_prompt import MEDICAL_SCHEMA_PROMPT
+
+    specs = derive_index_specs(MEDICAL_SCHEMA_PROMPT)
+    conn = Neo4jDBConnection()
+    conn.start()
+    with conn.get_driver().session(database=conn.get_database()) as session:
+        report = sync_indexes(session, specs, dry_run=dry_run)
+
+    typer.echo(f"{len(report.present)}/{len(specs)} schema indexes present.")
+    if report.missing:
+        typer.echo(f"\nMissing ({len(report.missing)}):")
+        for spec in report.missing:
+            typer.echo(f"  {spec.describe()}")
+            if dry_run:
+                typer.echo(f"    {spec.create_cypher()};")
+    for spec in report.created:
+        typer.echo(f"✅  created {spec.name}")
+    for spec, reason in report.failed:
+        typer.echo(f"❌  {spec.name}: {reason}", err=True)
+    if report.not_online:
+        typer.echo("\nNot online:")
+        for i in report.not_online:
+            typer.echo(f"  {i['name']} ({i['state']})")
+    if report.unused:
+        typer.echo("\nUnused since the last restart (readCount = 0):")
+        for i in report.unused:
+            typer.echo(f"  {i['name']}  {i['type']} {i['labelsOrTypes']}{i['properties']}")
+    if report.unmanaged:
+        typer.echo("\nNot derived from the schema (left untouched):")
+        for i in report.unmanaged:
+            typer.echo(f"  {i['name']}  {i['type']} {i['labelsOrTypes']}{i['properties']}")
+    if report.failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("migrate-temporal")
+def migrate_temporal(
+    batch_size: int = typer.Option(
+        10_000, "--batch-size", min=1, help="Nodes updated per committed transaction"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Only report how many nodes still need a datetime property"
+    ),
+):
+    """Add datetime copies of the string timestamps and range-index them."""
+    from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+    from my_doctor_assistant.infrastructure.database.neo4j.temporal import (
+        TEMPORAL_PROPERTIES,
+        ensure_index,
+        migrate,
+        pending,
+    )
+
+    conn = Neo4jDBConnection()
+    conn.start()
+    leftover = False
+    with conn.get_driver().session(database=conn.get_database()) as session:
+        for prop in TEMPORAL_PROPERTIES:
+            name = f"{prop.label}.{prop.source} -> {prop.target}"
+            todo = pending(session, prop)
+            if dry_run:
+                typer.echo(f"{name}: {todo} pending")
+                continue
+            converted = migrate(session, prop, batch_size=batch_size) if todo else 0
+            ensure_index(session, prop)
+            left = pending(session, prop)
+            typer.echo(f"✅  {name}: {converted} converted")
+            if left:
+                leftover = True
+                typer.echo(f"⚠️   {left} value(s) are not ISO timestamps and were skipped", err=True)
+    if leftover:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def seed(
+    scale: float = typer.Option(
+        0.01, "--scale", "-s", min=0.0001, help="Scale factor: 1.0 = 10,000 patients and 200 providers"
+    ),
+    history: float = typer.Option(1.0, "--history", min=0.1, help="Multiplier on the events per patient"),
+    random_seed: int = typer.Option(42, "--seed", help="The same seed and scale always give the same graph"),
+    batch_size: int = typer.Option(5_000, "--batch-size", min=1, help="Rows per UNWIND statement"),
+    start: int = typer.Option(1, "--start", min=1, help="Resume a load from this patient"),
+    csv_dir: str | None = typer.Option(
+        None, "--csv", metavar="DIR", help="Write neo4j-admin import CSVs to DIR instead of loading"
+    ),
+    drop_first: bool = typer.Option(False, "--drop", help="Delete previously seeded nodes (only those) first"),
+):
+    """Generate a deterministic synthetic medical graph for load testing."""
+    from my_doctor_assistant.infrastructure.database.neo4j.synthetic import (
+        CsvWriter,
+        SyntheticGraph,
+        drop,
+        load,
+        seed_key_indexes,
+    )
+    from my_doctor_assistant.mcp.prompts.medical_schema_prompt import MEDICAL_SCHEMA_PROMPT
+
+    if csv_dir and (drop_first or start > 1):
+        raise typer.BadParameter("--drop and --start only apply when loading into Neo4j")
+    graph = SyntheticGraph(scale=scale, seed=random_seed, history=history)
+    profile = graph.profile()
+    gaps = profile.missing(MEDICAL_SCHEMA_PROMPT)
+    if gaps:
+        typer.echo("❌  The generator does not cover the schema prompt:", err=True)
+        for gap in gaps:
+            typer.echo(f"   {gap}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"{graph.patients:,} patients, {graph.providers:,} providers (seed {random_seed}).")
+
+    began = time.perf_counter()
+    if csv_dir:
+        writer = CsvWriter(csv_dir, profile.types)
+        try:
+            writer.add(graph.vocabulary())
+            for index in range(1, graph.patients + 1):
+                writer.add(graph.patient(index))
+        finally:
+            writer.close()
+        typer.echo(
+            f"✅  {writer.written['nodes']:,} nodes and {writer.written['relationships']:,} "
+            f"relationships written to {csv_dir} in {time.perf_counter() - began:.1f} s.\n"
+            "Import into a new database (the server must be stopped) with:\n"
+        )
+        typer.echo(writer.import_command())
+        return
+
+    from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+
+    conn = Neo4jDBConnection()
+    conn.start()
+    loaded = start - 1
+
+    def progress(index: int, written: dict[str, int]) -> None:
+        nonlocal loaded
+        loaded = index
+        rate = written["nodes"] / (time.perf_counter() - began)
+        typer.echo(
+            f"  {index:,}/{graph.patients:,} patients  {written['nodes']:,} nodes  "
+            f"{written['relationships']:,} relationships  ({rate:,.0f} nodes/s)"
+        )
+
+    with conn.get_driver().session(database=conn.get_database()) as session:
+        if drop_first:
+            typer.echo(f"Dropped {drop(session, profile.types):,} seeded nodes.")
+        for spec in seed_key_indexes(profile.types):
+            session.run(spec.create_cypher()).consume()
+        session.run("CALL db.awaitIndexes(300)").consume()
+        try:
+            written = load(session, graph, batch_size=batch_size, start=start, progress=progress)
+        except (Exception, KeyboardInterrupt) as exc:
+            typer.echo(f"\n❌  {type(exc).__name__}: {exc}", err=True)
+            typer.echo(f"   Patients up to {loaded:,} are in; resume with --start {loaded + 1}", err=True)
+            raise typer.Exit(code=1)
+    typer.echo(
+        f"✅  {written['nodes']:,} nodes and {written['relationships']:,} relationships merged "
+        f"in {time.perf_counter() - began:.1f} s.  Run `my-doc-assist index` "
+        "next if this is a fresh database."
+    )
 
 # ──────────────────────────────────────────────────────────────
 # Environment helper
@@ -1,22 +1,46 @@
+import logging
 import sys
-from langchain_neo4j import Neo4jGraph
-from my_doctor_assistant.utils.helper import get_neo4j_credentials
+import threading
+
+from neo4j import Driver, GraphDatabase
+
+from my_doctor_assistant.utils.helper import (
+    get_neo4j_credentials,
+    get_neo4j_database,
+    get_neo4j_driver_config,
+)
+
+logger = logging.getLogger(__name__)
 
 class Neo4jDBConnection:
+    """
+    Process‑wide pooled Neo4j connection.
+
+    Every instance shares a single ``neo4j.Driver`` (and therefore a single
+    connection pool), so callers may keep doing
+    ``Neo4jDBConnection().start()`` on the hot path without paying for a new
+    driver or a TLS handshake on each call.
+    """
+
+    _shared_driver: Driver | None = None
+    _lock = threading.Lock()
+
     def __init__(self) -> None:
-        self.connection = None
+        self.connection = Neo4jDBConnection._shared_driver
 
     def _build(self):
         try:
             # print("Trying to connect to Neo4j...")
             print("Trying to connect to Neo4j...", file=sys.stderr)
             uri, user, password = get_neo4j_credentials()
-            self.connection = Neo4jGraph(
-                url=uri,
-                username=user,
-                password=password,
-                # enhanced_schema=True,
-            )
+            driver = GraphDatabase.driver(uri, auth=(user, password), **get_neo4j_driver_config())
+            try:
+                driver.verify_connectivity()
+            except Exception:
+                driver.close()
+                raise
+            Neo4jDBConnection._shared_driver = driver
+            self.connection = driver
             # print("Connected to Neo4j successfully.")
             print("Connected to Neo4j successfully.", file=sys.stderr)
         except Exception as e:
@@ -25,12 +49,58 @@ class Neo4jDBConnection:
             # Raise the original error to avoid masking the real cause
             raise
 
-    def get_connection(self):
+    def get_connection(self) -> Driver:
         if self.connection is None:
             raise Exception("No active Neo4j connection. Please call start() first.")
         return self.connection
 
+    def get_driver(self) -> Driver:
+        """Return the shared, pooled ``neo4j.Driver``."""
+        return self.get_connection()
+
+    def get_database(self) -> str:
+        """Return the database queries run against (NEO4J_DATABASE)."""
+        return get_neo4j_database()
+
     def start(self):
         if self.connection is None:
-            self._build()
-        return self.get_connection()
\ No newline at end of file
+            # Double‑checked so concurrent first calls build only one driver.
+            with Neo4jDBConnection._lock:
+                if Neo4jDBConnection._shared_driver is None:
+                    self._build()
+                self.connection = Neo4jDBConnection._shared_driver
+        return self.get_connection()
+
+    @classmethod
+    def pool_stats(cls) -> dict[str, int] | None:
+        """
+        In‑use / idle connection counts and the cap of the shared driver's
+        pool, or ``None`` before the driver exists.  Reads the driver's
+        private pool (checked against neo4j 5.28, see pyproject), so any
+        failure to read it also gives ``None`` rather than breaking a
+        metrics scrape.
+        """
+        driver = cls._shared_driver
+        if driver is None:
+            return None
+        try:
+            pool = driver._pool
+            with pool.lock:
+                connections = [c for queue in pool.connections.values() for c in queue]
+            in_use = sum(1 for c in connections if c.in_use)
+            return {
+                "in_use": in_use,
+                "idle": len(connections) - in_use,
+                "max_size": pool.pool_config.max_connection_pool_size,
+            }
+        except Exception:  # noqa: BLE001
+            logger.debug("Neo4j pool stats unavailable", exc_info=True)
+            return None
+
+    @classmethod
+    def close(cls) -> None:
+        """Close the shared driver (e.g. on server shutdown)."""
+        with cls._lock:
+            if cls._shared_driver is not None:
+                cls._shared_driver.close()
+                cls._shared_driver = None
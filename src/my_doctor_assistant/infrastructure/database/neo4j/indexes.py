@@ -0,0 +1,217 @@
+"""
+Index and constraint management derived from the schema prompt.
+
+``MEDICAL_SCHEMA_PROMPT`` lists every label with its properties.  From
+it we derive:
+
+* a uniqueness constraint on each label's own identifier (its first
+  property, when named after the label), e.g. ``Patient.patient_id``;
+* range indexes on ids that point at other labels, the lookup ``name`` of
+  small vocabulary nodes (Role, DiagnosisStatus, ...), the date/time
+  strings and their ``*_dt`` datetime shadows (see ``temporal``);
+* full‑text indexes backing the name search rule.
+
+:func:`sync_indexes` compares that plan with ``SHOW INDEXES`` /
+``SHOW CONSTRAINTS``, creates what is missing and reports indexes that
+are unused or not part of the plan.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from neo4j.exceptions import Neo4jError
+
+_LABEL_HEADER = re.compile(r"^\s*\d+\)\s*\(:(\w+)\)\s*$")
+_PROPERTY = re.compile(r"^\s*-\s*(\w+)\s*(\(\w+\))?\s*$")
+_RELATIONSHIP = re.compile(r"^\s*-\s*\((\w+)\)-\[:(\w+)\]->\(([\w ]+)\)\s*$")
+_ID_PROPERTY = re.compile(r"_(id|identifier)$")
+_DATE_PROPERTY = re.compile(r"_(date|date_time|dt)$")
+
+FULLTEXT_INDEXES = {
+    "person_name_fulltext": (("Patient", "HealthcareProvider"), ("patient_name", "provider_full_name")),
+    "medication_name_fulltext": (("Medication",), ("medication_name",)),
+    "service_name_fulltext": (("InvestigationService",), ("service_name",)),
+}
+
+
+def _snake(label: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", label).lower()
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    kind: str  # "unique" | "range" | "fulltext"
+    labels: tuple[str, ...]
+    properties: tuple[str, ...]
+
+    def create_cypher(self) -> str:
+        if self.kind == "unique":
+            return (
+                f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                f"FOR (n:{self.labels[0]}) REQUIRE n.{self.properties[0]} IS UNIQUE"
+            )
+        if self.kind == "range":
+            return (
+                f"CREATE RANGE INDEX {self.name} IF NOT EXISTS "
+                f"FOR (n:{self.labels[0]}) ON (n.{self.properties[0]})"
+            )
+        props = ", ".join(f"n.{p}" for p in self.properties)
+        return (
+            f"CREATE FULLTEXT INDEX {self.name} IF NOT EXISTS "
+            f"FOR (n:{'|'.join(self.labels)}) ON EACH [{props}]"
+        )
+
+    def describe(self) -> str:
+        return f"{self.kind:<8} {'|'.join(self.labels)}({', '.join(self.properties)})"
+
+
+def range_index(label: str, prop: str) -> IndexSpec:
+    return IndexSpec(f"{_snake(label)}_{prop}_range", "range", (label,), (prop,))
+
+
+def parse_schema(schema_prompt: str) -> dict[str, list[str]]:
+    """Return ``{label: [property, ...]}`` from the schema prompt's node list."""
+    schema: dict[str, list[str]] = {}
+    current: list[str] | None = None
+    for line in schema_prompt.splitlines():
+        header = _LABEL_HEADER.match(line)
+        if header:
+            current = schema.setdefault(header.group(1), [])
+            continue
+        prop = _PROPERTY.match(line)
+        if prop and current is not None:
+            current.append(prop.group(1))
+        elif line.strip().startswith("Relationships"):
+            break
+    return schema
+
+
+def parse_relationships(schema_prompt: str) -> set[tuple[str, str, str]]:
+    """Return ``{(start_label, type, end_label), ...}``; ``(A or B)`` yields both."""
+    triples = set()
+    for line in schema_prompt.splitlines():
+        rel = _RELATIONSHIP.match(line)
+        if rel:
+            start, rel_type, ends = rel.groups()
+            triples.update((start, rel_type, end.strip()) for end in ends.split(" or "))
+    return triples
+
+
+def _is_own_key(label: str, prop: str) -> bool:
+    """``patient_id`` is Patient's key; ``record_id`` is not BloodPressureReading's."""
+    stem = _ID_PROPERTY.sub("", prop)
+    return bool(_ID_PROPERTY.search(prop)) and set(stem.split("_")) <= set(_snake(label).split("_"))
+
+
+def derive_index_specs(schema_prompt: str) -> list[IndexSpec]:
+    """The constraints and indexes the schema prompt's queries rely on."""
+    schema = parse_schema(schema_prompt)
+    keys = {label: props[0] for label, props in schema.items() if props and _is_own_key(label, props[0])}
+    foreign_keys = set(keys.values())
+    specs: list[IndexSpec] = []
+    for label, props in schema.items():
+        snake = _snake(label)
+        if label in keys:
+            key = keys[label]
+            specs.append(IndexSpec(f"{snake}_{key}_unique", "unique", (label,), (key,)))
+        for i, prop in enumerate(props):
+            if label in keys and prop == keys[label]:
+                continue
+            if (
+                (i == 0 and _ID_PROPERTY.search(prop))       # an id that is not unique per node
+                or prop in foreign_keys                      # e.g. Diagnosis.treatment_plan_id
+                or prop.endswith("_identifier")
+                or _DATE_PROPERTY.search(prop)               # date strings and datetime shadows
+                or (prop == "name" and len(props) == 1)      # Role / DiagnosisStatus vocabularies
+            ):
+                specs.append(range_index(label, prop))
+    for name, (labels, props) in FULLTEXT_INDEXES.items():
+        specs.append(IndexSpec(name, "fulltext", labels, props))
+    return specs
+
+
+@dataclass
+class IndexReport:
+    present: list[IndexSpec] = field(default_factory=list)
+    missing: list[IndexSpec] = field(default_factory=list)
+    created: list[IndexSpec] = field(default_factory=list)
+    failed: list[tuple[IndexSpec, str]] = field(default_factory=list)
+    unused: list[dict[str, Any]] = field(default_factory=list)
+    unmanaged: list[dict[str, Any]] = field(default_factory=list)
+    not_online: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _signature(kind: str, labels: Any, props: Any) -> tuple[str, tuple, tuple]:
+    return kind, tuple(sorted(labels or ())), tuple(props or ())
+
+
+def _existing(session: Any) -> tuple[list[dict], set[tuple]]:
+    indexes = [
+        r.data()
+        for r in session.run(
+            "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, "
+            "state, owningConstraint, readCount, lastRead"
+        )
+    ]
+    constraints = [
+        r.data()
+        for r in session.run("SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties")
+    ]
+    have: set[tuple] = set()
+    for c in constraints:
+        if "UNIQUE" in (c["type"] or ""):
+            have.add(_signature("unique", c["labelsOrTypes"], c["properties"]))
+    for i in indexes:
+        if i["type"] in ("RANGE", "FULLTEXT"):
+            have.add(_signature(i["type"].lower(), i["labelsOrTypes"], i["properties"]))
+    return indexes, have
+
+
+def sync_indexes(session: Any, specs: list[IndexSpec], dry_run: bool = False) -> IndexReport:
+    """
+    Create every spec missing from the database (unless *dry_run*) and
+    report on the indexes already there.
+    """
+    report = IndexReport()
+    indexes, have = _existing(session)
+    for spec in specs:
+        sig = _signature(spec.kind, spec.labels, spec.properties)
+        # a uniqueness constraint's backing index also serves range lookups
+        if sig in have or (
+            spec.kind == "range" and _signature("unique", spec.labels, spec.properties) in have
+        ):
+            report.present.append(spec)
+        else:
+            report.missing.append(spec)
+    if not dry_run:
+        for spec in report.missing:
+            try:
+                session.run(spec.create_cypher()).consume()
+                report.created.append(spec)
+            except Neo4jError as exc:
+                report.failed.append((spec, exc.message or str(exc)))
+                if spec.kind == "unique":
+                    # e.g. duplicate ids in existing data: still index the lookups
+                    fallback = IndexSpec(
+                        spec.name.replace("_unique", "_range"), "range", spec.labels, spec.properties
+                    )
+                    try:
+                        session.run(fallback.create_cypher()).consume()
+                        report.created.append(fallback)
+                    except Neo4jError as exc2:
+                        report.failed.append((fallback, exc2.message or str(exc2)))
+    planned = {s.name for s in specs} | {
+        s.name.replace("_unique", "_range") for s in specs if s.kind == "unique"
+    }
+    for index in indexes:
+        if index["type"] == "LOOKUP":
+            continue
+        if index["state"] != "ONLINE":
+            report.not_online.append(index)
+        if not index["owningConstraint"] and not index["readCount"]:
+            report.unused.append(index)
+        if index["name"] not in planned and index["owningConstraint"] not in planned:
+            report.unmanaged.append(index)
+    return report
@@ -0,0 +1,861 @@
+"""
+Deterministic synthetic medical graph for load testing.
+
+:class:`SyntheticGraph` generates every label, property and relationship
+listed in ``MEDICAL_SCHEMA_PROMPT`` with per‑patient cardinalities shaped
+like the real data (long‑tailed vitals and appointments, consultations
+only for attended appointments, plans for most diagnoses, ...).  Size
+follows TPC‑style scale factors: ``scale=1.0`` is 10,000 patients and 200
+providers, the vocabulary nodes (roles, statuses, medications, services)
+are fixed, and ``history`` multiplies the events per patient.
+
+Each patient is drawn from its own ``Random(f"{seed}:{index}")``, so a
+seed and scale always give the same graph, independent of batch size.
+Every node carries a ``_seed_key`` (``"Label:id"``) that the loader
+merges on, which makes a load resumable and lets :func:`drop` remove the
+synthetic data without touching anything else.
+
+The graph can be loaded with batched ``UNWIND`` writes (:func:`load`) or
+written as CSV for ``neo4j-admin database import`` (:class:`CsvWriter`).
+"""
+
+import csv
+import os
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+from my_doctor_assistant.infrastructure.database.neo4j.indexes import (
+    IndexSpec,
+    parse_relationships,
+    parse_schema,
+    range_index,
+)
+
+PATIENTS_PER_SCALE = 10_000
+PROVIDERS_PER_SCALE = 200
+SEED_KEY = "_seed_key"
+
+# events are spread over this window; later appointments are still 'scheduled'
+_FIRST_SEEN = (datetime(2021, 1, 1, tzinfo=timezone.utc), datetime(2024, 6, 30, tzinfo=timezone.utc))
+_HORIZON = datetime(2025, 12, 31, tzinfo=timezone.utc)
+_NOW = datetime(2025, 6, 30, tzinfo=timezone.utc)
+
+# mean events per patient at history=1.0
+VITALS_PER_PATIENT = 12
+APPOINTMENTS_PER_PATIENT = 6
+DIAGNOSES_PER_PATIENT = 2
+ORDERS_PER_PATIENT = 2
+PRESCRIPTIONS_PER_PLAN = 3
+
+_FIRST_NAMES = (
+    "james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda", "william",
+    "elizabeth", "david", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah",
+    "kwame", "ama", "kofi", "akosua", "yaw", "abena", "chen", "wei", "priya", "arjun", "fatima",
+    "omar", "sofia", "mateo", "olga", "ivan", "aisha", "hassan",
+)
+_LAST_NAMES = (
+    "smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "rodriguez",
+    "martinez", "mensah", "owusu", "boateng", "asante", "osei", "agyeman", "wang", "li", "patel",
+    "sharma", "khan", "ali", "silva", "santos", "ivanova", "petrov", "o'brien", "nguyen", "kim",
+    "lee", "mueller", "schmidt",
+)
+_TIMEZONES = ("africa/accra", "europe/london", "america/new_york", "asia/kolkata", "europe/berlin")
+_BLOOD_GROUPS = ("o+", "o+", "o+", "a+", "a+", "b+", "ab+", "o-", "a-", "b-")
+_SIGNUPS = (("email", "local"), ("email", "local"), ("google", "google"), ("apple", "apple"))
+_ROLES = (("doctor", 0.7), ("nurse", 0.2), ("lab technician", 0.1))
+_DIAGNOSIS_STATUSES = ("provisional", "confirmed", "resolved", "ruled out")
+_CONDITION_TYPES = ("acute", "chronic", "recurrent")
+# (name, ICD‑10 code, chronic)
+_DIAGNOSES = (
+    ("essential hypertension", "i10", True),
+    ("type 2 diabetes mellitus", "e11.9", True),
+    ("asthma", "j45.909", True),
+    ("hyperlipidaemia", "e78.5", True),
+    ("hypothyroidism", "e03.9", True),
+    ("chronic kidney disease stage 3", "n18.3", True),
+    ("malaria", "b54", False),
+    ("acute upper respiratory infection", "j06.9", False),
+    ("urinary tract infection", "n39.0", False),
+    ("iron deficiency anaemia", "d50.9", False),
+    ("gastroenteritis", "a09", False),
+    ("migraine", "g43.909", False),
+    ("low back pain", "m54.5", False),
+    ("community acquired pneumonia", "j18.9", False),
+)
+_MEDICATIONS = (
+    ("amlodipine 5mg", "amlodipine"), ("lisinopril 10mg", "lisinopril"),
+    ("metformin 500mg", "metformin"), ("gliclazide 80mg", "gliclazide"),
+    ("atorvastatin 20mg", "atorvastatin"), ("salbutamol inhaler", "salbutamol"),
+    ("beclomethasone inhaler", "beclomethasone"), ("levothyroxine 50mcg", "levothyroxine"),
+    ("artemether lumefantrine", "artemether/lumefantrine"), ("amoxicillin 500mg", "amoxicillin"),
+    ("nitrofurantoin 100mg", "nitrofurantoin"), ("ferrous sulphate 200mg", "ferrous sulphate"),
+    ("oral rehydration salts", "oral rehydration salts"), ("sumatriptan 50mg", "sumatriptan"),
+    ("ibuprofen 400mg", "ibuprofen"), ("paracetamol 1g", "paracetamol"),
+    ("azithromycin 500mg", "azithromycin"), ("omeprazole 20mg", "omeprazole"),
+)
+# (name, category, sub_category, unit, (low, high), group)
+_SERVICES = (
+    ("full blood count", "haematology", "blood count", "", None, None),
+    ("rbc count", "haematology", "blood count", "x10^12/l", (4.2, 5.9), "full blood count"),
+    ("wbc count", "haematology", "blood count", "x10^9/l", (4.0, 11.0), "full blood count"),
+    ("haemoglobin", "haematology", "blood count", "g/dl", (12.0, 17.5), "full blood count"),
+    ("platelet count", "haematology", "blood count", "x10^9/l", (150, 400), "full blood count"),
+    ("lipid profile", "chemistry", "lipids", "", None, None),
+    ("total cholesterol", "chemistry", "lipids", "mmol/l", (3.0, 5.2), "lipid profile"),
+    ("ldl cholesterol", "chemistry", "lipids", "mmol/l", (1.0, 3.0), "lipid profile"),
+    ("c-reactive protein", "chemistry", "inflammation", "mg/l", (0.0, 5.0), None),
+    ("hba1c", "chemistry", "diabetes", "%", (4.0, 5.6), None),
+    ("fasting blood glucose", "chemistry", "diabetes", "mmol/l", (3.9, 5.5), None),
+    ("serum creatinine", "chemistry", "renal", "umol/l", (60, 110), None),
+    ("tsh", "chemistry", "endocrine", "mu/l", (0.4, 4.0), None),
+    ("malaria rdt", "microbiology", "parasitology", "", None, None),
+    ("urinalysis", "microbiology", "urine", "", None, None),
+    ("chest x-ray", "radiology", "imaging", "", None, None),
+)
+_COMPLAINTS = (
+    "headache", "fever", "cough", "chest pain", "shortness of breath", "fatigue", "dizziness",
+    "abdominal pain", "back pain", "palpitations", "joint pain", "frequent urination",
+)
+
+
+@dataclass(frozen=True)
+class Node:
+    label: str
+    key: str
+    props: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Rel:
+    type: str
+    start: str
+    end: str
+
+    @property
+    def triple(self) -> tuple[str, str, str]:
+        return _label(self.start), self.type, _label(self.end)
+
+
+def _label(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _id(key: str) -> str:
+    return key.split(":", 1)[1]
+
+
+class _Items(list):
+    """The nodes and relationships of one patient (or the vocabulary)."""
+
+    def node(self, label: str, ident: Any, **props: Any) -> str:
+        key = f"{label}:{ident}"
+        self.append(Node(label, key, props))
+        return key
+
+    def rel(self, rel_type: str, start: str, end: str) -> None:
+        self.append(Rel(rel_type, start, end))
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    """Long‑tailed count with the given mean, capped at ten times it."""
+    return min(int(rng.expovariate(1 / mean) + 0.5), int(mean * 10) + 1)
+
+
+def _moment(rng: random.Random, start: datetime, end: datetime) -> datetime:
+    seconds = int((end - start).total_seconds())
+    return (start + timedelta(seconds=rng.randrange(max(seconds, 1)))).replace(second=0)
+
+
+def _text(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class SyntheticGraph:
+    scale: float = 1.0
+    seed: int = 42
+    history: float = 1.0
+    patients: int = field(init=False)
+    providers: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.patients = max(1, round(PATIENTS_PER_SCALE * self.scale))
+        self.providers = max(5, round(PROVIDERS_PER_SCALE * self.scale))
+
+    # ── stream ────────────────────────────────────────────────────────
+    def vocabulary(self) -> list[Node | Rel]:
+        """Providers and the fixed lookup nodes every patient links to."""
+        rng = random.Random(f"{self.seed}:vocabulary")
+        items = _Items()
+        for name, _ in _ROLES:
+            items.node("Role", name, name=name)
+        for name in _DIAGNOSIS_STATUSES:
+            items.node("DiagnosisStatus", name, name=name)
+        for name in _CONDITION_TYPES:
+            items.node("ConditionType", name, name=name)
+        for identifier, name in _MEDICATIONS:
+            items.node("Medication", identifier, medication_identifier=identifier, medication_name=name)
+        for sid, (name, category, sub, unit, ref, group) in enumerate(_SERVICES, 1):
+            members = sum(1 for s in _SERVICES if s[5] == name)
+            items.node(
+                "InvestigationService", sid,
+                service_id=sid,
+                service_name=name,
+                sub_category=sub,
+                category=category,
+                gender_category="all",
+                reference_range=f"{ref[0]}-{ref[1]}" if ref else None,
+                gender="all",
+                age_range="0-120",
+                unit=unit or None,
+                remarks=None,
+                price=float(20 * (members or 1) + 5 * (sid % 4)),
+                service_type="group" if members else "single",
+                is_group="true" if members else "false",
+                created_at="2020-01-01 00:00:00",
+                deleted_at=None,
+                report_type="imaging" if category == "radiology" else "numeric" if ref else "text",
+            )
+        roles = [name for name, _ in _ROLES]
+        weights = [w for _, w in _ROLES]
+        for hid in range(1, self.providers + 1):
+            first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+            key = items.node(
+                "HealthcareProvider", hid,
+                provider_id=hid,
+                provider_full_name=f"{first} {last}",
+                provider_email=f"{first}.{last}.{hid}@clinic.example".replace("'", ""),
+            )
+            items.rel("HAS_ROLE", key, f"Role:{rng.choices(roles, weights)[0]}")
+        return items
+
+    def patient(self, index: int) -> list[Node | Rel]:
+        """Patient *index* (1‑based) and everything hanging off them."""
+        return _PatientBuilder(self, index).build()
+
+    # ── schema coverage ───────────────────────────────────────────────
+    def profile(self, sample: int = 200) -> "Profile":
+        """Labels, property types and relationship triples of the first *sample* patients."""
+        profile = Profile()
+        for items in (self.vocabulary(), *map(self.patient, range(1, sample + 1))):
+            profile.add(items)
+        return profile
+
+
+@dataclass
+class Profile:
+    types: dict[str, dict[str, type]] = field(default_factory=lambda: defaultdict(dict))
+    triples: set[tuple[str, str, str]] = field(default_factory=set)
+
+    def add(self, items: Iterable[Node | Rel]) -> None:
+        for item in items:
+            if isinstance(item, Rel):
+                self.triples.add(item.triple)
+                continue
+            seen = self.types[item.label]
+            for prop, value in item.props.items():
+                if value is not None:
+                    seen[prop] = type(value)
+                else:
+                    seen.setdefault(prop, type(None))
+
+    def missing(self, schema_prompt: str) -> list[str]:
+        """What the schema prompt lists that the generator does not produce."""
+        gaps = []
+        for label, props in parse_schema(schema_prompt).items():
+            if label not in self.types:
+                gaps.append(f"label {label}")
+                continue
+            gaps += [f"property {label}.{p}" for p in props if p not in self.types[label]]
+        gaps += [f"relationship ({a})-[:{t}]->({b})" for a, t, b in sorted(parse_relationships(schema_prompt) - self.triples)]
+        return gaps
+
+
+class _PatientBuilder:
+    def __init__(self, graph: SyntheticGraph, index: int) -> None:
+        self.g = graph
+        self.pid = index
+        self.rng = random.Random(f"{graph.seed}:{index}")
+        self.items = _Items()
+        self.serial = 0
+
+    def id(self) -> int:
+        """Next id in this patient's block; ids stay unique across patients."""
+        self.serial += 1
+        return self.pid * 10_000 + self.serial
+
+    def provider(self) -> str:
+        return f"HealthcareProvider:{self.rng.randint(1, self.g.providers)}"
+
+    def count(self, mean: float) -> int:
+        return _count(self.rng, mean * self.g.history)
+
+    def build(self) -> list[Node | Rel]:
+        rng, items = self.rng, self.items
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        born = date(1940, 1, 1) + timedelta(days=rng.randrange(365 * 65))
+        self.since = _moment(rng, *_FIRST_SEEN)
+        self.hypertensive = rng.random() < 0.3
+        self.key = items.node(
+            "Patient", self.pid,
+            patient_id=self.pid,
+            patient_name=f"{first} {last}",
+            patient_gender=rng.choice(("male", "female")),
+            patient_email=f"{first}.{last}{self.pid}@mail.example".replace("'", ""),
+            patient_date_of_birth=born.isoformat(),
+            patient_phone_number=f"+1555{rng.randrange(10**7):07d}",
+            patient_timezone=rng.choice(_TIMEZONES),
+            patient_profile_image=None if rng.random() < 0.6 else f"avatars/{self.pid}.jpg",
+        )
+        height = rng.gauss(168, 10)
+        self.weight = rng.gauss(75, 14)
+        items.rel("HAS_PHYSICAL_ATTRIBUTES", self.key, items.node(
+            "PhysicalAttributes", self.pid,
+            patient_height=f"{height:.0f}",
+            patient_weight=f"{self.weight:.1f}",
+            patient_blood_group=rng.choice(_BLOOD_GROUPS),
+        ))
+        method, provider = rng.choice(_SIGNUPS)
+        items.rel("HAS_AUTHENTICATION", self.key, items.node(
+            "Authentication", self.pid, signup_method=method, provider=provider
+        ))
+        self.primary = self.provider()
+        self.vitals(height)
+        self.appointments = self.schedule()
+        self.diagnoses()
+        self.investigations()
+        return items
+
+    # ── vitals ────────────────────────────────────────────────────────
+    def vitals(self, height: float) -> None:
+        rng, items = self.rng, self.items
+        for _ in range(self.count(VITALS_PER_PATIENT)):
+            rid, when = self.id(), _moment(rng, self.since, _NOW)
+            vs = items.node(
+                "VitalSignsRecord", rid,
+                record_id=rid,
+                vital_recorded_date_time=_text(when),
+                vital_recorded_dt=when,
+                vital_oxygen_saturation=str(rng.randint(92, 100)),
+                vital_heart_rate=str(rng.randint(55, 110)),
+                vital_blood_glucose=f"{rng.gauss(5.6, 1.2):.1f}",
+                vital_temperature=f"{rng.gauss(36.8, 0.5):.1f}",
+                vital_height=f"{height:.0f}",
+                vital_weight=f"{self.weight + rng.gauss(0, 1.5):.1f}",
+            )
+            items.rel("HAS_MEASUREMENT", self.key, vs)
+            items.rel("RECORDED_BY", vs, self.primary if rng.random() < 0.7 else self.provider())
+            if rng.random() < 0.9:
+                systolic = rng.gauss(148 if self.hypertensive else 120, 12)
+                items.rel("HAS_BLOOD_PRESSURE", vs, items.node(
+                    "BloodPressureReading", rid,
+                    record_id=rid,
+                    bp_systolic=f"{systolic:.0f}",
+                    bp_diastolic=f"{systolic * 0.65 + rng.gauss(0, 5):.0f}",
+                    bp_recorded_date_time=_text(when),
+                    bp_recorded_dt=when,
+                ))
+
+    # ── appointments and consultations ────────────────────────────────
+    def appointment(self, when: datetime, parent_id: int | None = None) -> dict[str, Any]:
+        rng, items = self.rng, self.items
+        aid = self.id()
+        if when > _NOW:
+            status = "scheduled"
+        else:
+            status = rng.choices(("completed", "cancelled", "missed"), (0.8, 0.1, 0.1))[0]
+        mode = rng.choices(("in person", "video", "phone"), (0.6, 0.3, 0.1))[0]
+        cancelled = when - timedelta(days=rng.randint(1, 7)) if status == "cancelled" else None
+        key = items.node(
+            "Appointment", aid,
+            appointment_id=aid,
+            appointment_for="self" if rng.random() < 0.9 else "dependent",
+            appointment_nature="new" if parent_id is None and rng.random() < 0.4 else "follow up",
+            appointment_type=mode,
+            appointment_date_time=_text(when),
+            appointment_dt=when,
+            additional_info=rng.choice(_COMPLAINTS) if rng.random() < 0.5 else None,
+            status=status,
+            priority="urgent" if rng.random() < 0.1 else "normal",
+            consultation_note=None,
+            severity=rng.choice(("mild", "moderate", "severe")),
+            is_rescheduled="false",
+            is_missed="true" if status == "missed" else "false",
+            cancellation_date=_text(cancelled) if cancelled else None,
+            cancellation_reason=rng.choice(("patient request", "provider unavailable")) if cancelled else None,
+            treatment_plan_id=None,
+            parent_id=parent_id,
+        )
+        node = items[-1]
+        provider = self.primary if rng.random() < 0.6 else self.provider()
+        items.rel("HAS_APPOINTMENT", self.key, key)
+        items.rel("CONDUCTS_APPOINTMENT", provider, key)
+        items.rel("SCHEDULED_BY", key, self.key if rng.random() < 0.6 else provider)
+        subtotal = rng.choice((40.0, 60.0, 80.0, 120.0))
+        discount = rng.choice((0.0, 0.0, 0.0, 10.0))
+        tax = round((subtotal - discount) * 0.125, 2)
+        items.rel("HAS_BILLING", key, items.node(
+            "AppointmentFinancial", aid,
+            subTotal=subtotal, discount=discount, totalTax=tax,
+            total=round(subtotal - discount + tax, 2), payment_id=f"pay_{aid}",
+        ))
+        items.rel("CONDUCTED_VIA", key, items.node(
+            "AppointmentMode", aid,
+            session_id=f"sess_{aid}",
+            session_key=f"{rng.getrandbits(64):016x}",
+            session_name=f"appointment {aid}",
+            mode=mode,
+        ))
+        appt = {"key": key, "id": aid, "when": when, "status": status, "node": node, "provider": provider}
+        if status == "completed":
+            node.props["consultation_note"] = f"reviewed {rng.choice(_COMPLAINTS)}; plan discussed"
+            appt["consultation"] = self.consultation(appt)
+        return appt
+
+    def schedule(self) -> list[dict[str, Any]]:
+        appointments = []
+        for _ in range(self.count(APPOINTMENTS_PER_PATIENT)):
+            appt = self.appointment(_moment(self.rng, self.since, _HORIZON))
+            appointments.append(appt)
+            if appt["status"] != "completed" and self.rng.random() < 0.3:
+                appt["node"].props["is_rescheduled"] = "true"
+                moved = self.appointment(appt["when"] + timedelta(days=self.rng.randint(2, 21)), appt["id"])
+                self.items.rel("RESCHEDULED_TO", appt["key"], moved["key"])
+                self.items.rel("RESCHEDULED_FROM", moved["key"], appt["key"])
+                appointments.append(moved)
+        return appointments
+
+    def consultation(self, appt: dict[str, Any]) -> str:
+        rng, items = self.rng, self.items
+        cid = appt["id"]
+        started = appt["when"] + timedelta(minutes=rng.randint(0, 20))
+        key = items.node(
+            "Consultation", cid,
+            consultation_id=cid,
+            started_at=_text(started),
+            ended_at=_text(started + timedelta(minutes=rng.randint(10, 45))),
+            deleted_at=None,
+            status="completed",
+        )
+        items.rel("HAS_CONSULTATION", appt["key"], key)
+        items.rel("CONDUCTED_CONSULTATION", appt["provider"], key)
+        items.rel("PARTICIPATED_IN", self.key, key)
+        exam: dict[str, Any] = {}
+        for region, group in (("chest", "respiratory"), ("abdomen", "gastrointestinal"), ("vascular", "cardiovascular")):
+            normal = rng.random() < 0.85
+            exam |= {
+                f"{region}_id": f"{cid}-{region}",
+                f"{region}_group": group,
+                f"{region}_image": None,
+                f"{region}_label": "normal" if normal else "abnormal",
+                f"{region}_comments": None if normal else f"{region} findings noted",
+            }
+        for test, normal in (("power", "5/5"), ("reflexes", "2+"), ("sensation", "intact"),
+                             ("coordinate", "normal"), ("tone", "normal")):
+            for limb in ("lll", "lul", "rll", "rul"):
+                exam[f"neurology_{test}_{limb}"] = normal
+        exam["cardiology"] = "s1 s2 heard, no murmurs"
+        items.rel("HAS_EXAMINATION", key, items.node("Examination", cid, **exam))
+        complaint = rng.choice(_COMPLAINTS)
+        items.rel("HAS_HISTORY", key, items.node(
+            "HistoryTaking", cid,
+            presenting_complaints=complaint,
+            history_of_presenting_complaints=f"{complaint} for {rng.randint(1, 14)} days",
+            past_medical_history="hypertension" if self.hypertensive else "nil significant",
+            allergies=rng.choice(("none known", "none known", "penicillin", "sulfa drugs")),
+            prescription_history=None,
+            family_history=rng.choice(("diabetes", "hypertension", "none")),
+            social_history=rng.choice(("non-smoker", "smoker", "occasional alcohol")),
+            examinations=None,
+        ))
+        systolic = round(rng.gauss(148 if self.hypertensive else 120, 12))
+        diastolic = round(systolic * 0.65 + rng.gauss(0, 5))
+        items.rel("HAS_VITALS", key, items.node(
+            "ConsultationVitals", cid,
+            heartrate=str(rng.randint(55, 110)),
+            saturation=str(rng.randint(92, 100)),
+            temperature=f"{rng.gauss(36.8, 0.5):.1f}",
+            bloodpressure=f"{systolic}/{diastolic}",
+            systolic=str(systolic),
+            diastolic=str(diastolic),
+        ))
+        return key
+
+    # ── diagnoses, plans and prescriptions ────────────────────────────
+    def diagnoses(self) -> None:
+        rng, items = self.rng, self.items
+        seen = [a for a in self.appointments if a["status"] == "completed"]
+        previous_plan: str | None = None
+        for _ in range(self.count(DIAGNOSES_PER_PATIENT)):
+            name, code, chronic = (
+                _DIAGNOSES[0] if self.hypertensive and rng.random() < 0.5 else rng.choice(_DIAGNOSES)
+            )
+            visit = rng.choice(seen) if seen else None
+            when = visit["when"] if visit else _moment(rng, self.since, _NOW)
+            status = rng.choices(_DIAGNOSIS_STATUSES, (0.2, 0.6, 0.15, 0.05))[0]
+            verified = status in ("confirmed", "resolved")
+            did = self.id()
+            key = items.node(
+                "Diagnosis", did,
+                diagnosis_id=did,
+                diagnosis_name=name,
+                diagnosis_identifier=code,
+                diagnosis_is_verified="true" if verified else "false",
+                treatment_plan_id=None,
+            )
+            node = items[-1]
+            added_by = visit["provider"] if visit else self.primary
+            items.rel("HAS_DIAGNOSIS", self.key, key)
+            if visit:
+                items.rel("HAS_DIAGNOSIS", visit["key"], key)
+            items.rel("ADDED_DIAGNOSIS", added_by, key)
+            if verified:
+                items.rel("VERIFIED_DIAGNOSIS", added_by, key)
+            if rng.random() < 0.3:
+                items.rel("UPDATED_DIAGNOSIS", self.provider(), key)
+            items.rel("HAS_STATUS", key, f"DiagnosisStatus:{status}")
+            condition = "chronic" if chronic else rng.choice(("acute", "acute", "recurrent"))
+            items.rel("HAS_CONDITION_TYPE", key, f"ConditionType:{condition}")
+            items.rel("HAS_TIMELINE", key, items.node(
+                "DiagnosisTimeline", did,
+                timeline_id=did,
+                diagnosis_timestamp=_text(when),
+                diagnosis_deleted_at=None,
+                diagnosis_diagnosisStatus=status,
+                diagnosis_diagnosed_on=_text(when),
+                diagnosis_resolved_on=_text(when + timedelta(days=rng.randint(5, 60))) if status == "resolved" else None,
+                diagnosis_verified_on=_text(when + timedelta(hours=rng.randint(1, 72))) if verified else None,
+            ))
+            if status != "ruled out" and rng.random() < 0.7:
+                plan = self.plan(node, status, when, visit, previous_plan, chronic)
+                items.rel("ASSOCIATED_WITH_PLAN", key, plan)
+                previous_plan = plan
+
+    def plan(
+        self, diagnosis: Node, status: str, when: datetime, visit: dict | None,
+        parent: str | None, chronic: bool,
+    ) -> str:
+        rng, items = self.rng, self.items
+        tid = self.id()
+        diagnosis.props["treatment_plan_id"] = tid
+        ends = when + timedelta(days=rng.randint(7, 365 if chronic else 30))
+        active = ends > _NOW and status != "resolved"
+        with_parent = parent is not None and rng.random() < 0.3
+        key = items.node(
+            "TreatmentPlan", tid,
+            treatment_plan_id=tid,
+            inhousePurchase=rng.choice(("true", "false")),
+            endDate=ends.date().isoformat(),
+            remarks=None,
+            created_at=_text(when),
+            updated_at=_text(when + timedelta(days=rng.randint(0, 30))),
+            status="active" if active else rng.choice(("completed", "discontinued")),
+            deleted_at=None,
+            parent_id=int(_id(parent)) if with_parent else None,
+            channel_id=f"chan_{tid}",
+            diagnosis_name=diagnosis.props["diagnosis_name"],
+            diagnosis_identifier=diagnosis.props["diagnosis_identifier"],
+            diagnosis_status=status,
+            lifestyleAdvice=rng.choice(("reduce salt intake", "regular exercise", "weight loss", "hydration", None)),
+            comment=None,
+        )
+        created_by = visit["provider"] if visit else self.primary
+        items.rel("HAS_TREATMENT_PLAN", self.key, key)
+        items.rel("CREATED_TREATMENT_PLAN", created_by, key)
+        if visit:
+            items.rel("LINKED_TO_PLAN", visit["consultation"], key)
+        if with_parent:
+            items.rel("HAS_PARENT_PLAN", key, parent)
+        investigation = items.node("Investigation", tid, investigation_id=tid)
+        items.rel("HAS_INVESTIGATION", key, investigation)
+        later = [a for a in self.appointments if a["when"] > when and "plan" not in a]
+        followup = min(later, key=lambda a: a["when"]) if later else None
+        if followup:
+            followup["plan"] = tid
+            followup["node"].props["treatment_plan_id"] = tid
+            items.rel("HAS_FOLLOWUP", key, followup["key"])
+        for n in range(rng.randint(1, 3)):
+            hid = self.id()
+            bridge = followup if n == 0 else None
+            history = items.node(
+                "TreatmentPlanHistory", hid,
+                history_id=hid,
+                inhousePurchase=rng.choice(("true", "false")),
+                endDate=ends.date().isoformat(),
+                remarks=None,
+                created_at=_text(when + timedelta(days=n * 7)),
+                updated_at=_text(when + timedelta(days=n * 7 + 1)),
+                activityType="created" if n == 0 else rng.choice(("updated", "medication added")),
+                bridgeAppointment=bridge["id"] if bridge else None,
+            )
+            items.rel("HAS_HISTORY", key, history)
+            items.rel("HAS_INVESTIGATION", history, investigation)
+            if bridge:
+                items.rel("LINKED_TO_HISTORY", bridge["key"], history)
+        for _ in range(max(1, self.count(PRESCRIPTIONS_PER_PLAN))):
+            self.prescription(key, when, ends, created_by, active)
+        return key
+
+    def prescription(self, plan: str, when: datetime, ends: datetime, created_by: str, active: bool) -> None:
+        rng, items = self.rng, self.items
+        rid = self.id()
+        created = when + timedelta(minutes=rng.randint(0, 120))
+        started = created + timedelta(days=rng.randint(0, 2))
+        verified = rng.random() < 0.8
+        held = not active and rng.random() < 0.1
+        key = items.node(
+            "Prescription", rid,
+            prescription_id=rid,
+            prescription_intervals=rng.choice(("once daily", "twice daily", "three times daily", "as needed")),
+            prescription_timings=rng.choice(("morning", "morning and evening", "with meals", "at night")),
+            prescription_instructions=rng.choice(("take after food", "take with water", "do not crush")),
+            prescription_status="active" if active else rng.choice(("completed", "stopped")),
+            prescription_day=str(rng.choice((5, 7, 14, 30, 90))),
+            prescription_period="days",
+            prescription_holded_at=_text(started + timedelta(days=3)) if held else None,
+            prescription_started_at=_text(started),
+            prescription_started_dt=started,
+            prescription_ended_at=None if active else _text(ends),
+            prescription_created_at=_text(created),
+            prescription_created_dt=created,
+            prescription_deleted_at=None,
+            prescription_is_verified="true" if verified else "false",
+            prescription_verified_on=_text(created + timedelta(hours=rng.randint(1, 24))) if verified else None,
+        )
+        items.rel("PRESCRIBES", key, f"Medication:{rng.choice(_MEDICATIONS)[0]}")
+        items.rel("HAS_PRESCRIPTION", self.key, key)
+        items.rel("HAS_PRESCRIPTION", plan, key)
+        items.rel("CREATED_PRESCRIPTION", created_by, key)
+        if verified:
+            items.rel("VERIFIED_PRESCRIPTION", created_by, key)
+        if rng.random() < 0.2:
+            items.rel("UPDATED_PRESCRIPTION", self.provider(), key)
+
+    # ── investigations ────────────────────────────────────────────────
+    def investigations(self) -> None:
+        rng, items = self.rng, self.items
+        orderable = [(sid, s) for sid, s in enumerate(_SERVICES, 1) if s[5] is None]
+        for _ in range(self.count(ORDERS_PER_PATIENT)):
+            sid, (name, category, _, _, _, _) = rng.choice(orderable)
+            visit = rng.choice(self.appointments) if self.appointments else None
+            when = visit["when"] if visit else _moment(rng, self.since, _NOW)
+            done = when < _NOW and rng.random() < 0.9
+            oid = self.id()
+            order = items.node(
+                "InvestigationOrder", oid,
+                investigation_id=oid,
+                created_at=_text(when),
+                deleted_at=None,
+                status="completed" if done else "pending",
+            )
+            items.rel("USES_SERVICE", order, f"InvestigationService:{sid}")
+            items.rel("HAS_INVESTIGATION_ORDER", self.key, order)
+            if visit:
+                items.rel("HAS_INVESTIGATION_ORDER", visit["key"], order)
+            if not done:
+                continue
+            members = [(i, s) for i, s in enumerate(_SERVICES, 1) if s[5] == name] or [(sid, _SERVICES[sid - 1])]
+            reported = when + timedelta(hours=rng.randint(2, 72))
+            author = self.provider()
+            for mid, (_, _, _, unit, ref, group) in members:
+                value, flag = self.result(ref, category)
+                report_id = self.id()
+                report = items.node(
+                    "InvestigationReport", report_id,
+                    report_id=report_id,
+                    report_value=value,
+                    report_status="final",
+                    report_type="imaging" if category == "radiology" else "numeric" if ref else "text",
+                    conclusion=flag,
+                    findings=f"{value} {unit}".strip(),
+                    comments=None,
+                    report_date=_text(reported),
+                    report_dt=reported,
+                    uploads=f"reports/{oid}.pdf" if category == "radiology" else None,
+                    created_at=_text(reported),
+                    deleted_at=None,
+                )
+                items.rel("HAS_REPORT", order, report)
+                items.rel("USES_SERVICE", report, f"InvestigationService:{mid}")
+                if group:
+                    items.rel("PART_OF_SERVICE_GROUP", report, f"InvestigationService:{sid}")
+                items.rel("HAS_REPORT", self.key, report)
+                items.rel("ADDED_REPORT", author, report)
+
+    def result(self, ref: tuple | None, category: str) -> tuple[str, str]:
+        rng = self.rng
+        if ref is None:
+            abnormal = rng.random() < 0.2
+            if category == "radiology":
+                return ("opacity noted" if abnormal else "clear lung fields"), ("abnormal" if abnormal else "normal")
+            return ("positive" if abnormal else "negative"), ("abnormal" if abnormal else "normal")
+        low, high = ref
+        value = rng.gauss((low + high) / 2, (high - low) / 3)
+        flag = "low" if value < low else "high" if value > high else "normal"
+        return f"{max(value, 0):.1f}", flag
+
+
+# ── loading ───────────────────────────────────────────────────────────
+def seed_key_indexes(labels: Iterable[str]) -> list[IndexSpec]:
+    """One range index per label on ``_seed_key``, for the loader's MERGEs."""
+    return [range_index(label, SEED_KEY) for label in sorted(labels)]
+
+
+def _write(tx: Any, cypher: str, rows: list[dict]) -> None:
+    tx.run(cypher, rows=rows).consume()
+
+
+class BatchLoader:
+    """
+    Buffer generated items and write them with one ``UNWIND`` per label
+    (nodes) or relationship shape; nodes always land before the
+    relationships that point at them.
+    """
+
+    def __init__(self, session: Any, batch_size: int = 5_000) -> None:
+        self.session = session
+        self.batch_size = batch_size
+        self.nodes: dict[str, list[dict]] = defaultdict(list)
+        self.rels: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
+        self.buffered = 0
+        self.written = {"nodes": 0, "relationships": 0}
+
+    def add(self, items: Iterable[Node | Rel]) -> None:
+        """Buffer one patient's items; flush once a batch worth of nodes is waiting."""
+        for item in items:
+            if isinstance(item, Rel):
+                self.rels[item.triple].append({"start": item.start, "end": item.end})
+            else:
+                self.nodes[item.label].append({"key": item.key, "props": item.props})
+                self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for label, rows in self.nodes.items():
+            self._run(
+                f"UNWIND $rows AS row MERGE (n:{label} {{{SEED_KEY}: row.key}}) SET n += row.props",
+                rows,
+            )
+            self.written["nodes"] += len(rows)
+        for (start, rel_type, end), rows in self.rels.items():
+            self._run(
+                f"UNWIND $rows AS row "
+                f"MATCH (a:{start} {{{SEED_KEY}: row.start}}) MATCH (b:{end} {{{SEED_KEY}: row.end}}) "
+                f"MERGE (a)-[:{rel_type}]->(b)",
+                rows,
+            )
+            self.written["relationships"] += len(rows)
+        self.nodes.clear()
+        self.rels.clear()
+        self.buffered = 0
+
+    def _run(self, cypher: str, rows: list[dict]) -> None:
+        for i in range(0, len(rows), self.batch_size):
+            self.session.execute_write(_write, cypher, rows[i : i + self.batch_size])
+
+
+def load(
+    session: Any,
+    graph: SyntheticGraph,
+    batch_size: int = 5_000,
+    start: int = 1,
+    progress: Callable[[int, dict[str, int]], None] | None = None,
+) -> dict[str, int]:
+    """
+    MERGE the graph from patient *start* on (the vocabulary too when
+    starting at 1); returns the rows written.  *progress* is called with
+    the last patient written after each flush.
+    """
+    loader = BatchLoader(session, batch_size)
+    if start <= 1:
+        loader.add(graph.vocabulary())
+    for index in range(max(start, 1), graph.patients + 1):
+        loader.add(graph.patient(index))
+        if progress and not loader.buffered:
+            progress(index, loader.written)
+    loader.flush()
+    if progress:
+        progress(graph.patients, loader.written)
+    return loader.written
+
+
+def drop(session: Any, labels: Iterable[str], batch_size: int = 10_000) -> int:
+    """Delete every node carrying a ``_seed_key``; returns the number deleted."""
+    deleted = 0
+    for label in labels:
+        summary = session.run(
+            f"MATCH (n:{label}) WHERE n.{SEED_KEY} IS NOT NULL "
+            "CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF $batch ROWS",
+            batch=batch_size,
+        ).consume()
+        deleted += summary.counters.nodes_deleted
+    return deleted
+
+
+# ── CSV for neo4j-admin import ────────────────────────────────────────
+_CSV_TYPES = {int: "long", float: "double", datetime: "datetime"}
+
+
+class CsvWriter:
+    """
+    Stream items into one CSV per label and per relationship type, with
+    ``neo4j-admin`` headers.  ``_seed_key`` is the node id (one global id
+    space) and is stored as a property, as a UNWIND load would.
+    """
+
+    def __init__(self, directory: str, types: dict[str, dict[str, type]]) -> None:
+        self.directory = directory
+        self.types = types
+        self.files: dict[str, Any] = {}
+        self.writers: dict[str, Any] = {}
+        self.node_files: dict[str, str] = {}
+        self.rel_files: dict[str, str] = {}
+        self.written = {"nodes": 0, "relationships": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _writer(self, name: str, header: list[str]) -> Any:
+        writer = self.writers.get(name)
+        if writer is None:
+            fh = open(os.path.join(self.directory, name), "w", newline="", encoding="utf-8")
+            writer = csv.writer(fh)
+            writer.writerow(header)
+            self.files[name], self.writers[name] = fh, writer
+        return writer
+
+    def add(self, items: Iterable[Node | Rel]) -> None:
+        for item in items:
+            if isinstance(item, Rel):
+                name = self.rel_files.setdefault(item.type, f"rels_{item.type}.csv")
+                self._writer(name, [":START_ID", ":END_ID"]).writerow([item.start, item.end])
+                self.written["relationships"] += 1
+                continue
+            columns = self.types[item.label]
+            name = self.node_files.setdefault(item.label, f"nodes_{item.label}.csv")
+            header = [f"{SEED_KEY}:ID"] + [
+                f"{p}:{_CSV_TYPES[t]}" if t in _CSV_TYPES else p for p, t in columns.items()
+            ]
+            row = [item.key]
+            for prop, kind in columns.items():
+                value = item.props.get(prop)
+                if value is None:
+                    row.append("")
+                elif kind is not type(None) and not isinstance(value, kind):
+                    raise ValueError(f"{item.label}.{prop}: expected {kind.__name__}, got {value!r}")
+                else:
+                    row.append(value.isoformat() if isinstance(value, datetime) else value)
+            self._writer(name, header).writerow(row)
+            self.written["nodes"] += 1
+
+    def close(self) -> None:
+        for fh in self.files.values():
+            fh.close()
+
+    def import_command(self, database: str = "neo4j") -> str:
+        """The ``neo4j-admin`` invocation that loads the written files."""
+        args = [f"--nodes={label}={os.path.join(self.directory, name)}" for label, name in self.node_files.items()]
+        args += [f"--relationships={t}={os.path.join(self.directory, name)}" for t, name in self.rel_files.items()]
+        return " \\\n  ".join(["neo4j-admin database import full", *args, database])
@@ -0,0 +1,78 @@
+"""
+Native ``datetime`` shadow properties for the string timestamps.
+
+Every timestamp in the graph is stored as a string, so period questions
+end up as ``CONTAINS '2023-12'`` filters that scan every reading.  The
+migration below adds a ``datetime`` copy next to each string property
+(``bp_recorded_date_time`` -> ``bp_recorded_dt``) in batches of
+``CALL { ... } IN TRANSACTIONS`` and creates a range index on it, so
+prompts and prepared queries can filter with range predicates that the
+planner turns into index seeks.  The original strings are left in place.
+
+The migration is idempotent: only nodes without the shadow property are
+touched, so it can be re‑run after new data is loaded.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from my_doctor_assistant.infrastructure.database.neo4j.indexes import IndexSpec, range_index
+
+# ISO‑8601 date, optionally followed by a time (space or T) and an offset
+_ISO_TIMESTAMP = (
+    r"\d{4}-\d{2}-\d{2}"
+    r"([ T]\d{2}:\d{2}(:\d{2}(\.\d{1,9})?)?)?"
+    r"(Z|[+-]\d{2}(:?\d{2})?)?"
+)
+
+
+@dataclass(frozen=True)
+class TemporalProperty:
+    label: str
+    source: str
+    target: str
+
+    @property
+    def index(self) -> IndexSpec:
+        return range_index(self.label, self.target)
+
+
+TEMPORAL_PROPERTIES = (
+    TemporalProperty("VitalSignsRecord", "vital_recorded_date_time", "vital_recorded_dt"),
+    TemporalProperty("BloodPressureReading", "bp_recorded_date_time", "bp_recorded_dt"),
+    TemporalProperty("Appointment", "appointment_date_time", "appointment_dt"),
+    TemporalProperty("Prescription", "prescription_started_at", "prescription_started_dt"),
+    TemporalProperty("Prescription", "prescription_created_at", "prescription_created_dt"),
+    TemporalProperty("InvestigationReport", "report_date", "report_dt"),
+)
+
+
+def pending(session: Any, prop: TemporalProperty) -> int:
+    """Nodes that have the string timestamp but no ``datetime`` shadow yet."""
+    record = session.run(
+        f"MATCH (n:{prop.label}) WHERE n.{prop.source} IS NOT NULL AND n.{prop.target} IS NULL "
+        "RETURN count(n) AS pending"
+    ).single()
+    return record["pending"] if record else 0
+
+
+def migrate(session: Any, prop: TemporalProperty, batch_size: int = 10_000) -> int:
+    """
+    Fill ``prop.target`` in committed batches; returns the number of
+    properties set.  Strings that are not ISO timestamps are skipped
+    (and stay pending) rather than failing the batch.
+    """
+    summary = session.run(
+        f"MATCH (n:{prop.label}) WHERE n.{prop.source} IS NOT NULL AND n.{prop.target} IS NULL "
+        "CALL { WITH n "
+        f"  WITH n, trim(toString(n.{prop.source})) AS s WHERE s =~ $pattern "
+        f"  SET n.{prop.target} = datetime(replace(s, ' ', 'T')) "
+        "} IN TRANSACTIONS OF $batch ROWS",
+        pattern=_ISO_TIMESTAMP,
+        batch=batch_size,
+    ).consume()
+    return summary.counters.properties_set
+
+
+def ensure_index(session: Any, prop: TemporalProperty) -> None:
+    session.run(prop.index.create_cypher()).consume()
@@ -0,0 +1,381 @@
+"""
+The medical QA agent shared by the stdio and SSE test agents.
+
+:class:`AgentTools` builds the LangChain tools – GraphDB, paging, batch,
+prepared templates and the typed fast‑path tools – on top of a
+``get_session`` callable, and :class:`BaseMedicalQAAgent` wires them to
+the LLM and the answer / plan caches.  A transport module only says how
+to reach the server: it passes its own ``get_session`` and names itself.
+
+Agents share their transport's one MCP session.  Each agent holds it
+(:meth:`MCPSessionManager.acquire`) until :meth:`BaseMedicalQAAgent.close`,
+and the session is closed when the last agent lets go.
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Callable
+
+# Imports for LLM and Tools
+from langchain_openai import ChatOpenAI
+from langchain.agents import Tool, initialize_agent
+from langchain_core.tools import StructuredTool, create_schema_from_function
+from my_doctor_assistant.agents.structured_chat.types import AgentType
+from my_doctor_assistant.agents.plan_cache import QueryPlanCache, get_plan_cache
+from my_doctor_assistant.agents.tracing import AgentTracingHandler
+from my_doctor_assistant.agents.semantic_cache import (
+    SemanticAnswerCache,
+    get_semantic_cache,
+    record_tool_call,
+    recording,
+)
+
+from my_doctor_assistant.mcp.prompts import domain_prompts as dp
+from my_doctor_assistant.mcp.session import MCPSessionManager, first_text
+from my_doctor_assistant.mcp.tools.cache import is_write_query
+from my_doctor_assistant.mcp.tools.clinical import FAST_PATH_TOOLS
+from my_doctor_assistant.mcp.tools.prepared import PREPARED_QUERIES
+from my_doctor_assistant.utils.helper import (
+    get_openai_api_key,
+    get_plan_cache_enabled,
+    get_semantic_cache_enabled,
+    lowercase_literals,
+)
+from my_doctor_assistant.utils.tracing import current_span, span
+
+# Retrieve and set OpenAI API key
+openai_api_key = get_openai_api_key()
+os.environ["OPENAI_API_KEY"] = openai_api_key
+
+# Tool names both servers publish
+TOOL_NAME = "GraphDB"
+PAGED_TOOL_NAME = "GraphDBPaged"
+NEXT_PAGE_TOOL_NAME = "GraphDBNextPage"
+PREPARED_TOOL_NAME = "GraphDBPrepared"
+BATCH_TOOL_NAME = "GraphDBBatch"
+
+PROMPT_URI_MAP = {
+    "schema":       "resource://neo4j-schema",
+    "vitals":       "resource://prompts/vitals-bp",
+    "appointments": "resource://prompts/appointments-billing",
+    "consultation": "resource://prompts/consultation-clinical",
+    "diagnoses":    "resource://prompts/diagnoses-conditions",
+    "treatment":    "resource://prompts/treatment-plans-history",
+    "medications":  "resource://prompts/medications-prescriptions",
+    "labs":         "resource://prompts/lab-results",
+}
+
+OFFLINE_PROMPT_MAP = {
+    "schema":       dp.MEDICAL_SCHEMA_PROMPT,
+    "vitals":       dp.VITALS_BLOOD_PRESSURE_PROMPT,
+    "appointments": dp.APPOINTMENTS_BILLING_PROMPT,
+    "consultation": dp.CONSULTATION_CLINICAL_PROMPT,
+    "diagnoses":    dp.DIAGNOSES_CONDITIONS_PROMPT,
+    "treatment":    dp.TREATMENT_PLANS_HISTORY_PROMPT,
+    "medications":  dp.MEDICATIONS_PRESCRIPTIONS_PROMPT,
+    "labs":         dp.LAB_RESULTS_PROMPT,
+}
+
+
+class AgentTools:
+    """The agent's MCP calls and LangChain tools, over ``get_session()``."""
+
+    def __init__(self, get_session: Callable[[], MCPSessionManager]) -> None:
+        """
+        Args:
+            get_session: Returns the transport's started session.  It is
+                called on every use, so the session can be swapped later.
+        """
+        self.get_session = get_session
+        self.get_domain_prompt = lru_cache(maxsize=8)(self._fetch_domain_prompt)
+
+    def _fetch_domain_prompt(self, kind: str = "schema") -> str:
+        """
+        Download the requested prompt slice from the MCP server once (LRU‑cached).
+        Falls back to the baked‑in constant if the server is not reachable.
+        """
+        uri = PROMPT_URI_MAP.get(kind, PROMPT_URI_MAP["schema"])
+        try:
+            return first_text(self.get_session().read_resource(uri))
+        except Exception:
+            # offline fallback
+            return OFFLINE_PROMPT_MAP.get(kind, OFFLINE_PROMPT_MAP["schema"])
+
+    # ── MCP calls ─────────────────────────────────────────────────────
+    def call_tool_text(self, name: str, args: dict, idempotent: bool = False) -> str:
+        """Call an MCP tool and return its text, without recording it."""
+        return first_text(self.get_session().call_tool(name, args, idempotent=idempotent))
+
+    def _call(self, name: str, args: dict, replayable: bool = True) -> str:
+        # a replayable call is a read, so it is also safe to retry
+        result = self.call_tool_text(name, args, idempotent=replayable)
+        record_tool_call(name, args, result, replayable=replayable)
+        return result
+
+    async def acall_tool_text(self, name: str, args: dict, idempotent: bool = False) -> str:
+        """Async :meth:`call_tool_text` on the same shared session."""
+        return first_text(await self.get_session().acall_tool(name, args, idempotent=idempotent))
+
+    async def _acall(self, name: str, args: dict, replayable: bool = True) -> str:
+        result = await self.acall_tool_text(name, args, idempotent=replayable)
+        record_tool_call(name, args, result, replayable=replayable)
+        return result
+
+    # ── GraphDB ───────────────────────────────────────────────────────
+    def graphdb_sync(self, query: str) -> str:
+        query = lowercase_literals(query)
+        return self._call(TOOL_NAME, {"query": query}, replayable=not is_write_query(query))
+
+    async def graphdb_async(self, query: str) -> str:
+        query = lowercase_literals(query)
+        return await self._acall(TOOL_NAME, {"query": query}, replayable=not is_write_query(query))
+
+    def make_graph_tool(self) -> Tool:
+        return Tool(
+            name=TOOL_NAME,
+            func=self.graphdb_sync,
+            coroutine=self.graphdb_async,
+            description="Execute Cypher against the medical Neo4j database.",
+        )
+
+    # ── paging ────────────────────────────────────────────────────────
+    def graphdb_paged_sync(self, query: str) -> str:
+        """First page of a large result plus a cursor for the rest."""
+        query = lowercase_literals(query)
+        return self._call(PAGED_TOOL_NAME, {"query": query}, replayable=False)  # result carries a cursor id
+
+    def graphdb_next_page_sync(self, cursor: str) -> str:
+        return self._call(NEXT_PAGE_TOOL_NAME, {"cursor": cursor.strip()}, replayable=False)
+
+    async def graphdb_paged_async(self, query: str) -> str:
+        query = lowercase_literals(query)
+        return await self._acall(PAGED_TOOL_NAME, {"query": query}, replayable=False)
+
+    async def graphdb_next_page_async(self, cursor: str) -> str:
+        return await self._acall(NEXT_PAGE_TOOL_NAME, {"cursor": cursor.strip()}, replayable=False)
+
+    def make_paged_tools(self) -> list[Tool]:
+        return [
+            Tool(
+                name=PAGED_TOOL_NAME,
+                func=self.graphdb_paged_sync,
+                coroutine=self.graphdb_paged_async,
+                description="Execute a read-only Cypher query that may return many rows; "
+                            "returns the first page and a cursor.",
+            ),
+            Tool(
+                name=NEXT_PAGE_TOOL_NAME,
+                func=self.graphdb_next_page_sync,
+                coroutine=self.graphdb_next_page_async,
+                description="Fetch the next page for a cursor returned by GraphDBPaged.",
+            ),
+        ]
+
+    # ── batch ─────────────────────────────────────────────────────────
+    def graphdb_batch_sync(self, queries: list[str], consistent: bool = False) -> str:
+        """Several independent Cypher queries in one round trip; one result per query."""
+        queries = [lowercase_literals(q) for q in queries]
+        return self._call(
+            BATCH_TOOL_NAME,
+            {"queries": queries, "consistent": consistent},
+            replayable=not any(is_write_query(q) for q in queries),
+        )
+
+    async def graphdb_batch_async(self, queries: list[str], consistent: bool = False) -> str:
+        """Several independent Cypher queries in one round trip; one result per query."""
+        queries = [lowercase_literals(q) for q in queries]
+        return await self._acall(
+            BATCH_TOOL_NAME,
+            {"queries": queries, "consistent": consistent},
+            replayable=not any(is_write_query(q) for q in queries),
+        )
+
+    def make_batch_tool(self) -> StructuredTool:
+        return StructuredTool.from_function(
+            func=self.graphdb_batch_sync,
+            coroutine=self.graphdb_batch_async,
+            name=BATCH_TOOL_NAME,
+            description="Execute several independent Cypher queries at once (e.g. vitals, "
+                        "diagnoses and prescriptions for one patient); returns one result per query. "
+                        "Set consistent=true to read them from the same snapshot.",
+        )
+
+    # ── prepared templates and typed tools ────────────────────────────
+    def graphdb_prepared_sync(self, name: str, params: dict | None = None) -> str:
+        """Run a named query template; params are passed as Cypher parameters."""
+        return self._call(PREPARED_TOOL_NAME, {"name": name, "params": params or {}})
+
+    async def graphdb_prepared_async(self, name: str, params: dict | None = None) -> str:
+        """Run a named query template; params are passed as Cypher parameters."""
+        return await self._acall(PREPARED_TOOL_NAME, {"name": name, "params": params or {}})
+
+    def make_prepared_tool(self) -> StructuredTool:
+        return StructuredTool.from_function(
+            func=self.graphdb_prepared_sync,
+            coroutine=self.graphdb_prepared_async,
+            name=PREPARED_TOOL_NAME,
+            description="Run a pre-validated query template by name instead of writing Cypher. "
+                        "Templates: " + "; ".join(t.signature for t in PREPARED_QUERIES.values()),
+        )
+
+    def make_fast_path_tools(self) -> list[StructuredTool]:
+        """One StructuredTool per typed server tool, with the same argument schema."""
+        def make(name: str, fn) -> StructuredTool:
+            def call(**kwargs) -> str:
+                return self._call(name, kwargs)
+            async def acall(**kwargs) -> str:
+                return await self._acall(name, kwargs)
+            return StructuredTool.from_function(
+                func=call,
+                coroutine=acall,
+                name=name,
+                description=fn.__doc__,
+                args_schema=create_schema_from_function(name, fn),
+            )
+        return [make(name, fn) for name, fn in FAST_PATH_TOOLS.items()]
+
+    def make_tools(self) -> list[Tool | StructuredTool]:
+        """Every tool the agent is given, in prompt order."""
+        return [
+            *self.make_fast_path_tools(),
+            self.make_prepared_tool(),
+            self.make_graph_tool(),
+            *self.make_paged_tools(),
+            self.make_batch_tool(),
+        ]
+
+
+# Agent Wrapper
+class BaseMedicalQAAgent:
+    """
+    Structured‑chat agent over the medical graph.  Subclasses set
+    ``tools`` (the transport's :class:`AgentTools`) and ``transport``.
+    """
+
+    tools: AgentTools
+    transport: str = "mcp"
+
+    def __init__(
+        self,
+        domain: str = "schema",
+        temperature: float = 0.0,
+        semantic_cache: bool | None = None,
+        plan_cache: bool | None = None,
+        verbose: bool = True,
+    ):
+        """
+        Args:
+            semantic_cache: Reuse answers to near‑identical questions
+                (defaults to ``SEMANTIC_CACHE_ENABLED``).
+            plan_cache: Replay the tool calls worked out for a question
+                with the same template (defaults to ``PLAN_CACHE_ENABLED``).
+            verbose: Print the agent's reasoning steps.
+        """
+        self.domain = domain
+        if semantic_cache is None:
+            semantic_cache = get_semantic_cache_enabled()
+        if plan_cache is None:
+            plan_cache = get_plan_cache_enabled()
+        self.answer_cache: SemanticAnswerCache | None = get_semantic_cache() if semantic_cache else None
+        self.plan_cache: QueryPlanCache | None = get_plan_cache() if plan_cache else None
+        # held open for the agent's lifetime, shared with the transport's other agents
+        self.session: MCPSessionManager | None = self.tools.get_session().acquire()
+        self.prompt = self.tools.get_domain_prompt(domain)
+        self.tracing = AgentTracingHandler()
+        self.llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=temperature,
+            # top_p=1,
+            # n=1,
+            callbacks=[self.tracing],
+        )
+        self.agent = initialize_agent(
+            tools=self.tools.make_tools(),
+            llm=self.llm,
+            agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=verbose,
+            handle_parsing_errors=True,
+        )
+
+    def _span_attributes(self) -> dict[str, Any]:
+        return {"agent.domain": self.domain, "mcp.transport": self.transport}
+
+    def _agent_prompt(self, question: str) -> str:
+        return f"{self.prompt.format(user_question=question)}\nUser question: {question}"
+
+    def answer(self, question: str) -> str:
+        with span("agent.answer", attributes=self._span_attributes()) as s:
+            if self.answer_cache is None:
+                return self._answer(question)
+            cached = self.answer_cache.lookup(question, scope=self.domain, replay=self.tools.call_tool_text)
+            if cached is not None:
+                s.set("agent.cache", "answer")
+                return cached
+            with recording() as dependencies:
+                answer = self._answer(question)
+            self.answer_cache.store(question, answer, dependencies, scope=self.domain)
+            return answer
+
+    def _answer(self, question: str) -> str:
+        if self.plan_cache is not None:
+            answer = self.plan_cache.execute(
+                question, self.tools.call_tool_text, lambda p: self.llm.invoke(p).content, scope=self.domain
+            )
+            if answer is not None:
+                current_span().set("agent.cache", "plan")
+                return answer
+        prompt = self._agent_prompt(question)
+        if self.plan_cache is None:
+            return self.agent.run(prompt, callbacks=[self.tracing])
+        with recording() as calls:
+            answer = self.agent.run(prompt, callbacks=[self.tracing])
+        self.plan_cache.store(question, calls, scope=self.domain)
+        return answer
+
+    async def aanswer(self, question: str) -> str:
+        """
+        Async :meth:`answer`: LLM calls, tool calls and cache replays are
+        awaited on the caller's loop, so many questions can be in flight
+        at once over the one shared MCP session.
+        """
+        with span("agent.answer", attributes=self._span_attributes()) as s:
+            if self.answer_cache is None:
+                return await self._aanswer(question)
+            cached = await self.answer_cache.alookup(
+                question, scope=self.domain, replay=self.tools.acall_tool_text
+            )
+            if cached is not None:
+                s.set("agent.cache", "answer")
+                return cached
+            with recording() as dependencies:
+                answer = await self._aanswer(question)
+            self.answer_cache.store(question, answer, dependencies, scope=self.domain)
+            return answer
+
+    async def _aanswer(self, question: str) -> str:
+        if self.plan_cache is not None:
+            answer = await self.plan_cache.aexecute(
+                question, self.tools.acall_tool_text, self._aphrase, scope=self.domain
+            )
+            if answer is not None:
+                current_span().set("agent.cache", "plan")
+                return answer
+        prompt = self._agent_prompt(question)
+        if self.plan_cache is None:
+            return (await self.agent.ainvoke({"input": prompt}, {"callbacks": [self.tracing]}))["output"]
+        with recording() as calls:
+            answer = (await self.agent.ainvoke({"input": prompt}, {"callbacks": [self.tracing]}))["output"]
+        self.plan_cache.store(question, calls, scope=self.domain)
+        return answer
+
+    async def _aphrase(self, prompt: str) -> str:
+        return (await self.llm.ainvoke(prompt)).content
+
+    def close(self) -> None:
+        """
+        Release this agent's hold on the shared MCP session; the session
+        (for stdio, the server subprocess) stops once no agent holds it.
+        """
+        if self.session is not None:
+            self.session.release()
+            self.session = None
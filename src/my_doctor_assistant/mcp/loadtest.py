@@ -0,0 +1,285 @@
+"""
+Open‑loop MCP load generator for the SSE server.
+
+Each of N clients holds its own MCP session and works through a fixed
+schedule: the target rate is split evenly across clients with staggered
+phases.  Like an agent, a client has one call in flight at a time; when a
+response is late it sends the next request as soon as it can, falling
+behind schedule rather than slowing the schedule down.
+
+Latency is reported twice:
+
+* **service** – from when the request was actually sent;
+* **corrected** – from when it was *due*.  Requests held back by a slow
+  response would have waited in a real deployment, and timing them from
+  their late send hides that wait (coordinated omission).
+
+Clients stop sending when the run ends; requests that fell due but were
+never sent are reported as ``unsent``.
+
+Requests come from a weighted mix of operations (GraphDB, prepared and
+fast‑path tool calls, resource reads).  ``<pid>``, ``<name>`` and
+``<month>`` in the arguments are filled in per request, with patient ids
+drawn from ``1..patients`` to match a ``my-doc-assist seed`` graph.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from my_doctor_assistant.mcp.session import first_text
+from my_doctor_assistant.utils.helper import percentile
+
+# the server's tool names; importing the server module would build a FastMCP app
+TOOL_NAME = "GraphDB"
+PREPARED_TOOL_NAME = "GraphDBPrepared"
+
+_NAMES = ("mensah", "james smith", "kofi", "patel", "o'brien", "ama owusu", "li wei", "garcia")
+_MONTHS = tuple(f"{y}-{m:02d}" for y in (2023, 2024, 2025) for m in range(1, 13))
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    weight: float
+    tool: str | None = None
+    resource: str | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+    def bind(self, rng: random.Random, patients: int) -> dict[str, Any]:
+        values = {
+            "<pid>": rng.randint(1, patients),
+            "<name>": rng.choice(_NAMES),
+            "<month>": rng.choice(_MONTHS),
+        }
+
+        def fill(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {k: fill(v) for k, v in value.items()}
+            if not isinstance(value, str):
+                return value
+            if value in values:
+                return values[value]  # a bare placeholder keeps the value's type
+            for token, v in values.items():
+                value = value.replace(token, str(v))
+            return value
+
+        return fill(self.args)
+
+    async def call(self, session: ClientSession, rng: random.Random, patients: int) -> str | None:
+        """Run the operation; returns an error code, or ``None`` on success."""
+        if self.resource:
+            await session.read_resource(self.resource)
+            return None
+        result = await session.call_tool(self.tool, self.bind(rng, patients))
+        if result.isError:
+            return "tool_error"
+        text = first_text(result)
+        if text.lstrip().startswith('{"error"'):
+            try:
+                return json.loads(text)["error"].get("code") or "error"
+            except (ValueError, AttributeError):
+                return "error"
+        return None
+
+
+DEFAULT_MIX = (
+    Operation(
+        "cypher.latest_vitals", 25, tool=TOOL_NAME,
+        args={"query": (
+            "MATCH (p:Patient {patient_id: <pid>})-[:HAS_MEASUREMENT]->(vs:VitalSignsRecord) "
+            "RETURN vs.vital_recorded_date_time, vs.vital_heart_rate "
+            "ORDER BY vs.vital_recorded_dt DESC LIMIT 5"
+        )},
+    ),
+    Operation(
+        "cypher.appointments", 10, tool=TOOL_NAME,
+        args={"query": (
+            "MATCH (p:Patient {patient_id: <pid>})-[:HAS_APPOINTMENT]->(a:Appointment) "
+            "RETURN a.status AS status, count(a) AS n"
+        )},
+    ),
+    Operation(
+        "prepared.max_systolic_bp", 15, tool=PREPARED_TOOL_NAME,
+        args={"name": "max_systolic_bp", "params": {"pid": "<pid>", "month": "<month>"}},
+    ),
+    Operation("fast.latest_vitals", 15, tool="latest_vitals", args={"patient_id": "<pid>"}),
+    Operation("fast.current_prescriptions", 10, tool="current_prescriptions", args={"patient_id": "<pid>"}),
+    Operation("fast.resolve_person", 10, tool="resolve_person", args={"name": "<name>"}),
+    Operation("resource.schema", 10, resource="resource://neo4j-schema"),
+    Operation("resource.vitals_prompt", 5, resource="resource://prompts/vitals-bp"),
+)
+
+
+def load_mix(path: str) -> tuple[Operation, ...]:
+    """
+    Read a mix from JSON: a list of ``{"name", "weight", "tool", "args"}``
+    or ``{"name", "weight", "resource"}`` objects.
+    """
+    with open(path, encoding="utf-8") as fh:
+        entries = json.load(fh)
+    mix = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or bool(entry.get("tool")) == bool(entry.get("resource")):
+            raise ValueError(f"mix entry {i}: needs exactly one of 'tool' or 'resource'")
+        mix.append(Operation(
+            name=entry.get("name") or entry.get("tool") or entry["resource"],
+            weight=float(entry.get("weight", 1)),
+            tool=entry.get("tool"),
+            resource=entry.get("resource"),
+            args=entry.get("args") or {},
+        ))
+    if not mix or sum(op.weight for op in mix) <= 0:
+        raise ValueError("the mix needs at least one operation with a positive weight")
+    return tuple(mix)
+
+
+@dataclass(frozen=True)
+class Sample:
+    operation: str
+    due: float
+    sent: float
+    done: float
+    error: str | None
+
+    @property
+    def service_ms(self) -> float:
+        return (self.done - self.sent) * 1000
+
+    @property
+    def corrected_ms(self) -> float:
+        return (self.done - self.due) * 1000
+
+
+def _latency(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    return {
+        **{f"p{q}": round(percentile(values, q), 1) for q in (50, 95, 99)},
+        "max": round(max(values), 1),
+    }
+
+
+@dataclass
+class LoadReport:
+    clients: int
+    target_rate: float
+    duration: float
+    window: tuple[float, float]
+    samples: list[Sample]
+    unsent: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        start, end = self.window
+        measured = [s for s in self.samples if start <= s.due < end]
+        errors = [s for s in measured if s.error]
+        by_code: dict[str, int] = {}
+        for s in errors:
+            by_code[s.error] = by_code.get(s.error, 0) + 1
+        operations = {}
+        for name in sorted({s.operation for s in measured}):
+            ops = [s for s in measured if s.operation == name]
+            operations[name] = {
+                "requests": len(ops),
+                "errors": sum(1 for s in ops if s.error),
+                "corrected_ms": _latency([s.corrected_ms for s in ops]),
+            }
+        return {
+            "clients": self.clients,
+            "target_rate": self.target_rate,
+            "duration_s": self.duration,
+            "requests": len(measured),
+            "throughput_rps": round(sum(1 for s in self.samples if start <= s.done < end) / self.duration, 2),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(measured), 4) if measured else 0.0,
+            "errors_by_code": by_code,
+            "unsent": self.unsent,
+            "max_lag_ms": round(max((s.sent - s.due for s in measured), default=0.0) * 1000, 1),
+            "service_ms": _latency([s.service_ms for s in measured]),
+            "corrected_ms": _latency([s.corrected_ms for s in measured]),
+            "operations": operations,
+        }
+
+
+async def run_load(
+    url: str,
+    mix: tuple[Operation, ...] = DEFAULT_MIX,
+    clients: int = 10,
+    rate: float = 20.0,
+    duration: float = 60.0,
+    warmup: float = 5.0,
+    patients: int = 100,
+    timeout: float = 30.0,
+    seed: int = 0,
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> LoadReport:
+    """
+    Open *clients* sessions to the SSE server at *url* and drive *rate*
+    requests/s for *warmup* + *duration* seconds; only requests due after
+    the warm‑up are reported.
+    """
+    samples: list[Sample] = []
+    unsent = 0
+    weights = [op.weight for op in mix]
+    interval = clients / rate  # per client
+
+    async with AsyncExitStack() as stack:
+        sessions = []
+        for _ in range(clients):
+            read, write = await stack.enter_async_context(sse_client(url))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions.append(session)
+
+        t0 = time.perf_counter()
+        window = (t0 + warmup, t0 + warmup + duration)
+
+        async def client(i: int, session: ClientSession) -> None:
+            nonlocal unsent
+            rng = random.Random(f"{seed}:{i}")
+            due = t0 + interval * i / clients  # staggered so clients do not fire together
+            while due < window[1] and time.perf_counter() < window[1]:
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                op = rng.choices(mix, weights)[0]
+                sent = time.perf_counter()
+                try:
+                    error = await asyncio.wait_for(op.call(session, rng, patients), timeout)
+                except asyncio.TimeoutError:
+                    error = "timeout"
+                except Exception as exc:  # noqa: BLE001
+                    error = type(exc).__name__
+                samples.append(Sample(op.name, due, sent, time.perf_counter(), error))
+                due += interval
+            # the backlog a client behind schedule never got to
+            first = max(due, due + math.ceil((window[0] - due) / interval) * interval)
+            unsent += max(0, math.ceil((window[1] - first) / interval))
+
+        async def ticker() -> None:
+            while True:
+                await asyncio.sleep(5)
+                now = time.perf_counter()
+                recent = [s for s in samples if s.done > now - 5]
+                progress({
+                    "elapsed_s": round(now - t0),
+                    "completed": len(samples),
+                    "recent_rps": round(len(recent) / 5, 1),
+                    "recent_errors": sum(1 for s in recent if s.error),
+                })
+
+        tick = asyncio.create_task(ticker()) if progress else None
+        try:
+            await asyncio.gather(*(client(i, s) for i, s in enumerate(sessions)))
+        finally:
+            if tick:
+                tick.cancel()
+    return LoadReport(clients, rate, duration, window, samples, unsent)
@@ -20,12 +20,12 @@ Database schema (vitals slice only):
    - patient_id · patient_name · patient_gender · patient_date_of_birth
 
 2) ({{VitalSignsRecord}})
-   - record_id · vital_recorded_date_time · vital_oxygen_saturation
+   - record_id · vital_recorded_date_time · vital_recorded_dt (datetime) · vital_oxygen_saturation
    - vital_heart_rate · vital_blood_glucose · vital_temperature
    - vital_height · vital_weight
 
 3) ({{BloodPressureReading}})
-   - record_id · bp_systolic · bp_diastolic · bp_recorded_date_time
+   - record_id · bp_systolic · bp_diastolic · bp_recorded_date_time · bp_recorded_dt (datetime)
 
 4) ({{HealthcareProvider}})
    - provider_id · provider_full_name
@@ -43,7 +43,7 @@ Key patterns
 
 • Highest systolic BP in a period  
   MATCH (p:Patient {{patient_id:$pid}})-[:HAS_MEASUREMENT]->(:VitalSignsRecord)-[:HAS_BLOOD_PRESSURE]->(bp)  
-  WHERE bp.bp_recorded_date_time CONTAINS '2023-12'  
+  WHERE bp.bp_recorded_dt >= datetime('2023-12-01') AND bp.bp_recorded_dt < datetime('2024-01-01')  
   RETURN MAX(toInteger(bp.bp_systolic)) AS maxSys
 
 • Provider who recorded a specific vital record  
@@ -51,11 +51,12 @@ Key patterns
   MATCH (vs)-[:RECORDED_BY]->(hp)  
   RETURN hp.provider_full_name
 
-Name search rule – if the user supplies a name, substring‑match it against both Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive). Ask for clarification only when multiple matches exist.
+Name search rule – if the user supplies a person's name, call resolve_person(name) first and query by the returned patient_id / provider_id. Ask for clarification only when several candidates score about the same.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
 - Lower‑case every literal you place inside quotes in Cypher.
+- Filter dates on the *_dt datetime properties with range predicates (>= start AND < end), not CONTAINS on the string timestamps.
 - If no matching records are found, say so plainly.
 
 Now answer: “{user_question}”
@@ -72,7 +73,7 @@ Relevant nodes
 1) ({{:Patient}}) — patient_id · patient_name
 2) ({{:HealthcareProvider}}) — provider_id · provider_full_name
 3) ({{:Appointment}})
-   - appointment_id · appointment_date_time · appointment_nature · appointment_type
+   - appointment_id · appointment_date_time · appointment_dt (datetime) · appointment_nature · appointment_type
    - status · priority · severity · is_rescheduled · is_missed
    - cancellation_date · cancellation_reason · treatment_plan_id · parent_id
 4) ({{:AppointmentFinancial}}) — subTotal · discount · totalTax · total · payment_id
@@ -88,14 +89,15 @@ Relationships
 Query patterns
 • Count missed appointments in a date range  
   MATCH (p:Patient {{patient_id: toInteger($pid)}})-[:HAS_APPOINTMENT]->(a)  
-  WHERE a.is_missed = 'true' AND a.appointment_date_time STARTS WITH $yyyy_mm  
+  WHERE a.is_missed = 'true' AND a.appointment_dt >= datetime($from) AND a.appointment_dt < datetime($to)  
   RETURN COUNT(a) AS missed
 
-Name search rule – if the user supplies a name, substring‑match it against both Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive). Ask for clarification only when multiple matches exist.
+Name search rule – if the user supplies a person's name, call resolve_person(name) first and query by the returned patient_id / provider_id. Ask for clarification only when several candidates score about the same.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
 - Lower‑case every literal you place inside quotes in Cypher.
+- Filter dates on the *_dt datetime properties with range predicates (>= start AND < end), not CONTAINS on the string timestamps.
 - If no matching records are found, say so plainly.
 
 Now answer: “{user_question}”
@@ -136,7 +138,7 @@ Typical Cypher snippets
   WHERE c.started_at STARTS WITH $yyyy_mm_dd  
   RETURN c.consultation_id, c.status
 
-Name search rule – if the user supplies a name, substring‑match it against both Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive). Ask for clarification only when multiple matches exist.
+Name search rule – if the user supplies a person's name, call resolve_person(name) first and query by the returned patient_id / provider_id. Ask for clarification only when several candidates score about the same.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
@@ -183,7 +185,7 @@ Guidelines
   MATCH (d:Diagnosis {{diagnosis_identifier:$id}})-[:HAS_TIMELINE]->(t)
   RETURN t.diagnosis_verified_on AS verificationTime
 
-Name search rule – if the user supplies a name, substring‑match it against both Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive). Ask for clarification only when multiple matches exist.
+Name search rule – if the user supplies a person's name, call resolve_person(name) first and query by the returned patient_id / provider_id. Ask for clarification only when several candidates score about the same.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
@@ -222,7 +224,7 @@ RETURN tp.treatment_plan_id, tp.lifestyleAdvice
 MATCH (tp:TreatmentPlan {{treatment_plan_id: toInteger($tid)}})-[:HAS_HISTORY]->(th)
 RETURN th.activityType, th.remarks ORDER BY th.created_at DESC
 
-Name search rule – if the user supplies a name, substring‑match it against both Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive). Ask for clarification only when multiple matches exist.
+Name search rule – if the user supplies a person's name, call resolve_person(name) first and query by the returned patient_id / provider_id. Ask for clarification only when several candidates score about the same.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
@@ -237,7 +239,7 @@ MEDICATIONS_PRESCRIPTIONS_PROMPT = """
 You are a medication‑management assistant for a Neo4j medical graph.
 
 Nodes
-• ({{:Prescription}}) — prescription_id · prescription_status · prescription_intervals · prescription_timings · prescription_instructions · prescription_started_at · prescription_ended_at · prescription_created_at · prescription_deleted_at · prescription_day · prescription_period · prescription_holded_at · prescription_is_verified · prescription_verified_on
+• ({{:Prescription}}) — prescription_id · prescription_status · prescription_intervals · prescription_timings · prescription_instructions · prescription_started_at · prescription_started_dt (datetime) · prescription_ended_at · prescription_created_at · prescription_created_dt (datetime) · prescription_deleted_at · prescription_day · prescription_period · prescription_holded_at · prescription_is_verified · prescription_verified_on
 • ({{:Medication}}) — medication_name · medication_identifier
 • ({{:TreatmentPlan}}) — treatment_plan_id
 • ({{:Patient}}) · ({{:HealthcareProvider}})
@@ -274,13 +276,14 @@ Query snippets
   RETURN hp.provider_full_name
 
 Name search rule –
-- substring‑match user names against Patient.patient_name and HealthcareProvider.provider_full_name (case‑insensitive),
+- resolve patient and provider names with resolve_person(name) and query by the returned id,
 - substring‑match medication names against Medication.medication_name (case‑insensitive).
 Ask for clarification only when multiple matches exist.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
 - Lower‑case every literal you place inside quotes in Cypher.
+- Filter dates on the *_dt datetime properties with range predicates (>= start AND < end), not CONTAINS on the string timestamps.
 - If no matching records are found, say so plainly.
 
 Now answer: '{user_question}'
@@ -296,7 +299,7 @@ Nodes
 • ({{:Appointment}}) — appointment_id · appointment_date_time · status · priority · severity
 • ({{:InvestigationService}}) — service_id · service_name · sub_category · category · gender_category · reference_range · gender · age_range · unit · remarks · price · service_type · is_group · created_at · deleted_at · report_type
 • ({{:InvestigationOrder}}) — investigation_id · created_at · deleted_at · status
-• ({{:InvestigationReport}}) — report_id · report_value · report_status · report_type · conclusion · findings · comments · report_date · uploads · created_at · deleted_at
+• ({{:InvestigationReport}}) — report_id · report_value · report_status · report_type · conclusion · findings · comments · report_date · report_dt (datetime) · uploads · created_at · deleted_at
 • ({{:TreatmentPlan}}) — treatment_plan_id  (investigations may be linked via HAS_INVESTIGATION)
 • ({{:TreatmentPlanHistory}}) — history_id  (investigations may be linked via HAS_INVESTIGATION)
 • ({{:HealthcareProvider}}) — provider_id · provider_full_name
@@ -331,20 +334,19 @@ Query snippets
   RETURN s.service_name, s.category
 
 • All reports added by a provider in a given year  
-  MATCH (hp:HealthcareProvider)  
-  WHERE toLower(hp.provider_full_name) CONTAINS toLower($docName)  
-  MATCH (hp)-[:ADDED_REPORT]->(r)  
-  WHERE r.report_date STARTS WITH $year  
+  MATCH (hp:HealthcareProvider {{provider_id: $providerId}})-[:ADDED_REPORT]->(r)   // id from resolve_person  
+  WHERE r.report_dt >= datetime($year + '-01-01') AND r.report_dt < datetime($year + '-01-01') + duration({{years: 1}})  
   RETURN r.report_id, r.report_value, r.report_date
 
 Name search rule –
-- substring‑match patient and provider names case‑insensitively.
+- resolve patient and provider names with resolve_person(name) and query by the returned id.
 - substring‑match service names case‑insensitively.
 Ask for clarification only when multiple matches exist.
 
 Output constraints
 - Return only the final answer (plain text or table) unless a multi‑step query is required.
 - Lower‑case every literal you place inside quotes in Cypher.
+- Filter dates on the *_dt datetime properties with range predicates (>= start AND < end), not CONTAINS on the string timestamps.
 - If no matching records are found, say so plainly.
 
 Now answer: '{user_question}'
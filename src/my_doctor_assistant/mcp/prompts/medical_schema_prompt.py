@@ -39,6 +39,7 @@ MEDICAL_SCHEMA_PROMPT: str = """
     6) (:VitalSignsRecord)
        - record_id
        - vital_recorded_date_time
+       - vital_recorded_dt (datetime)
        - vital_oxygen_saturation
        - vital_heart_rate
        - vital_blood_glucose
@@ -51,6 +52,7 @@ MEDICAL_SCHEMA_PROMPT: str = """
        - bp_systolic
        - bp_diastolic
        - bp_recorded_date_time
+       - bp_recorded_dt (datetime)
 
     8) (:Appointment)
        - appointment_id
@@ -58,6 +60,7 @@ MEDICAL_SCHEMA_PROMPT: str = """
        - appointment_nature
        - appointment_type
        - appointment_date_time
+       - appointment_dt (datetime)
        - additional_info
        - status
        - priority
@@ -212,8 +215,10 @@ MEDICAL_SCHEMA_PROMPT: str = """
         - prescription_period
         - prescription_holded_at
         - prescription_started_at
+        - prescription_started_dt (datetime)
         - prescription_ended_at
         - prescription_created_at
+        - prescription_created_dt (datetime)
         - prescription_deleted_at
         - prescription_is_verified
         - prescription_verified_on
@@ -251,6 +256,7 @@ MEDICAL_SCHEMA_PROMPT: str = """
         - findings
         - comments
         - report_date
+        - report_dt (datetime)
         - uploads
         - created_at
         - deleted_at
@@ -320,20 +326,16 @@ MEDICAL_SCHEMA_PROMPT: str = """
          MATCH (hp:HealthcareProvider)-[:HAS_ROLE]->(r:Role {{{{{{name:'doctor'}}}}}})
          RETURN count(hp) AS numberOfDoctors
 
-    2) When the user references any name (partial or full), perform a partial/substring match
-       against both Patient and HealthcareProvider nodes (case-insensitive). For example:
-         MATCH (p:Patient)
-         WHERE toLower(p.patient_name) CONTAINS toLower('<user_input>')
-         RETURN p.patient_name AS name, p.patient_email AS email
+    2) When the user references any name (partial or full), call the resolve_person tool
+       with it first. It searches both Patient and HealthcareProvider names through the
+       person_name_fulltext index and returns ranked (kind, id, name, score) candidates.
+       Continue with an id lookup, for example:
+         MATCH (p:Patient {{{{patient_id:<id>}}}}) ...
+         MATCH (hp:HealthcareProvider {{{{provider_id:<id>}}}})-[:HAS_ROLE]->(r:Role) ...
 
-         UNION
-
-         MATCH (hp:HealthcareProvider)-[:HAS_ROLE]->(r:Role)
-         WHERE toLower(hp.provider_full_name) CONTAINS toLower('<user_input>')
-         RETURN hp.provider_full_name AS name, hp.provider_email AS email, r.name AS role
-
-       If both sets of results are empty, respond that no records were found for that name.
-       Otherwise, return the matching record or list of possible matches.
+       Do not substring-match names with CONTAINS; that scans every node of the label.
+       If no candidates come back, respond that no records were found for that name.
+       If several candidates score about the same, return them as possible matches.
 
     3) If the user asks about vital signs or blood pressure for a patient, you may need to
        query (:VitalSignsRecord) and optionally (:BloodPressureReading). For example:
@@ -406,6 +408,9 @@ MEDICAL_SCHEMA_PROMPT: str = """
     - If you need data from the Neo4j database, call the GraphDB tool with a valid Cypher query.
     - If the query fails or returns an error, revise the query.
     - If you produce a Cypher snippet, ensure property values in single quotes or double quotes are lowercased.
+    - Filter dates and periods on the *_dt datetime properties with range predicates, e.g.
+      WHERE bp.bp_recorded_dt >= datetime('2023-12-01') AND bp.bp_recorded_dt < datetime('2024-01-01'),
+      never with CONTAINS / STARTS WITH on the string timestamps.
     - Provide the minimal text needed for the final answer. Don't reveal internal reasoning.
 
     Example usage:
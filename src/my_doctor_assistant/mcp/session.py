@@ -0,0 +1,278 @@
+"""
+Long‑lived MCP client session shared by the test agents.
+
+Opening a transport and running ``initialize()`` for every tool call makes
+a ReAct loop pay one handshake per step.  :class:`MCPSessionManager` keeps a
+single initialised ``ClientSession`` open on a background event loop for
+as long as the agent lives, reconnects when the transport dies and lets any
+number of threads or event loops multiplex calls over that one session.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, AsyncContextManager, Awaitable, Callable, TypeVar
+
+import anyio
+import mcp.types as types
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+
+from my_doctor_assistant.utils.helper import get_mcp_call_timeout
+from my_doctor_assistant.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class MCPSessionManager:
+    """Keep one initialised MCP ``ClientSession`` alive on a background loop."""
+
+    def __init__(
+        self,
+        connect: Callable[[], AsyncContextManager[tuple[Any, Any]]],
+        *,
+        name: str = "mcp",
+        call_timeout: float | None = None,
+        connect_timeout: float = 10.0,
+        ping_interval: float = 30.0,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            connect: Zero‑argument factory returning the transport context
+                manager, e.g. ``lambda: sse_client(url)``.  It is re‑invoked
+                on every reconnect.
+            name: Label used for the background thread and log messages.
+            call_timeout: Seconds to wait for a single response
+                (defaults to ``MCP_CALL_TIMEOUT``).
+            connect_timeout: Seconds a call waits for a live session.
+            ping_interval: Idle seconds between liveness pings.
+            reconnect_delay: Initial back‑off between reconnect attempts.
+            max_reconnect_delay: Upper bound for the exponential back‑off.
+        """
+        self._connect = connect
+        self.name = name
+        self.call_timeout = call_timeout if call_timeout is not None else get_mcp_call_timeout()
+        self.connect_timeout = connect_timeout
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._supervisor: asyncio.Future | None = None
+        self._session: ClientSession | None = None
+        self._connected = asyncio.Event()
+        self._reset = asyncio.Event()
+        self._closing = False
+        self._holders = 0
+        self._start_lock = threading.Lock()
+
+    # ── lifecycle ─────────────────────────────────────────────────────
+    def start(self) -> "MCPSessionManager":
+        """Start the background loop and begin connecting (idempotent)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return self
+            self._closing = False
+            self._loop = asyncio.new_event_loop()
+            # asyncio events bind to the first loop that waits on them, and a
+            # closed session's loop is gone, so every start gets fresh ones
+            self._connected = asyncio.Event()
+            self._reset = asyncio.Event()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name=f"{self.name}-session", daemon=True
+            )
+            self._thread.start()
+            self._supervisor = asyncio.run_coroutine_threadsafe(self._supervise(), self._loop)
+            atexit.register(self.close)
+        return self
+
+    def acquire(self) -> "MCPSessionManager":
+        """Start the session and keep it open until the matching :meth:`release`."""
+        with self._start_lock:
+            self._holders += 1
+        return self.start()
+
+    def release(self, timeout: float = 5.0) -> None:
+        """Drop one :meth:`acquire`; the last holder to release closes the session."""
+        with self._start_lock:
+            self._holders = max(self._holders - 1, 0)
+        self._stop(timeout, only_unheld=True)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close the session, stop the background loop and join its thread."""
+        self._stop(timeout)
+
+    def _stop(self, timeout: float, only_unheld: bool = False) -> None:
+        with self._start_lock:
+            if self._thread is None or (only_unheld and self._holders):
+                return
+            self._closing = True
+            loop, thread, supervisor = self._loop, self._thread, self._supervisor
+            self._thread = None
+        loop.call_soon_threadsafe(self._request_reset)
+        try:
+            supervisor.result(timeout)
+        except Exception:  # noqa: BLE001
+            supervisor.cancel()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+        atexit.unregister(self.close)
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    # ── public API: async (any event loop) ────────────────────────────
+    # A call whose transport dies after the request went out may or may not
+    # have run on the server, so only *idempotent* tool calls (and resource
+    # reads) are replayed on the reconnected session; see _with_session.
+    async def acall_tool(
+        self, name: str, arguments: dict[str, Any] | None = None, *, idempotent: bool = False
+    ) -> types.CallToolResult:
+        with self._span(name) as s:
+            result = await self._await(
+                lambda session: _call_tool(session, name, arguments, s.traceparent), idempotent
+            )
+            if result.isError:
+                s.set_error("tool_error")
+            return result
+
+    async def aread_resource(self, uri: str) -> types.ReadResourceResult:
+        return await self._await(lambda s: s.read_resource(uri), idempotent=True)
+
+    # ── public API: blocking ──────────────────────────────────────────
+    def call_tool(
+        self, name: str, arguments: dict[str, Any] | None = None, *, idempotent: bool = False
+    ) -> types.CallToolResult:
+        with self._span(name) as s:
+            result = self._block(
+                lambda session: _call_tool(session, name, arguments, s.traceparent), idempotent
+            )
+            if result.isError:
+                s.set_error("tool_error")
+            return result
+
+    def read_resource(self, uri: str) -> types.ReadResourceResult:
+        return self._block(lambda s: s.read_resource(uri), idempotent=True)
+
+    # ── internals ─────────────────────────────────────────────────────
+    def _span(self, tool: str):
+        # opened in the caller's context, where the agent's current span lives
+        return span(f"mcp.call {tool}", "client", {"mcp.tool": tool, "mcp.session": self.name})
+
+    def _submit(self, fn: Callable[[ClientSession], Awaitable[T]], idempotent: bool):
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._with_session(fn, idempotent), self._loop)
+
+    async def _await(self, fn: Callable[[ClientSession], Awaitable[T]], idempotent: bool) -> T:
+        if asyncio.get_running_loop() is self._loop:
+            return await self._with_session(fn, idempotent)
+        return await asyncio.wrap_future(self._submit(fn, idempotent))
+
+    def _block(self, fn: Callable[[ClientSession], Awaitable[T]], idempotent: bool) -> T:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Blocking MCP call issued from the session loop; use the async API.")
+        return self._submit(fn, idempotent).result()
+
+    async def _wait_for_session(self) -> ClientSession:
+        try:
+            await asyncio.wait_for(self._connected.wait(), self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"MCP server ({self.name}) is not reachable") from None
+        return self._session
+
+    async def _with_session(self, fn: Callable[[ClientSession], Awaitable[T]], idempotent: bool) -> T:
+        # One transparent retry on the freshly reconnected session when the
+        # transport died: always if the request could not even be written
+        # (the server never saw it), otherwise only for idempotent calls, so
+        # a write is never applied twice.
+        for attempt in range(2):
+            session = await self._wait_for_session()
+            try:
+                return await fn(session)
+            except McpError:
+                raise  # protocol‑level error, the session itself is fine
+            except Exception as exc:  # noqa: BLE001
+                if self._session is session:
+                    logger.warning("MCP session (%s) failed: %r; reconnecting", self.name, exc)
+                    self._request_reset()
+                unsent = isinstance(exc, (anyio.ClosedResourceError, anyio.BrokenResourceError))
+                if attempt or not (idempotent or unsent):
+                    raise
+        raise AssertionError("unreachable")
+
+    def _request_reset(self) -> None:
+        self._session = None
+        self._connected.clear()
+        self._reset.set()
+
+    async def _supervise(self) -> None:
+        delay = self.reconnect_delay
+        while not self._closing:
+            try:
+                async with self._connect() as streams:
+                    async with ClientSession(
+                        streams[0],
+                        streams[1],
+                        read_timeout_seconds=timedelta(seconds=self.call_timeout),
+                    ) as session:
+                        await session.initialize()
+                        self._reset.clear()
+                        self._session = session
+                        self._connected.set()
+                        delay = self.reconnect_delay
+                        await self._watch(session)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("MCP session (%s) dropped: %r", self.name, exc)
+            finally:
+                self._session = None
+                self._connected.clear()
+            if self._closing:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _watch(self, session: ClientSession) -> None:
+        """Return when a reset is requested or the session stops answering pings."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._reset.wait(), self.ping_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), self.connect_timeout)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("MCP session (%s) missed a ping: %s", self.name, exc)
+                return
+
+
+def first_text(result: types.CallToolResult | types.ReadResourceResult) -> str:
+    """Return the text of the first content block of a tool/resource result."""
+    blocks = result.content if isinstance(result, types.CallToolResult) else result.contents
+    if not blocks:
+        return "No content returned."
+    return getattr(blocks[0], "text", str(blocks[0]))
+
+
+async def _call_tool(
+    session: ClientSession, name: str, arguments: dict[str, Any] | None, traceparent: str | None
+) -> types.CallToolResult:
+    """``session.call_tool`` that also sends *traceparent* in the request's ``_meta``."""
+    if traceparent is None:
+        return await session.call_tool(name, arguments)
+    params = types.CallToolRequestParams(
+        name=name, arguments=arguments, _meta=types.RequestParams.Meta(traceparent=traceparent)
+    )
+    return await session.send_request(
+        types.ClientRequest(types.CallToolRequest(method="tools/call", params=params)),
+        types.CallToolResult,
+    )
@@ -6,54 +6,122 @@ The server now speaks SSE/HTTP instead of stdio.
 """
 
 import os, re 
+import uvicorn
 from mcp.server.fastmcp import FastMCP
-from typing import List
-from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from typing import Any, Dict, List, Optional
 from my_doctor_assistant.mcp.prompts import domain_prompts as dp
+from my_doctor_assistant.mcp.tools.graphdb import (
+    cache_stats,
+    fetch_next_page_async,
+    open_paged_query_async,
+    prepared_queries,
+    run_cypher_batch_async,
+    run_cypher_query_async,
+    run_prepared_query_async,
+)
+from my_doctor_assistant.mcp.tools.clinical import FAST_PATH_TOOLS
+from my_doctor_assistant.mcp.tools.prepared import PREPARED_QUERIES
+from my_doctor_assistant.mcp.tools.tracing import traced_tool
+from my_doctor_assistant.utils.tracing import set_service_name
+from my_doctor_assistant.mcp.tools.metrics import (
+    CONTENT_TYPE,
+    SSESessionMiddleware,
+    measured_tool,
+    render_metrics,
+)
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
 
 from my_doctor_assistant.utils.helper import (
     get_mcp_host,
     get_mcp_port,
-    lowercase_literals,
 )
 
-# Cypher Execution Helper
-def _run_cypher_query(cypher_query: str) -> str:
-    """Lower‑cases quoted literals, runs the query, returns raw results."""
-    try:
-        cypher_query = lowercase_literals(cypher_query)
-        conn = Neo4jDBConnection()
-        graph = conn.start()
-        results = graph.query(cypher_query)
-        if not results:
-            return "No results returned."
-        return str(results)
-    except Exception as exc:  # noqa: BLE001
-        return f"Error executing Cypher: {exc}"
-
 # FastMCP server definition
 mcp = FastMCP("neo4j-medical-server")
+set_service_name("medical-mcp-sse")
 
 mcp.settings.host = get_mcp_host()
 mcp.settings.port = get_mcp_port()
 
+# Build the Starlette app once: sse_app() returns a fresh app on every
+# call, so middleware and routes must go on the instance that is served.
+app = mcp.sse_app()
+
 # CORS so browsers & reverse proxies can connect
-mcp.sse_app().add_middleware(
+app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
+app.add_middleware(SSESessionMiddleware, path=mcp.settings.sse_path)
+
+async def metrics(request: Request) -> Response:
+    """Prometheus scrape endpoint."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+app.router.routes.append(Route("/metrics", endpoint=metrics, methods=["GET"]))
 
 TOOL_NAME = "GraphDB" # public identifier used by clients
 
-@ mcp.tool(name=TOOL_NAME, description="Run a Cypher query against the medical Neo4j database")
-async def graphdb(query: str) -> str:  # noqa: D401
+@ mcp.tool(name=TOOL_NAME,
+           description="Run a Cypher query against the medical Neo4j database. "
+                       "Pass values as $parameters in the optional params map instead of "
+                       "inlining them, e.g. {patient_id: $pid} with params {\"pid\": 42}")
+@traced_tool(TOOL_NAME)
+@measured_tool(TOOL_NAME)
+async def graphdb(query: str, params: Optional[Dict[str, Any]] = None) -> str:  # noqa: D401
     """Run a Cypher query against the medical Neo4j database."""
-    return _run_cypher_query(query)
-
-__all__ = ["TOOL_NAME"] # export the constant for client reuse
+    return await run_cypher_query_async(query, params)
+
+PAGED_TOOL_NAME = "GraphDBPaged"
+NEXT_PAGE_TOOL_NAME = "GraphDBNextPage"
+
+@mcp.tool(name=PAGED_TOOL_NAME,
+          description="Run a read-only Cypher query and return its first page of rows "
+                      "plus a cursor for fetching the rest with GraphDBNextPage")
+@traced_tool(PAGED_TOOL_NAME)
+@measured_tool(PAGED_TOOL_NAME)
+async def graphdb_paged(query: str, page_size: int = 100) -> str:
+    return await open_paged_query_async(query, page_size)
+
+@mcp.tool(name=NEXT_PAGE_TOOL_NAME,
+          description="Fetch the next page of rows for a cursor returned by GraphDBPaged")
+@traced_tool(NEXT_PAGE_TOOL_NAME)
+@measured_tool(NEXT_PAGE_TOOL_NAME)
+async def graphdb_next_page(cursor: str) -> str:
+    return await fetch_next_page_async(cursor)
+
+PREPARED_TOOL_NAME = "GraphDBPrepared"
+
+@mcp.tool(name=PREPARED_TOOL_NAME,
+          description="Run a named, pre-validated query template with its parameters. "
+                      "Templates: " + "; ".join(t.signature for t in PREPARED_QUERIES.values()))
+@traced_tool(PREPARED_TOOL_NAME)
+@measured_tool(PREPARED_TOOL_NAME)
+async def graphdb_prepared(name: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return await run_prepared_query_async(name, params)
+
+# Typed fast paths for the most common questions: one call, no Cypher
+for _name, _fn in FAST_PATH_TOOLS.items():
+    mcp.add_tool(traced_tool(_name)(measured_tool(_name)(_fn)), name=_name, description=_fn.__doc__)
+
+BATCH_TOOL_NAME = "GraphDBBatch"
+
+@mcp.tool(name=BATCH_TOOL_NAME,
+          description="Run several independent Cypher queries in one call and get one result "
+                      "(or error) per query, in order. Set consistent=true to run read-only "
+                      "queries in a single transaction so they see the same snapshot")
+@traced_tool(BATCH_TOOL_NAME)
+@measured_tool(BATCH_TOOL_NAME)
+async def graphdb_batch(queries: List[str], consistent: bool = False) -> str:
+    return await run_cypher_batch_async(queries, consistent)
+
+__all__ = ["TOOL_NAME", "PAGED_TOOL_NAME", "NEXT_PAGE_TOOL_NAME", "BATCH_TOOL_NAME",
+           "PREPARED_TOOL_NAME"] # export the constants for client reuse
 
 @mcp.resource(
     uri="resource://neo4j-schema",         # unique identifier
@@ -68,6 +136,20 @@ async def medical_schema() -> str:
     """
     return dp.MEDICAL_SCHEMA_PROMPT
 
+@mcp.resource(uri="resource://graphdb/cache-stats",
+              name="GraphDB Cache Statistics",
+              description="Hit/miss counters and size of the Cypher result cache",
+              mime_type="application/json")
+async def graphdb_cache_stats() -> str:
+    return cache_stats()
+
+@mcp.resource(uri="resource://graphdb/prepared-queries",
+              name="GraphDB Prepared Queries",
+              description="Named query templates accepted by GraphDBPrepared, with their parameters",
+              mime_type="application/json")
+async def graphdb_prepared_queries() -> str:
+    return prepared_queries()
+
 @mcp.resource(uri="resource://prompts/vitals-bp",
               name="Vitals – Blood Pressure",
               description="Prompt slice for vitals & blood‑pressure queries",
@@ -131,7 +213,12 @@ def main() -> None:
         # – or –
         $ python -m my_doctor_assistant.mcp.sse.server.medical_graph_server
     """
-    mcp.run(transport="sse")
+    uvicorn.run(
+        app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+    )
 
 
 if __name__ == "__main__":
@@ -1,133 +1,61 @@
-import os
-import re
-import asyncio
-from functools import lru_cache
-
-# Imports for LLM and Tools
-from langchain_openai import ChatOpenAI
-from langchain.agents import Tool, initialize_agent
-from my_doctor_assistant.agents.structured_chat.types import AgentType
-
 # MCP Client Imports
-from mcp.client.stdio import stdio_client
-from mcp import ClientSession, StdioServerParameters
-from my_doctor_assistant.mcp.prompts import domain_prompts as dp 
-
-from my_doctor_assistant.utils.helper import get_openai_api_key, lowercase_literals
-from my_doctor_assistant.mcp.stdio.server.medical_graph_server import TOOL_NAME 
-
-# Retrieve and set OpenAI API key
-openai_api_key = get_openai_api_key()
-os.environ["OPENAI_API_KEY"] = openai_api_key
-
-PROMPT_URI_MAP = {
-    "schema":       "resource://neo4j-schema",
-    "vitals":       "resource://prompts/vitals-bp",
-    "appointments": "resource://prompts/appointments-billing",
-    "consultation": "resource://prompts/consultation-clinical",
-    "diagnoses":    "resource://prompts/diagnoses-conditions",
-    "treatment":    "resource://prompts/treatment-plans-history",
-    "medications":  "resource://prompts/medications-prescriptions",
-    "labs":         "resource://prompts/lab-results",
-}
+from mcp.client.stdio import get_default_environment, stdio_client
+from mcp import StdioServerParameters
+from my_doctor_assistant.utils.tracing import trace_environment
+from my_doctor_assistant.mcp.agent import (
+    BATCH_TOOL_NAME,
+    NEXT_PAGE_TOOL_NAME,
+    OFFLINE_PROMPT_MAP,
+    PAGED_TOOL_NAME,
+    PREPARED_TOOL_NAME,
+    PROMPT_URI_MAP,
+    TOOL_NAME,
+    AgentTools,
+    BaseMedicalQAAgent,
+)
+from my_doctor_assistant.mcp.session import MCPSessionManager
 
-OFFLINE_PROMPT_MAP = {
-    "schema":       dp.MEDICAL_SCHEMA_PROMPT,
-    "vitals":       dp.VITALS_BLOOD_PRESSURE_PROMPT,
-    "appointments": dp.APPOINTMENTS_BILLING_PROMPT,
-    "consultation": dp.CONSULTATION_CLINICAL_PROMPT,
-    "diagnoses":    dp.DIAGNOSES_CONDITIONS_PROMPT,
-    "treatment":    dp.TREATMENT_PLANS_HISTORY_PROMPT,
-    "medications":  dp.MEDICATIONS_PRESCRIPTIONS_PROMPT,
-    "labs":         dp.LAB_RESULTS_PROMPT,
-}
+__all__ = ["TOOL_NAME", "PAGED_TOOL_NAME", "NEXT_PAGE_TOOL_NAME", "BATCH_TOOL_NAME", "PREPARED_TOOL_NAME",
+           "PROMPT_URI_MAP", "OFFLINE_PROMPT_MAP", "get_session", "get_domain_prompt",
+           "call_tool_text", "acall_tool_text", "make_graph_tool", "make_paged_tools",
+           "make_batch_tool", "make_prepared_tool", "make_fast_path_tools", "TOOLS",
+           "MedicalQAAgent", "main", "SERVER_PARAMS"]  # still importable from here
 
 # Helpers: MCP resources
 SERVER_PARAMS = StdioServerParameters(
     command="python",
     args=["-m", "my_doctor_assistant.mcp.stdio.server.medical_graph_server"],
-    env=None,
+    env={**get_default_environment(), **trace_environment()},  # the server continues our traces
 )
 
-@lru_cache(maxsize=8)
-def get_domain_prompt(kind: str = "schema") -> str:
-    """Fetch a prompt slice from the MCP server or fall back to local constant."""
-    uri = PROMPT_URI_MAP.get(kind, PROMPT_URI_MAP["schema"])
-
-    async def _fetch() -> str:
-        async with stdio_client(SERVER_PARAMS) as streams:
-            async with ClientSession(*streams) as session:
-                await session.initialize()
-                resp = await session.read_resource(uri)
-                return resp.content[0].text
-
-    try:
-        return asyncio.run(_fetch())
-    except Exception:
-        return OFFLINE_PROMPT_MAP[kind]
-
-async def _graphdb_async(query: str) -> str:
-    query = lowercase_literals(query)
-    async with stdio_client(SERVER_PARAMS) as streams:
-        async with ClientSession(*streams) as session:
-            await session.initialize()
-            resp = await session.call_tool(TOOL_NAME, {"query": query})
-            return resp.content
-
-def graphdb_sync(query: str) -> str:
-    return asyncio.run(_graphdb_async(query))
-
-def get_domain_prompt(kind: str = "schema") -> str:
-    """
-    Download the requested prompt slice from the MCP server once (LRU‑cached).
-    Falls back to the baked‑in constant if the server is not reachable.
-    """
-    uri = PROMPT_URI_MAP.get(kind, PROMPT_URI_MAP["schema"])
-
-    @lru_cache(maxsize=8)
-    def _pull(uri_: str) -> str:
-        async def _fetch() -> str:
-            async with stdio_client(SERVER_PARAMS) as streams:
-                async with ClientSession(*streams) as session:
-                    await session.initialize()
-                    resp = await session.read_resource(uri_)
-                    return resp.content[0].text
-        try:
-            return asyncio.run(_fetch())
-        except Exception:
-            # offline fallback
-            return OFFLINE_PROMPT_MAP.get(kind, OFFLINE_PROMPT_MAP["schema"])
-
-    return _pull(uri)
-
-def make_graph_tool() -> Tool:
-    return Tool(
-        name=TOOL_NAME,
-        func=graphdb_sync,
-        description="Execute Cypher against the medical Neo4j database."
-    )
+# One warm server subprocess shared by every prompt fetch and tool call;
+# the session manager respawns it if it crashes.
+_session: MCPSessionManager | None = None
+
+def get_session() -> MCPSessionManager:
+    """Return the process‑wide stdio session, spawning the server on first use."""
+    global _session
+    if _session is None:
+        _session = MCPSessionManager(lambda: stdio_client(SERVER_PARAMS), name="stdio")
+    return _session.start()
+
+# the tools call get_session() each time, so a replaced _session is picked up
+TOOLS = AgentTools(get_session)
+get_domain_prompt = TOOLS.get_domain_prompt
+call_tool_text = TOOLS.call_tool_text
+acall_tool_text = TOOLS.acall_tool_text
+make_graph_tool = TOOLS.make_graph_tool
+make_paged_tools = TOOLS.make_paged_tools
+make_batch_tool = TOOLS.make_batch_tool
+make_prepared_tool = TOOLS.make_prepared_tool
+make_fast_path_tools = TOOLS.make_fast_path_tools
 
 # Agent Wrapper
-class MedicalQAAgent:
-    def __init__(self, domain: str = "schema", temperature: float = 0.0):
-        self.prompt = get_domain_prompt(domain)
-        self.llm = ChatOpenAI(
-            model="gpt-4o",
-            temperature=temperature,
-            # top_p=1,
-            # n=1,
-        )
-        self.agent = initialize_agent(
-            tools=[make_graph_tool()],
-            llm=self.llm,
-            agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=True,
-            handle_parsing_errors=True,
-        )
+class MedicalQAAgent(BaseMedicalQAAgent):
+    """The medical QA agent over a warm stdio server subprocess."""
 
-    def answer(self, question: str) -> str:
-        prompt = f"{self.prompt.format(user_question=question)}\\nUser question: {question}"
-        return self.agent.run(prompt)
+    tools = TOOLS
+    transport = "stdio"
 
 def main():
     agent = MedicalQAAgent(domain="vitals") # pick any slice here
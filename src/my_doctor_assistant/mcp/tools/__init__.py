@@ -0,0 +1,6 @@
+"""
+Tool implementations shared by the stdio and SSE MCP servers.
+
+Both servers register the same tools; the code that actually talks to
+Neo4j lives here so the two transports cannot drift apart.
+"""
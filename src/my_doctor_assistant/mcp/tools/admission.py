@@ -0,0 +1,170 @@
+"""
+EXPLAIN‑based admission control for LLM‑written Cypher.
+
+Before a query runs, the planner is asked (``EXPLAIN``, which executes
+nothing) how it would evaluate it.  Plans containing operators that tend
+to pin a core for minutes — cartesian products, full node scans and
+variable‑length expansions without an upper bound, e.g. over the
+``RESCHEDULED_TO`` or ``HAS_PARENT_PLAN`` chains — or whose estimated row
+count exceeds the budget are rejected with hints the agent can act on.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Iterator
+
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_admission_enabled,
+    get_graphdb_max_estimated_rows,
+    get_graphdb_rejected_operators,
+)
+
+# `*`, `*2..`, `*..` with no upper bound inside a relationship pattern
+_UNBOUNDED_VAR_LENGTH = re.compile(r"\*\s*(?:\d*\s*\.\.\s*)?\]")
+_VAR_LENGTH_OPERATORS = ("VarLengthExpand", "BFSPruningVarExpand", "ShortestPath")
+# statements EXPLAIN cannot (or need not) be prefixed to
+_NOT_EXPLAINABLE = re.compile(
+    r"^\s*(EXPLAIN|PROFILE|SHOW|DROP|USE|(CREATE|ALTER)\s+(\w+\s+)?(INDEX|CONSTRAINT|DATABASE|USER|ROLE))\b",
+    re.IGNORECASE,
+)
+
+_HINTS = {
+    "CartesianProduct": (
+        "Connect the MATCH patterns through a relationship or a shared variable, "
+        "or split the question into separate queries; disconnected patterns multiply row counts."
+    ),
+    "AllNodesScan": (
+        "Give every node pattern a label and anchor it on an indexed property "
+        "such as patient_id, provider_id or appointment_id."
+    ),
+    "NodeByLabelScan": (
+        "Anchor the pattern on an indexed property such as patient_id instead of scanning the label."
+    ),
+    "unbounded": (
+        "Bound the variable-length relationship, e.g. [:RESCHEDULED_TO*1..5] or [:HAS_PARENT_PLAN*1..5]."
+    ),
+    "rows": (
+        "Filter on a specific patient/provider id, add a LIMIT or aggregate (count, max, ...) "
+        "so the planner expects fewer rows."
+    ),
+}
+
+
+class QueryCostError(RuntimeError):
+    """Raised when a query's plan exceeds the admission budget."""
+
+    code = "query_rejected"
+
+    def __init__(self, reasons: list[str], hints: list[str], estimated_rows: float) -> None:
+        super().__init__("Query rejected before execution: " + "; ".join(reasons))
+        self.reasons = reasons
+        self.hints = hints
+        self.estimated_rows = estimated_rows
+
+    @property
+    def details(self) -> dict[str, Any]:
+        return {"reasons": self.reasons, "hints": self.hints, "estimated_rows": self.estimated_rows}
+
+
+def _walk(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("children") or ():
+        yield from _walk(child)
+
+
+def _arguments(op: dict) -> dict:
+    return op.get("args") or op.get("arguments") or {}
+
+
+def assess_plan(
+    plan: dict, max_rows: float, rejected_operators: set[str], cypher_query: str = ""
+) -> QueryCostError | None:
+    """Return a :class:`QueryCostError` describing why *plan* is too costly, if it is."""
+    reasons: list[str] = []
+    hints: list[str] = []
+    seen: set[str] = set()
+    estimated = 0.0
+    for op in _walk(plan):
+        name = str(op.get("operatorType", "")).split("@")[0]
+        base = name.split("(")[0]
+        args = _arguments(op)
+        estimated = max(estimated, float(args.get("EstimatedRows", 0) or 0))
+        if base in rejected_operators and base not in seen:
+            seen.add(base)
+            reasons.append(f"{base} in plan")
+            hints.append(_HINTS.get(base, f"Rewrite the query to avoid {base}."))
+        if (
+            base.startswith(_VAR_LENGTH_OPERATORS)
+            and "unbounded" not in seen
+            and (
+                _UNBOUNDED_VAR_LENGTH.search(str(args.get("Details", "")))
+                or _UNBOUNDED_VAR_LENGTH.search(cypher_query)
+            )
+        ):
+            seen.add("unbounded")
+            reasons.append(f"unbounded variable-length expansion ({name})")
+            hints.append(_HINTS["unbounded"])
+    if estimated > max_rows:
+        reasons.append(f"estimated {int(estimated):,} rows exceeds budget of {int(max_rows):,}")
+        hints.append(_HINTS["rows"])
+    if reasons:
+        return QueryCostError(reasons, hints, estimated)
+    return None
+
+
+class AdmissionController:
+    """Run EXPLAIN and admit or reject queries, remembering recent verdicts."""
+
+    def __init__(self, enabled: bool, max_rows: float, rejected_operators: set[str], memo_size: int = 1024) -> None:
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self.rejected_operators = rejected_operators
+        self.memo_size = memo_size
+        self._verdicts: OrderedDict[str, QueryCostError | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def check(self, session: Any, cypher_query: str, params: dict | None = None) -> None:
+        """
+        Raise :class:`QueryCostError` if *cypher_query* should not run.
+        *session* is the Neo4j session the query will run on.
+        """
+        if not self.enabled or _NOT_EXPLAINABLE.match(cypher_query):
+            return
+        with self._lock:
+            known = cypher_query in self._verdicts
+            verdict = self._verdicts.get(cypher_query)
+            if known:
+                self._verdicts.move_to_end(cypher_query)
+        if not known:
+            summary = session.run("EXPLAIN " + cypher_query, params or {}).consume()
+            verdict = assess_plan(
+                summary.plan or {}, self.max_rows, self.rejected_operators, cypher_query
+            )
+            with self._lock:
+                self._verdicts[cypher_query] = verdict
+                while len(self._verdicts) > self.memo_size:
+                    self._verdicts.popitem(last=False)
+        if verdict is not None:
+            with self._lock:
+                self.rejected += 1
+            raise QueryCostError(verdict.reasons, verdict.hints, verdict.estimated_rows)
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process‑wide admission controller, configured from the environment."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    enabled=get_graphdb_admission_enabled(),
+                    max_rows=get_graphdb_max_estimated_rows(),
+                    rejected_operators=get_graphdb_rejected_operators(),
+                )
+    return _controller
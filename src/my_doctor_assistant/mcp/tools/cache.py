@@ -0,0 +1,258 @@
+"""
+Result cache for the GraphDB tool.
+
+Entries are keyed on the normalised query text plus its parameters and
+kept in a byte‑bounded in‑memory LRU, optionally backed by a SQLite file
+so warm entries survive a server restart.  Every entry carries its own
+expiry.  Queries containing a write clause or a call to a procedure not
+known to be read‑only are never cached and flush the whole cache,
+because the server cannot tell which cached reads they affect; writes
+made outside this process are only bounded by the TTL.
+"""
+
+import fnmatch
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_cache_max_bytes,
+    get_graphdb_cache_path,
+    get_graphdb_cache_ttl,
+    tokenize_cypher,
+)
+
+_WRITE_WORDS = {"CREATE", "MERGE", "SET", "DELETE", "REMOVE", "DROP", "FOREACH"}
+# procedures known not to write (patterns, lower‑case); any other CALL counts as a write
+_READ_ONLY_PROCEDURES = (
+    "db.index.fulltext.querynodes",
+    "db.index.fulltext.queryrelationships",
+    "db.labels",
+    "db.relationshiptypes",
+    "db.propertykeys",
+    "db.indexes",
+    "db.constraints",
+    "db.info",
+    "db.ping",
+    "db.schema.*",
+    "dbms.components",
+    "dbms.procedures",
+    "dbms.functions",
+    "apoc.meta.*",
+)
+
+
+def _is_keyword(tokens: list[tuple[str, str]], i: int) -> bool:
+    # property names (`n.set`), map keys (`{set: 1}`) and labels or types (`:Create`) are not
+    prev = tokens[i - 1] if i else ("", "")
+    nxt = tokens[i + 1] if i + 1 < len(tokens) else ("", "")
+    return prev not in (("punct", "."), ("punct", ":")) and nxt != ("punct", ":")
+
+
+def _procedure_name(tokens: list[tuple[str, str]], i: int) -> str:
+    """The dotted, lower‑cased procedure name starting at ``tokens[i]``."""
+    parts = []
+    while i < len(tokens) and tokens[i][0] in ("word", "ident"):
+        parts.append(tokens[i][1].strip("`").lower())
+        if tokens[i + 1 : i + 2] != [("punct", ".")]:
+            break
+        i += 2
+    return ".".join(parts)
+
+
+def is_read_only_procedure(name: str) -> bool:
+    """True for procedures in the read‑only allow‑list, e.g. ``db.index.fulltext.queryNodes``."""
+    return any(fnmatch.fnmatchcase(name.lower(), pattern) for pattern in _READ_ONLY_PROCEDURES)
+
+
+def is_write_query(query: str) -> bool:
+    """
+    True when *query* contains a clause that may modify the graph.  Words
+    in strings and comments, property names and map keys do not count.
+    A procedure ``CALL`` counts unless the procedure is on the read‑only
+    allow‑list; ``CALL { ... }`` subqueries are judged by their body.
+    """
+    tokens = [(kind, text) for kind, text in tokenize_cypher(query) if kind not in ("space", "comment")]
+    for i, (kind, text) in enumerate(tokens):
+        if kind != "word" or not _is_keyword(tokens, i):
+            continue
+        word = text.upper()
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else ("", "")
+        if word in _WRITE_WORDS or (word == "LOAD" and nxt[1].upper() == "CSV"):
+            return True
+        if word == "CALL" and nxt[0] in ("word", "ident"):
+            if not is_read_only_procedure(_procedure_name(tokens, i + 1)):
+                return True
+    return False
+
+
+def normalize_query(query: str) -> str:
+    """Lower‑case literals, drop comments and collapse whitespace outside literals."""
+    out: list[str] = []
+    for kind, text in tokenize_cypher(query):
+        if kind in ("space", "comment"):
+            if out and out[-1] != " ":
+                out.append(" ")
+        else:
+            out.append(text.lower() if kind == "string" else text)
+    return "".join(out).strip().rstrip(";").rstrip()
+
+
+def cache_key(query: str, params: dict | None = None) -> str:
+    """Cache key for *query* run with *params*."""
+    key = normalize_query(query)
+    if params:
+        key += "\n" + json.dumps(params, sort_keys=True, default=str)
+    return key
+
+
+class QueryResultCache:
+    """Byte‑bounded LRU with per‑entry TTL and an optional SQLite tier."""
+
+    def __init__(self, ttl: float, max_bytes: int, path: str | None = None) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path = path or None
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0  # bumped by every invalidate_all()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "disk_hits", "misses", "bypasses", "evictions", "invalidations"), 0
+        )
+        self._db: sqlite3.Connection | None = None
+        if self.enabled and self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever the cache is invalidated; see :meth:`put`."""
+        return self._generation
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key.encode()) + len(value.encode())
+
+    # ── lookups ───────────────────────────────────────────────────────
+    def get(self, key: str) -> str | None:
+        """Return the cached value for *key*, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                self._drop(key)
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._counters["disk_hits"] += 1
+                    self._store(key, row[0], row[1])
+                    return row[0]
+            self._counters["misses"] += 1
+            return None
+
+    def put(
+        self, key: str, value: str, ttl: float | None = None, generation: int | None = None
+    ) -> None:
+        """
+        Cache *value* under *key* for *ttl* seconds (defaults to the cache
+        TTL).  Pass the :attr:`generation` read before computing *value* to
+        drop the put when the cache was invalidated in the meantime, so a
+        read that overlapped a write cannot cache what the write changed.
+        """
+        if not self.enabled or self._size(key, value) > self.max_bytes:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, value, expires_at)
+                )
+                self._db.commit()
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._counters["bypasses"] += 1
+
+    def invalidate_all(self) -> None:
+        """Forget every entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+            self._counters["invalidations"] += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Counters and sizes for operators."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["hits"] + self._counters["disk_hits"]
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "max_bytes": self.max_bytes,
+                "disk_path": self.path,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                **self._counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # ── internals (caller holds the lock) ─────────────────────────────
+    def _store(self, key: str, value: str, expires_at: float) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += self._size(key, value)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._counters["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= self._size(key, value)
+
+
+_cache: QueryResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> QueryResultCache:
+    """Return the process‑wide result cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryResultCache(
+                    ttl=get_graphdb_cache_ttl(),
+                    max_bytes=get_graphdb_cache_max_bytes(),
+                    path=get_graphdb_cache_path(),
+                )
+    return _cache
@@ -0,0 +1,116 @@
+"""
+Timeouts and cancellation for GraphDB queries.
+
+Every query runs as a Neo4j transaction with a server‑enforced timeout and
+is tagged with the id of a :class:`CancelToken`.  When the MCP request is
+cancelled (client sent ``notifications/cancelled`` or went away), the
+async tool wrapper trips the token: the worker stops pulling records at
+the next row, and any transaction still running under that tag is
+terminated on the server so abandoned work stops consuming capacity.
+"""
+
+import logging
+import threading
+import uuid
+from typing import Callable
+
+from neo4j import Query, unit_of_work
+from neo4j.exceptions import Neo4jError
+
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.utils.helper import get_graphdb_query_timeout
+
+logger = logging.getLogger(__name__)
+
+_METADATA_KEY = "mcp_request"
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised inside a worker once its request has been cancelled."""
+
+    code = "query_cancelled"
+
+
+class QueryTimeoutError(RuntimeError):
+    """Raised when Neo4j aborts a query for exceeding its transaction timeout."""
+
+    code = "query_timeout"
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"Query exceeded the {timeout:g}s time limit and was aborted.")
+        self.timeout = timeout
+
+    @property
+    def details(self) -> dict:
+        return {
+            "timeout_seconds": self.timeout,
+            "hints": [
+                "Anchor the MATCH on an indexed id (patient_id, provider_id, ...), "
+                "narrow the date range, or aggregate instead of returning every row."
+            ],
+        }
+
+
+class CancelToken:
+    """Thread‑safe flag shared between an MCP request and the worker serving it."""
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise QueryCancelledError("Request was cancelled by the client.")
+
+
+def make_query(
+    cypher_query: str, cancel: CancelToken | None = None, timeout: float | None = None
+) -> Query:
+    """
+    Wrap *cypher_query* with the cancel tag and a transaction timeout
+    (``GRAPHDB_QUERY_TIMEOUT`` unless *timeout* is given).
+    """
+    metadata = {_METADATA_KEY: cancel.id} if cancel is not None else None
+    if timeout is None:
+        timeout = get_graphdb_query_timeout()
+    return Query(cypher_query, metadata=metadata, timeout=timeout)
+
+
+def make_unit_of_work(fn: Callable, cancel: CancelToken | None = None) -> Callable:
+    """Apply the same timeout and cancel tag to a managed transaction function."""
+    metadata = {_METADATA_KEY: cancel.id} if cancel is not None else None
+    return unit_of_work(metadata=metadata, timeout=get_graphdb_query_timeout())(fn)
+
+
+def translate_error(exc: BaseException) -> BaseException:
+    """Map Neo4j's transaction‑timeout errors onto :class:`QueryTimeoutError`."""
+    if isinstance(exc, Neo4jError) and "TransactionTimedOut" in (exc.code or ""):
+        return QueryTimeoutError(get_graphdb_query_timeout())
+    return exc
+
+
+def terminate_server_transactions(cancel: CancelToken) -> None:
+    """Best‑effort: terminate transactions still running under *cancel*'s tag."""
+    try:
+        conn = Neo4jDBConnection()
+        conn.start()
+        with conn.get_driver().session(database=conn.get_database()) as session:
+            ids = [
+                record["transactionId"]
+                for record in session.run(
+                    "SHOW TRANSACTIONS YIELD transactionId, metaData "
+                    f"WHERE metaData.{_METADATA_KEY} = $tag RETURN transactionId",
+                    tag=cancel.id,
+                )
+            ]
+            if ids:
+                session.run("TERMINATE TRANSACTIONS $ids", ids=ids).consume()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not terminate cancelled transactions: %s", exc)
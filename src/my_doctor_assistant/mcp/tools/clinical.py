@@ -0,0 +1,135 @@
+"""
+Typed fast‑path tools for the most common clinical questions.
+
+Each tool validates its arguments and runs a fixed prepared template
+anchored on an indexed id, so the agent can answer in a single call
+instead of writing Cypher in a ReAct loop.  Results use the same JSON
+payload as the GraphDB tool.
+
+``resolve_person`` turns a name from the question into ranked patient /
+provider ids through the ``person_name_fulltext`` index, so the follow‑up
+queries seek by id instead of substring‑scanning every name.
+"""
+
+import json
+import re
+import threading
+from typing import Awaitable, Callable
+
+from my_doctor_assistant.mcp.tools.cache import QueryResultCache
+from my_doctor_assistant.mcp.tools.graphdb import run_prepared_query_async
+from my_doctor_assistant.mcp.tools.payload import render_error
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_person_cache_max_bytes,
+    get_graphdb_person_cache_ttl,
+)
+
+MAX_VITALS = 50
+MAX_CANDIDATES = 20
+_MONTH = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+# Lucene query syntax plus punctuation the analyzer would have split on
+_LUCENE_SYNTAX = re.compile(r'[+\-&|!(){}\[\]^"~*?:\\/.,;]')
+
+_person_cache: QueryResultCache | None = None
+_person_cache_lock = threading.Lock()
+
+
+def _invalid(message: str) -> str:
+    return render_error(message, code="invalid_params")
+
+
+def get_person_cache() -> QueryResultCache:
+    """Return the process‑wide cache of recent name resolutions."""
+    global _person_cache
+    if _person_cache is None:
+        with _person_cache_lock:
+            if _person_cache is None:
+                _person_cache = QueryResultCache(
+                    ttl=get_graphdb_person_cache_ttl(),
+                    max_bytes=get_graphdb_person_cache_max_bytes(),
+                )
+    return _person_cache
+
+
+def name_query(name: str) -> str:
+    """
+    Lucene query for a free‑text name: every word must match, exactly
+    (boosted), as a prefix, or – for longer words – with one typo.
+    Words are lower‑cased, so "and"/"or" are never read as operators.
+    """
+    clauses = []
+    for word in _LUCENE_SYNTAX.sub(" ", name.lower()).split():
+        alternatives = [f"{word}^3", f"{word}*"]
+        if len(word) >= 4:
+            alternatives.append(f"{word}~1")
+        clauses.append(f"({' OR '.join(alternatives)})")
+    return " AND ".join(clauses)
+
+
+async def resolve_person(name: str, limit: int = 5) -> str:
+    """
+    Patients and healthcare providers whose name matches, best first, as
+    (kind, id, name, score) rows. Call this before querying by a person's
+    name and use the returned id; ask the user when several scores are close.
+    """
+    if not 1 <= limit <= MAX_CANDIDATES:
+        return _invalid(f"limit must be between 1 and {MAX_CANDIDATES}.")
+    query = name_query(name)
+    if not query:
+        return _invalid("name must contain at least one letter or digit.")
+    cache = get_person_cache()
+    key = f"{limit}\n{query}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    payload = await run_prepared_query_async("resolve_person", {"query": query, "limit": limit})
+    # keep hits only: errors are transient and a miss may be a person added a moment later
+    if json.loads(payload).get("rows"):
+        cache.put(key, payload)
+    return payload
+
+
+async def latest_vitals(patient_id: int, n: int = 5) -> str:
+    """Latest n vital-sign records (with blood pressure) for a patient, newest first."""
+    if patient_id < 1:
+        return _invalid("patient_id must be a positive integer.")
+    if not 1 <= n <= MAX_VITALS:
+        return _invalid(f"n must be between 1 and {MAX_VITALS}.")
+    return await run_prepared_query_async("latest_vitals", {"pid": patient_id, "n": n})
+
+
+async def max_systolic_bp(patient_id: int, month: str) -> str:
+    """Highest systolic blood pressure recorded for a patient in a month given as YYYY-MM."""
+    if patient_id < 1:
+        return _invalid("patient_id must be a positive integer.")
+    month = month.strip()
+    if not _MONTH.match(month):
+        return _invalid(f"month must look like 2023-12, got {month!r}.")
+    return await run_prepared_query_async("max_systolic_bp", {"pid": patient_id, "month": month})
+
+
+async def active_investigation_orders(patient_id: int) -> str:
+    """Open investigation orders (no report yet) for a patient, with the ordered service."""
+    if patient_id < 1:
+        return _invalid("patient_id must be a positive integer.")
+    return await run_prepared_query_async("active_investigation_orders", {"pid": patient_id})
+
+
+async def current_prescriptions(patient_id: int) -> str:
+    """Medications on a patient's active prescriptions, with intervals and timings."""
+    if patient_id < 1:
+        return _invalid("patient_id must be a positive integer.")
+    return await run_prepared_query_async("active_medications", {"pid": patient_id})
+
+
+# tool name -> implementation; registered on both servers and mirrored by the agents
+FAST_PATH_TOOLS: dict[str, Callable[..., Awaitable[str]]] = {
+    fn.__name__: fn
+    for fn in (
+        resolve_person,
+        latest_vitals,
+        max_systolic_bp,
+        active_investigation_orders,
+        current_prescriptions,
+    )
+}
@@ -0,0 +1,217 @@
+"""
+Server‑side cursors for paging through large Cypher results.
+
+A paged query keeps its Neo4j session and ``Result`` open between tool
+calls and pulls only one page of records at a time (the session fetch
+size equals the page size), so at most about one page per cursor is held
+in memory and the full result is never materialised.  Cursors expire
+after an idle TTL and the number of open cursors is capped; when the cap
+is hit the least recently used cursor is closed.
+
+An open cursor pins a session and therefore one pooled connection, so the
+cap defaults to a tenth of the driver's pool (``GRAPHDB_MAX_OPEN_CURSORS``)
+and leaves the rest for ordinary queries.
+
+Neo4j's transaction timeout counts wall‑clock time, idle gaps included.
+A cursor's transaction is given ``max(GRAPHDB_QUERY_TIMEOUT, TTL)`` and
+the cursor is closed here when that runs out, however recently it was
+read, so a client gets "expired, re-run the query" rather than a server
+abort halfway through a page.  Results that take longer than that to page
+through need a narrower query or a larger ``GRAPHDB_QUERY_TIMEOUT``.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.mcp.tools.admission import get_admission_controller
+from my_doctor_assistant.mcp.tools.cancellation import CancelToken, make_query
+from my_doctor_assistant.mcp.tools.payload import ResultWriter
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_cursor_ttl,
+    get_graphdb_max_open_cursors,
+    get_graphdb_max_rows,
+    get_graphdb_query_timeout,
+)
+
+
+class CursorNotFoundError(LookupError):
+    """Raised for unknown, exhausted or expired cursor ids."""
+
+
+class _Cursor:
+    def __init__(
+        self, session: Any, result: Any, page_size: int, ttl: float, lifetime: float | None = None
+    ) -> None:
+        self.session = session
+        self.result = result
+        self.keys = list(result.keys())
+        self.page_size = page_size
+        self.ttl = ttl
+        # the transaction's timeout; touch() never extends past it
+        self.deadline = time.monotonic() + lifetime if lifetime else None
+        self.page = 0
+        self.rows_served = 0
+        self.lock = threading.RLock()
+        self.touch()
+
+    def touch(self) -> None:
+        self.expires_at = time.monotonic() + self.ttl
+        if self.deadline is not None:
+            self.expires_at = min(self.expires_at, self.deadline)
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.result.consume()  # DISCARD whatever the server still holds
+            except Exception:  # noqa: BLE001
+                pass
+            finally:
+                self.session.close()
+
+    def read_page(self, cancel: CancelToken | None = None) -> tuple[ResultWriter, bool]:
+        """Serialise the next page; returns the writer and whether rows remain."""
+        writer = ResultWriter(self.keys, max_rows=self.page_size)
+        while len(writer.rows) < self.page_size:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            record = self.result.peek()
+            if record is None:
+                break
+            if not writer.add(record):
+                if not writer.rows:
+                    # A single row bigger than the byte budget: skip it so the
+                    # cursor can still make progress; the writer reports it.
+                    self.result.fetch(1)
+                break
+            self.result.fetch(1)
+        self.page += 1
+        self.rows_served += len(writer.rows)
+        return writer, self.result.peek() is not None
+
+
+class CursorRegistry:
+    """Open, page through and expire server‑side cursors."""
+
+    def __init__(self, ttl: float, max_open: int, max_page_size: int) -> None:
+        self.ttl = ttl
+        self.max_open = max_open
+        self.max_page_size = max_page_size
+        self._cursors: OrderedDict[str, _Cursor] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def open_count(self) -> int:
+        return len(self._cursors)
+
+    def open(
+        self,
+        cypher_query: str,
+        page_size: int,
+        params: dict | None = None,
+        cancel: CancelToken | None = None,
+    ) -> str:
+        """Run *cypher_query* and return its first page (plus a cursor if more remain)."""
+        page_size = max(1, min(page_size, self.max_page_size))
+        self.sweep()
+        conn = Neo4jDBConnection()
+        conn.start()
+        session = conn.get_driver().session(database=conn.get_database(), fetch_size=page_size)
+        try:
+            get_admission_controller().check(session, cypher_query, params)
+            timeout = get_graphdb_query_timeout()
+            if timeout > 0:
+                timeout = max(timeout, self.ttl)
+            result = session.run(make_query(cypher_query, cancel, timeout), params or {})
+            cursor = _Cursor(session, result, page_size, self.ttl, timeout)
+        except BaseException:
+            session.close()
+            raise
+        cursor_id = secrets.token_urlsafe(16)
+        with cursor.lock:
+            try:
+                writer, has_more = cursor.read_page(cancel)
+            except BaseException:
+                cursor.close()
+                raise
+            if not has_more:
+                cursor.close()
+                return self._payload(writer, cursor, None)
+            self._register(cursor_id, cursor)
+            return self._payload(writer, cursor, cursor_id)
+
+    def next_page(self, cursor_id: str, cancel: CancelToken | None = None) -> str:
+        """Return the next page for *cursor_id*, closing the cursor when exhausted."""
+        self.sweep()
+        with self._lock:
+            cursor = self._cursors.get(cursor_id)
+            if cursor is None:
+                raise CursorNotFoundError(
+                    "Unknown or expired cursor; re-run the query with GraphDBPaged."
+                )
+            self._cursors.move_to_end(cursor_id)
+            cursor.touch()  # under the registry lock so sweep() cannot race us
+        with cursor.lock:
+            try:
+                writer, has_more = cursor.read_page(cancel)
+            except BaseException:
+                self.close(cursor_id)
+                raise
+            if not has_more:
+                self.close(cursor_id)
+                return self._payload(writer, cursor, None)
+            return self._payload(writer, cursor, cursor_id)
+
+    def close(self, cursor_id: str) -> None:
+        with self._lock:
+            cursor = self._cursors.pop(cursor_id, None)
+        if cursor is not None:
+            cursor.close()
+
+    def sweep(self) -> None:
+        """Close every cursor whose idle TTL has elapsed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [cid for cid, c in self._cursors.items() if c.expires_at <= now]
+            cursors = [self._cursors.pop(cid) for cid in expired]
+        for cursor in cursors:
+            cursor.close()
+
+    def _register(self, cursor_id: str, cursor: _Cursor) -> None:
+        with self._lock:
+            evicted = []
+            while len(self._cursors) >= self.max_open:
+                evicted.append(self._cursors.popitem(last=False)[1])
+            self._cursors[cursor_id] = cursor
+        for old in evicted:
+            old.close()
+
+    @staticmethod
+    def _payload(writer: ResultWriter, cursor: _Cursor, cursor_id: str | None) -> str:
+        return writer.payload(
+            page=cursor.page,
+            rows_served=cursor.rows_served,
+            has_more=cursor_id is not None,
+            cursor=cursor_id,
+        )
+
+
+_registry: CursorRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_cursor_registry() -> CursorRegistry:
+    """Return the process‑wide cursor registry, configured from the environment."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CursorRegistry(
+                    ttl=get_graphdb_cursor_ttl(),
+                    max_open=get_graphdb_max_open_cursors(),
+                    max_page_size=get_graphdb_max_rows(),
+                )
+    return _registry
@@ -0,0 +1,111 @@
+"""
+Bounded thread‑pool executor for blocking Neo4j work.
+
+The Neo4j driver used by the GraphDB tool is synchronous.  Running it
+directly inside an ``async`` FastMCP tool blocks the event loop, so every
+query is handed to a dedicated pool instead.  The pool caps how many
+queries run at once and how many may wait; anything beyond that is
+rejected immediately rather than piling up behind a slow query.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_max_concurrency,
+    get_graphdb_queue_depth,
+)
+
+
+class QueryRejectedError(RuntimeError):
+    """Raised when the executor is saturated and its wait queue is full."""
+
+
+class QueryExecutor:
+    """Run blocking callables off the event loop with bounded concurrency."""
+
+    def __init__(self, max_concurrency: int, queue_depth: int) -> None:
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="graphdb"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0   # running + waiting
+        self._running = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of callables currently executing on a worker thread."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Number of callables accepted but still waiting for a worker."""
+        return self._pending - self._running
+
+    def _wrap(self, fn: Callable[..., Any]) -> Callable[[], Any]:
+        def _run() -> Any:
+            with self._lock:
+                self._running += 1
+            try:
+                return fn()
+            finally:
+                with self._lock:
+                    self._running -= 1
+        return _run
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Raises:
+            QueryRejectedError: if ``max_concurrency + queue_depth`` calls are
+                already pending.
+        """
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.queue_depth:
+                raise QueryRejectedError(
+                    f"GraphDB is busy ({self._pending} queries pending); retry shortly."
+                )
+            self._pending += 1
+        try:
+            # run in a copy of the caller's context so trace spans nest under the caller's
+            context = contextvars.copy_context()
+            future = self._pool.submit(context.run, self._wrap(functools.partial(fn, *args, **kwargs)))
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # The slot is released when the worker finishes (or the queued call is
+        # cancelled), not when the awaiting coroutine gives up.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: QueryExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    """Return the process‑wide executor, creating it from the environment."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = QueryExecutor(
+                    max_concurrency=get_graphdb_max_concurrency(),
+                    queue_depth=get_graphdb_queue_depth(),
+                )
+    return _executor
@@ -0,0 +1,252 @@
+"""
+GraphDB tool implementation shared by the stdio and SSE servers.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Callable
+
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.mcp.tools.admission import get_admission_controller
+from my_doctor_assistant.mcp.tools.cache import cache_key, get_result_cache, is_write_query
+from my_doctor_assistant.mcp.tools.cancellation import (
+    CancelToken,
+    make_query,
+    make_unit_of_work,
+    terminate_server_transactions,
+    translate_error,
+)
+from my_doctor_assistant.mcp.tools.cursors import CursorNotFoundError, get_cursor_registry
+from my_doctor_assistant.mcp.tools.executor import QueryRejectedError, get_query_executor
+from my_doctor_assistant.mcp.tools.metrics import QUERY_DURATION, RESULT_BYTES
+from my_doctor_assistant.mcp.tools.payload import render_batch, render_error, render_result
+from my_doctor_assistant.mcp.tools.prepared import (
+    PREPARED_QUERIES,
+    PreparedQueryError,
+    get_prepared_query,
+)
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_auto_parameterize,
+    get_graphdb_max_batch_size,
+    get_graphdb_max_rows,
+    lowercase_literals,
+    parameterize_literals,
+)
+from my_doctor_assistant.utils.tracing import current_span, span
+
+def _execute(cypher_query: str, params: dict | None = None, cancel: CancelToken | None = None) -> str:
+    """
+    Cost‑check *cypher_query*, run it on the pooled driver with a transaction
+    timeout and stream its records into a capped JSON payload; records past
+    the cap are discarded server‑side.  *cancel* is checked between records.
+    """
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    conn = Neo4jDBConnection()
+    conn.start()
+    max_rows = get_graphdb_max_rows()
+    attributes = {"db.system": "neo4j", "db.name": conn.get_database() or "", "db.statement": cypher_query[:1000]}
+    with span("graphdb.execute", "client", attributes), conn.get_driver().session(
+        database=conn.get_database(), fetch_size=min(max_rows + 1, 1000)
+    ) as session:
+        with span("graphdb.admission"):
+            get_admission_controller().check(session, cypher_query, params)
+        start = time.perf_counter()
+        with span("graphdb.run"):  # until the server answers RUN
+            result = session.run(make_query(cypher_query, cancel), params or {})
+        with span("graphdb.serialize") as s:  # streams the records while rendering them
+            payload = render_result(result, max_rows=max_rows, cancel=cancel)
+            result.consume()
+            s.set("payload.bytes", len(payload))
+        QUERY_DURATION.observe(time.perf_counter() - start)
+        RESULT_BYTES.observe(len(payload))
+        return payload
+
+def _lookup(cypher_query: str, params: dict | None = None) -> str | None:
+    """Return a cached result for a read query, or ``None``."""
+    if is_write_query(cypher_query):
+        return None
+    return get_result_cache().get(cache_key(cypher_query, params))
+
+def _execute_and_cache(
+    cypher_query: str, params: dict | None = None, cancel: CancelToken | None = None
+) -> str:
+    """Run the query; cache reads, and let writes flush the cache."""
+    try:
+        cache = get_result_cache()
+        if is_write_query(cypher_query):
+            cache.record_bypass()
+            try:
+                return _execute(cypher_query, params, cancel)
+            finally:
+                cache.invalidate_all()
+        generation = cache.generation
+        result = _execute(cypher_query, params, cancel)
+        cache.put(cache_key(cypher_query, params), result, generation=generation)
+        return result
+    except Exception as exc:  # noqa: BLE001
+        return render_error(translate_error(exc))
+
+async def _submit(fn: Callable[..., str], *args: Any) -> str:
+    """
+    Run ``fn(*args, cancel=token)`` on the GraphDB executor.  If the MCP
+    request is cancelled while waiting, the queued job is dropped or the
+    running one is told to stop and its server transaction terminated.
+    """
+    cancel = CancelToken()
+    try:
+        with span("graphdb.submit"):  # the gap before its child is the queue wait
+            return await get_query_executor().submit(fn, *args, cancel=cancel)
+    except QueryRejectedError as exc:
+        return render_error(exc, code="server_busy")
+    except asyncio.CancelledError:
+        cancel.cancel()
+        asyncio.get_running_loop().run_in_executor(None, terminate_server_transactions, cancel)
+        raise
+
+def _prepare(cypher_query: str, params: dict | None = None) -> tuple[str, dict | None]:
+    """
+    Lower‑case quoted literals and, unless GRAPHDB_AUTO_PARAMETERIZE is off,
+    lift them into parameters so equivalent queries share one plan (and one
+    admission verdict).
+    """
+    if get_graphdb_auto_parameterize():
+        return parameterize_literals(cypher_query, params)
+    return lowercase_literals(cypher_query), params
+
+# Cypher Execution Helper
+def run_cypher_query(cypher_query: str, params: dict | None = None) -> str:
+    """Lower‑cases quoted literals, runs the query, returns raw results."""
+    cypher_query, params = _prepare(cypher_query, params)
+    cached = _lookup(cypher_query, params)
+    return cached if cached is not None else _execute_and_cache(cypher_query, params)
+
+async def run_cypher_query_async(cypher_query: str, params: dict | None = None) -> str:
+    """Run :func:`run_cypher_query` on the bounded GraphDB executor."""
+    cypher_query, params = _prepare(cypher_query, params)
+    cached = _lookup(cypher_query, params)
+    current_span().set("graphdb.cache_hit", cached is not None)
+    if cached is not None:
+        return cached  # cache hits never take an executor slot
+    return await _submit(_execute_and_cache, cypher_query, params)
+
+async def run_prepared_query_async(name: str, params: dict | None = None) -> str:
+    """Run the registered template *name* with validated *params*."""
+    try:
+        template = get_prepared_query(name)
+        bound = template.bind(params)
+    except PreparedQueryError as exc:
+        return render_error(exc)
+    return await run_cypher_query_async(template.cypher, bound)
+
+def prepared_queries() -> str:
+    """JSON list of the registered query templates."""
+    return json.dumps([t.describe() for t in PREPARED_QUERIES.values()], indent=2)
+
+def open_paged_query(cypher_query: str, page_size: int = 100, cancel: CancelToken | None = None) -> str:
+    """First page of a read query plus a cursor for the rest."""
+    try:
+        cypher_query, params = _prepare(cypher_query)
+        if is_write_query(cypher_query):
+            return render_error(
+                "Paged queries are read-only; run writes with GraphDB.", code="write_not_allowed"
+            )
+        return get_cursor_registry().open(cypher_query, page_size, params, cancel)
+    except Exception as exc:  # noqa: BLE001
+        return render_error(translate_error(exc))
+
+def fetch_next_page(cursor: str, cancel: CancelToken | None = None) -> str:
+    """Next page for a cursor returned by :func:`open_paged_query`."""
+    try:
+        return get_cursor_registry().next_page(cursor, cancel)
+    except CursorNotFoundError as exc:
+        return render_error(exc, code="cursor_expired")
+    except Exception as exc:  # noqa: BLE001
+        return render_error(translate_error(exc))
+
+async def open_paged_query_async(cypher_query: str, page_size: int = 100) -> str:
+    return await _submit(open_paged_query, cypher_query, page_size)
+
+async def fetch_next_page_async(cursor: str) -> str:
+    return await _submit(fetch_next_page, cursor)
+
+def _execute_consistent(queries: list[str], cancel: CancelToken | None = None) -> str:
+    """
+    Run read queries in one read transaction so they all see the same
+    snapshot.  A failing statement aborts the transaction; the statements
+    after it are reported as ``batch_aborted``.
+    """
+    try:
+        statements = [_prepare(q) for q in queries]
+        payloads: list[str | None] = [None] * len(queries)
+        conn = Neo4jDBConnection()
+        conn.start()
+        max_rows = get_graphdb_max_rows()
+        with conn.get_driver().session(
+            database=conn.get_database(), fetch_size=min(max_rows + 1, 1000)
+        ) as session:
+            runnable = []
+            for i, (q, params) in enumerate(statements):
+                if is_write_query(q):
+                    payloads[i] = render_error(
+                        "Consistent batches are read-only; run writes with GraphDB.",
+                        code="write_not_allowed",
+                    )
+                    continue
+                try:
+                    get_admission_controller().check(session, q, params)
+                except Exception as exc:  # noqa: BLE001
+                    payloads[i] = render_error(exc)
+                    continue
+                runnable.append(i)
+
+            done: dict[int, str] = {}
+
+            def work(tx):
+                done.clear()  # the driver may retry the whole unit of work
+                for i in runnable:
+                    result = tx.run(*statements[i])
+                    done[i] = render_result(result, max_rows=max_rows, cancel=cancel)
+                    result.consume()
+
+            try:
+                if runnable:
+                    session.execute_read(make_unit_of_work(work, cancel))
+            except Exception as exc:  # noqa: BLE001
+                failed = next((i for i in runnable if i not in done), None)
+                for i in runnable:
+                    if i == failed:
+                        payloads[i] = render_error(translate_error(exc))
+                    elif failed is not None and i > failed:
+                        payloads[i] = render_error(
+                            "Not run: an earlier statement in the consistent batch failed.",
+                            code="batch_aborted",
+                        )
+            for i, payload in done.items():
+                payloads[i] = payload
+        return render_batch(payloads, consistent=True)
+    except Exception as exc:  # noqa: BLE001
+        return render_error(translate_error(exc))
+
+async def run_cypher_batch_async(queries: list[str], consistent: bool = False) -> str:
+    """
+    Run several statements for one tool call and return one payload per
+    statement, in order.  Independent statements run concurrently through
+    the executor (and the result cache); ``consistent=True`` runs them in a
+    single read transaction instead.
+    """
+    max_batch = get_graphdb_max_batch_size()
+    if len(queries) > max_batch:
+        return render_error(
+            f"Batch has {len(queries)} statements; the limit is {max_batch}.",
+            code="batch_too_large",
+        )
+    if consistent:
+        return await _submit(_execute_consistent, list(queries))
+    payloads = await asyncio.gather(*(run_cypher_query_async(q) for q in queries))
+    return render_batch(payloads, consistent=False)
+
+def cache_stats() -> str:
+    """JSON snapshot of the result‑cache counters for operators."""
+    return json.dumps(get_result_cache().stats(), indent=2)
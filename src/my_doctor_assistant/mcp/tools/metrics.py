@@ -0,0 +1,293 @@
+"""
+Prometheus metrics for the MCP server.
+
+A small in‑process registry – counters, gauges and histograms with
+labels – rendered in the Prometheus text exposition format, so the SSE
+server can serve ``/metrics`` without another dependency.  Values that
+already live elsewhere (the GraphDB executor, the Neo4j connection pool)
+are read when the endpoint is scraped.
+
+Metrics:
+
+* ``mcp_tool_calls_total{tool,status}`` – status is ``ok``, the error
+  payload's code, ``exception`` or ``cancelled``;
+* ``mcp_tool_duration_seconds{tool}`` and ``mcp_tool_calls_in_flight{tool}``;
+* ``graphdb_query_duration_seconds`` – Cypher run plus record streaming;
+* ``graphdb_result_bytes`` – size of each rendered result;
+* ``graphdb_executor_jobs{state}`` / ``graphdb_executor_capacity{kind}``;
+* ``neo4j_pool_connections{state}`` / ``neo4j_pool_max_connections``;
+* ``mcp_sse_sessions`` – open SSE streams.
+"""
+
+import asyncio
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.mcp.tools.executor import get_query_executor
+from my_doctor_assistant.mcp.tools.payload import error_code
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# (suffix, labels, value)
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+
+    type = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", self._labels(key), value
+
+
+class Gauge(Counter):
+    """A value that goes up and down per label set."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: dict[tuple[str, ...], list[float]] = {}  # per‑bucket counts, then sum
+        if not self.labelnames:
+            self._values[()] = [0] * len(self.buckets) + [0.0]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in items:
+            labels, cumulative = self._labels(key), 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _number(bound)}, cumulative
+            yield "_sum", labels, counts[-1]
+            yield "_count", labels, cumulative
+
+
+class Registry:
+    """The metrics one ``/metrics`` endpoint exports."""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def on_scrape(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """Run *collector* before every render, to refresh values kept elsewhere."""
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{metric.name}{suffix}{{{rendered}}} {_number(value)}" if rendered
+                             else f"{metric.name}{suffix} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.register(Counter(
+    "mcp_tool_calls_total", "MCP tool calls by tool and outcome.", ("tool", "status")))
+TOOL_DURATION = REGISTRY.register(Histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency, server side.", ("tool",)))
+TOOL_IN_FLIGHT = REGISTRY.register(Gauge(
+    "mcp_tool_calls_in_flight", "MCP tool calls currently being handled.", ("tool",)))
+QUERY_DURATION = REGISTRY.register(Histogram(
+    "graphdb_query_duration_seconds", "Cypher execution time on Neo4j, including streaming the records."))
+RESULT_BYTES = REGISTRY.register(Histogram(
+    "graphdb_result_bytes", "Size of rendered GraphDB results.", buckets=SIZE_BUCKETS))
+EXECUTOR_JOBS = REGISTRY.register(Gauge(
+    "graphdb_executor_jobs", "GraphDB executor jobs running on a worker or waiting for one.", ("state",)))
+EXECUTOR_CAPACITY = REGISTRY.register(Gauge(
+    "graphdb_executor_capacity", "GraphDB executor workers and wait-queue slots.", ("kind",)))
+POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "neo4j_pool_connections", "Neo4j driver pool connections by state.", ("state",)))
+POOL_MAX = REGISTRY.register(Gauge(
+    "neo4j_pool_max_connections", "Neo4j driver pool size cap."))
+SSE_SESSIONS = REGISTRY.register(Gauge(
+    "mcp_sse_sessions", "Open SSE sessions."))
+
+
+@REGISTRY.on_scrape
+def _collect_executor() -> None:
+    executor = get_query_executor()
+    EXECUTOR_JOBS.set(executor.in_flight, state="running")
+    EXECUTOR_JOBS.set(executor.queued, state="queued")
+    EXECUTOR_CAPACITY.set(executor.max_concurrency, kind="workers")
+    EXECUTOR_CAPACITY.set(executor.queue_depth, kind="queue")
+
+
+@REGISTRY.on_scrape
+def _collect_pool() -> None:
+    stats = Neo4jDBConnection.pool_stats()
+    if stats is not None:
+        POOL_CONNECTIONS.set(stats["in_use"], state="in_use")
+        POOL_CONNECTIONS.set(stats["idle"], state="idle")
+        POOL_MAX.set(stats["max_size"])
+
+
+def render_metrics() -> str:
+    """The default registry in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+def measured_tool(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Count, time and track in‑flight calls of a FastMCP tool function; the
+    signature and docstring FastMCP reads are kept.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def measured(*args: Any, **kwargs: Any) -> Any:
+                TOOL_IN_FLIGHT.inc(tool=name)
+                start, status = time.perf_counter(), "exception"
+                try:
+                    payload = await fn(*args, **kwargs)
+                    status = error_code(payload) or "ok"
+                    return payload
+                except asyncio.CancelledError:
+                    status = "cancelled"
+                    raise
+                finally:
+                    TOOL_IN_FLIGHT.dec(tool=name)
+                    TOOL_DURATION.observe(time.perf_counter() - start, tool=name)
+                    TOOL_CALLS.inc(tool=name, status=status)
+        else:
+            @functools.wraps(fn)
+            def measured(*args: Any, **kwargs: Any) -> Any:
+                TOOL_IN_FLIGHT.inc(tool=name)
+                start, status = time.perf_counter(), "exception"
+                try:
+                    payload = fn(*args, **kwargs)
+                    status = error_code(payload) or "ok"
+                    return payload
+                finally:
+                    TOOL_IN_FLIGHT.dec(tool=name)
+                    TOOL_DURATION.observe(time.perf_counter() - start, tool=name)
+                    TOOL_CALLS.inc(tool=name, status=status)
+        return measured
+    return decorate
+
+
+class SSESessionMiddleware:
+    """ASGI middleware counting open SSE streams in ``mcp_sse_sessions``."""
+
+    def __init__(self, app: Any, path: str = "/sse") -> None:
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        # The MCP handler may outlive the client by a while, so a session
+        # ends at its http.disconnect or when the handler returns, whichever is first.
+        open_ = True
+
+        def close() -> None:
+            nonlocal open_
+            if open_:
+                open_ = False
+                SSE_SESSIONS.dec()
+
+        async def receive_until_disconnect() -> dict:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                close()
+            return message
+
+        SSE_SESSIONS.inc()
+        try:
+            await self.app(scope, receive_until_disconnect, send)
+        finally:
+            close()
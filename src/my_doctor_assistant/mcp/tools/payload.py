@@ -0,0 +1,179 @@
+"""
+JSON payloads returned by the GraphDB tools.
+
+Records are serialised one at a time as they stream out of the driver, so
+a result is never held twice in memory (once as records, once as one big
+string).  Serialisation stops at a row cap or a byte cap, whichever comes
+first, and the payload says so instead of silently dropping rows.
+
+Result shape::
+
+    {"columns": [{"name": "maxSys", "type": "integer"}],
+     "rows": [[142]],
+     "row_count": 1,
+     "truncated": false}
+
+Errors use ``{"error": {"code": ..., "message": ...}}``.  A batch wraps
+one such payload per statement, in order::
+
+    {"consistent": false, "count": 2, "results": [{...}, {"error": {...}}]}
+"""
+
+import json
+from typing import Any, Iterable, Sequence
+
+from neo4j.graph import Node, Path, Relationship
+
+from my_doctor_assistant.mcp.tools.cancellation import CancelToken
+from my_doctor_assistant.utils.helper import (
+    get_graphdb_max_result_bytes,
+    get_graphdb_max_rows,
+)
+
+
+def _json_default(value: Any) -> Any:
+    # neo4j.time types expose iso_format(); spatial and other types fall back to str()
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(value: Any) -> str:
+    """Compact JSON encoding shared by every GraphDB payload."""
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, Node):
+        return "node"
+    if isinstance(value, Relationship):
+        return "relationship"
+    if isinstance(value, Path):
+        return "path"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, (list, tuple)):
+        return "list"
+    if isinstance(value, dict):
+        return "map"
+    return type(value).__name__.lower()
+
+
+class ResultWriter:
+    """Incrementally serialise records up to a row and byte budget."""
+
+    def __init__(self, keys: Sequence[str], max_rows: int | None = None, max_bytes: int | None = None) -> None:
+        self.keys = list(keys)
+        self.max_rows = get_graphdb_max_rows() if max_rows is None else max_rows
+        self.max_bytes = get_graphdb_max_result_bytes() if max_bytes is None else max_bytes
+        self.types: list[str | None] = [None] * len(self.keys)
+        self.rows: list[str] = []
+        self.bytes = 0
+        self.truncation: str | None = None
+
+    @property
+    def full(self) -> bool:
+        return self.truncation is not None
+
+    def add(self, record: Any) -> bool:
+        """
+        Serialise one record.  Returns ``False`` (and records why) once the
+        budget is exhausted; the caller should stop pulling records.
+        """
+        if len(self.rows) >= self.max_rows:
+            self.truncation = "row_limit"
+            return False
+        if None in self.types:
+            for i, value in enumerate(record.values()):
+                if self.types[i] is None and value is not None:
+                    self.types[i] = _type_name(value)
+        row = dumps(list(record.data().values()))
+        size = len(row.encode("utf-8"))
+        if self.bytes + size > self.max_bytes:
+            self.truncation = "byte_limit"
+            return False
+        self.rows.append(row)
+        self.bytes += size + 1
+        return True
+
+    def consume(self, records: Iterable[Any], cancel: CancelToken | None = None) -> "ResultWriter":
+        """Add records until the budget is spent; *cancel* is checked between records."""
+        for record in records:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            if not self.add(record):
+                break
+        return self
+
+    def payload(self, **extra: Any) -> str:
+        """Assemble the JSON document from the already‑serialised rows."""
+        head = {
+            "columns": [
+                {"name": k, "type": t or "null"} for k, t in zip(self.keys, self.types)
+            ],
+        }
+        tail: dict[str, Any] = {"row_count": len(self.rows), "truncated": self.full}
+        if self.full:
+            limit = self.max_rows if self.truncation == "row_limit" else self.max_bytes
+            tail["truncation"] = {
+                "reason": self.truncation,
+                "limit": limit,
+                "message": (
+                    f"Result truncated after {len(self.rows)} rows ({self.truncation}). "
+                    "Add a LIMIT, filter further or aggregate to see the rest."
+                ),
+            }
+        tail.update(extra)
+        return (
+            dumps(head)[:-1]
+            + ',"rows":[' + ",".join(self.rows) + "],"
+            + dumps(tail)[1:]
+        )
+
+
+def render_result(
+    result: Any, max_rows: int | None = None, max_bytes: int | None = None, cancel: CancelToken | None = None
+) -> str:
+    """Stream a driver ``Result`` into a capped JSON payload."""
+    return ResultWriter(result.keys(), max_rows, max_bytes).consume(result, cancel).payload()
+
+
+def render_batch(payloads: Sequence[str], **extra: Any) -> str:
+    """Combine already‑rendered per‑statement payloads into one batch document."""
+    head = dict(extra, count=len(payloads))
+    return dumps(head)[:-1] + ',"results":[' + ",".join(payloads) + "]}"
+
+
+def render_error(exc: BaseException | str, code: str | None = None, **extra: Any) -> str:
+    """
+    JSON error payload.  Neo4j status codes are passed through when present,
+    and exceptions exposing a ``details`` mapping have it merged in.
+    """
+    message = str(exc) if not isinstance(exc, BaseException) else (
+        getattr(exc, "message", None) or str(exc) or type(exc).__name__
+    )
+    error = {
+        "code": code or getattr(exc, "code", None) or "cypher_error",
+        "message": message,
+    }
+    error.update(getattr(exc, "details", None) or {})
+    error.update(extra)
+    return dumps({"error": error})
+
+
+def error_code(payload: Any) -> str | None:
+    """The ``code`` of an error payload, or ``None`` for anything else."""
+    if not (isinstance(payload, str) and payload.lstrip().startswith('{"error"')):
+        return None
+    try:
+        return json.loads(payload)["error"].get("code") or "error"
+    except (ValueError, AttributeError, KeyError):
+        return "error"
@@ -0,0 +1,297 @@
+"""
+Registry of named, parameterised Cypher templates.
+
+The templates are the "Key patterns" from ``domain_prompts`` with every
+literal lifted into a ``$parameter``.  Because the query text never
+changes between calls, Neo4j compiles each one once and serves later
+calls from its plan cache.  Period filters are range predicates on the
+``*_dt`` datetime properties added by ``my-doc-assist migrate-temporal``,
+so they seek the range index instead of scanning every string.  Every
+template is checked at import time so that the parameters it declares
+match the ones its Cypher uses.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+_PARAM = re.compile(r"\$(\w+)")
+
+_COERCE = {
+    "integer": int,
+    "string": str,
+    "any": lambda value: value,
+}
+
+
+class PreparedQueryError(ValueError):
+    """Raised for unknown template names or invalid parameters."""
+
+    def __init__(self, message: str, code: str = "invalid_params") -> None:
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass(frozen=True)
+class PreparedQuery:
+    name: str
+    description: str
+    cypher: str
+    params: dict[str, str]
+    defaults: dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        used = set(_PARAM.findall(self.cypher))
+        if used != set(self.params):
+            raise ValueError(
+                f"Template {self.name!r} declares {sorted(self.params)} but uses {sorted(used)}"
+            )
+        unknown = {t for t in self.params.values() if t not in _COERCE}
+        if unknown:
+            raise ValueError(f"Template {self.name!r} has unknown parameter types {unknown}")
+
+    @property
+    def signature(self) -> str:
+        args = [
+            f"{p}: {t}" + (f" = {self.defaults[p]!r}" if p in self.defaults else "")
+            for p, t in self.params.items()
+        ]
+        return f"{self.name}({', '.join(args)})"
+
+    def bind(self, params: dict[str, Any] | None) -> dict[str, Any]:
+        """Validate *params* against the template and coerce them to their types."""
+        params = dict(params or {})
+        extra = set(params) - set(self.params)
+        if extra:
+            raise PreparedQueryError(
+                f"{self.name} got unexpected parameters {sorted(extra)}; expected {self.signature}"
+            )
+        bound: dict[str, Any] = {}
+        for name, type_ in self.params.items():
+            if name in params:
+                value = params[name]
+            elif name in self.defaults:
+                value = self.defaults[name]
+            else:
+                raise PreparedQueryError(
+                    f"{self.name} is missing parameter {name!r}; expected {self.signature}"
+                )
+            try:
+                bound[name] = _COERCE[type_](value)
+            except (TypeError, ValueError):
+                raise PreparedQueryError(
+                    f"{self.name}: parameter {name!r} must be {type_}, got {value!r}"
+                ) from None
+        return bound
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "signature": self.signature,
+            "params": self.params,
+            "defaults": self.defaults,
+            "cypher": self.cypher,
+        }
+
+
+_TEMPLATES = [
+    # People
+    PreparedQuery(
+        "resolve_person",
+        "Patients and providers ranked by full-text match of their name (Lucene query)",
+        "CALL db.index.fulltext.queryNodes('person_name_fulltext', $query, {limit: $limit}) "
+        "YIELD node, score "
+        "RETURN CASE WHEN node:Patient THEN 'patient' ELSE 'provider' END AS kind, "
+        "coalesce(node.patient_id, node.provider_id) AS id, "
+        "coalesce(node.patient_name, node.provider_full_name) AS name, "
+        "round(score, 3) AS score "
+        "ORDER BY score DESC",
+        {"query": "string", "limit": "integer"},
+        {"limit": 5},
+    ),
+    # Vitals – Blood Pressure
+    PreparedQuery(
+        "latest_vitals",
+        "Latest vital-sign records (with blood pressure) for a patient",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_MEASUREMENT]->(vs:VitalSignsRecord) "
+        "OPTIONAL MATCH (vs)-[:HAS_BLOOD_PRESSURE]->(bp:BloodPressureReading) "
+        "RETURN vs, bp ORDER BY vs.vital_recorded_date_time DESC LIMIT $n",
+        {"pid": "integer", "n": "integer"},
+        {"n": 5},
+    ),
+    PreparedQuery(
+        "max_systolic_bp",
+        "Highest systolic blood pressure for a patient in a month ('yyyy-mm')",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_MEASUREMENT]->(:VitalSignsRecord)"
+        "-[:HAS_BLOOD_PRESSURE]->(bp) "
+        "WHERE bp.bp_recorded_dt >= datetime($month + '-01') "
+        "AND bp.bp_recorded_dt < datetime($month + '-01') + duration({months: 1}) "
+        "RETURN MAX(toInteger(bp.bp_systolic)) AS maxSys",
+        {"pid": "integer", "month": "string"},
+    ),
+    PreparedQuery(
+        "vital_record_provider",
+        "Provider who recorded a specific vital-signs record",
+        "MATCH (vs:VitalSignsRecord {record_id: $rid})<-[:HAS_MEASUREMENT]-(p) "
+        "MATCH (vs)-[:RECORDED_BY]->(hp) "
+        "RETURN hp.provider_full_name",
+        {"rid": "any"},
+    ),
+    # Appointments
+    PreparedQuery(
+        "missed_appointments",
+        "Number of missed appointments for a patient in a month ('yyyy-mm')",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_APPOINTMENT]->(a) "
+        "WHERE a.is_missed = 'true' "
+        "AND a.appointment_dt >= datetime($yyyy_mm + '-01') "
+        "AND a.appointment_dt < datetime($yyyy_mm + '-01') + duration({months: 1}) "
+        "RETURN COUNT(a) AS missed",
+        {"pid": "integer", "yyyy_mm": "string"},
+    ),
+    # Consultation & clinical notes
+    PreparedQuery(
+        "consultation_notes",
+        "History, examination and vitals recorded in a consultation",
+        "MATCH (c:Consultation {consultation_id: $cid}) "
+        "OPTIONAL MATCH (c)-[:HAS_HISTORY]->(h) "
+        "OPTIONAL MATCH (c)-[:HAS_EXAMINATION]->(e) "
+        "OPTIONAL MATCH (c)-[:HAS_VITALS]->(v) "
+        "RETURN h, e, v",
+        {"cid": "any"},
+    ),
+    PreparedQuery(
+        "consultations_on_day",
+        "Consultations a patient took part in on a given day ('yyyy-mm-dd')",
+        "MATCH (p:Patient {patient_id: $pid})-[:PARTICIPATED_IN]->(c) "
+        "WHERE c.started_at STARTS WITH $yyyy_mm_dd "
+        "RETURN c.consultation_id, c.status",
+        {"pid": "integer", "yyyy_mm_dd": "string"},
+    ),
+    # Diagnoses & conditions
+    PreparedQuery(
+        "patient_diagnoses",
+        "Diagnoses (and linked treatment plans) for a patient",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_DIAGNOSIS]->(d) "
+        "RETURN d.diagnosis_name AS treatmentPlanStatus, d.treatment_plan_id",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "confirmed_diagnoses",
+        "Diagnoses a doctor has confirmed for a patient",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_DIAGNOSIS]->(d)-[:HAS_TIMELINE]->(t) "
+        "WHERE toLower(t.diagnosis_diagnosisStatus) = 'confirmed' "
+        "RETURN d.diagnosis_name, d.diagnosis_identifier",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "diagnosis_verification_time",
+        "When a specific diagnosis was verified",
+        "MATCH (d:Diagnosis {diagnosis_identifier: $id})-[:HAS_TIMELINE]->(t) "
+        "RETURN t.diagnosis_verified_on AS verificationTime",
+        {"id": "any"},
+    ),
+    # Treatment plans
+    PreparedQuery(
+        "active_treatment_plans",
+        "Active treatment plans for a patient",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_TREATMENT_PLAN]->(tp) "
+        "WHERE tp.status = 'active' "
+        "RETURN tp.treatment_plan_id, tp.lifestyleAdvice",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "treatment_plan_history",
+        "History entries of a treatment plan, newest first",
+        "MATCH (tp:TreatmentPlan {treatment_plan_id: $tid})-[:HAS_HISTORY]->(th) "
+        "RETURN th.activityType, th.remarks ORDER BY th.created_at DESC",
+        {"tid": "integer"},
+    ),
+    # Medications & prescriptions
+    PreparedQuery(
+        "active_medications",
+        "Medications on a patient's active prescriptions",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_PRESCRIPTION]->(rx) "
+        "WHERE toLower(rx.prescription_status) = 'active' "
+        "MATCH (rx)-[:PRESCRIBES]->(m) "
+        "RETURN m.medication_name, rx.prescription_intervals, rx.prescription_timings",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "plan_medication_schedule",
+        "Prescription schedule for a medication (substring match) in a treatment plan",
+        "MATCH (tp:TreatmentPlan {treatment_plan_id: $tid})-[:HAS_PRESCRIPTION]->(rx)"
+        "-[:PRESCRIBES]->(m) "
+        "WHERE toLower(m.medication_name) CONTAINS toLower($medName) "
+        "RETURN rx.prescription_intervals, rx.prescription_timings",
+        {"tid": "integer", "medName": "string"},
+    ),
+    PreparedQuery(
+        "prescription_verifier",
+        "Provider who verified a prescription",
+        "MATCH (hp:HealthcareProvider)-[:VERIFIED_PRESCRIPTION]->"
+        "(rx:Prescription {prescription_id: $rid}) "
+        "RETURN hp.provider_full_name",
+        {"rid": "integer"},
+    ),
+    # Lab / investigation results
+    PreparedQuery(
+        "latest_lab_value",
+        "Latest result of a named test (substring match) for a patient",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_INVESTIGATION_ORDER]->(io)"
+        "-[:USES_SERVICE]->(s) "
+        "WHERE toLower(s.service_name) CONTAINS toLower($testName) "
+        "OPTIONAL MATCH (io)-[:HAS_REPORT]->(r) "
+        "RETURN r.report_value, r.report_date ORDER BY r.report_date DESC LIMIT 1",
+        {"pid": "integer", "testName": "string"},
+    ),
+    PreparedQuery(
+        "pending_investigations",
+        "Investigation orders for a patient that have no report yet",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_INVESTIGATION_ORDER]->(io) "
+        "WHERE NOT (io)-[:HAS_REPORT]->(:InvestigationReport) "
+        "RETURN io.investigation_id, io.status, io.created_at",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "active_investigation_orders",
+        "Open investigation orders (not deleted, no report yet) for a patient, with their service",
+        "MATCH (p:Patient {patient_id: $pid})-[:HAS_INVESTIGATION_ORDER]->(io) "
+        "WHERE io.deleted_at IS NULL AND NOT (io)-[:HAS_REPORT]->(:InvestigationReport) "
+        "OPTIONAL MATCH (io)-[:USES_SERVICE]->(s) "
+        "RETURN io.investigation_id, io.status, io.created_at, s.service_name "
+        "ORDER BY io.created_at DESC",
+        {"pid": "integer"},
+    ),
+    PreparedQuery(
+        "plan_investigations",
+        "Investigation services attached to a treatment plan",
+        "MATCH (tp:TreatmentPlan {treatment_plan_id: $tid})-[:HAS_INVESTIGATION]->"
+        "(s:InvestigationService) "
+        "RETURN s.service_name, s.category",
+        {"tid": "integer"},
+    ),
+    PreparedQuery(
+        "provider_reports_in_year",
+        "Reports added by a provider (name substring) in a given year ('yyyy')",
+        "MATCH (hp:HealthcareProvider) "
+        "WHERE toLower(hp.provider_full_name) CONTAINS toLower($docName) "
+        "MATCH (hp)-[:ADDED_REPORT]->(r) "
+        "WHERE r.report_dt >= datetime($year + '-01-01') "
+        "AND r.report_dt < datetime($year + '-01-01') + duration({years: 1}) "
+        "RETURN r.report_id, r.report_value, r.report_date",
+        {"docName": "string", "year": "string"},
+    ),
+]
+
+PREPARED_QUERIES: dict[str, PreparedQuery] = {t.name: t for t in _TEMPLATES}
+
+
+def get_prepared_query(name: str) -> PreparedQuery:
+    try:
+        return PREPARED_QUERIES[name]
+    except KeyError:
+        raise PreparedQueryError(
+            f"Unknown prepared query {name!r}; available: {', '.join(PREPARED_QUERIES)}",
+            code="unknown_query",
+        ) from None
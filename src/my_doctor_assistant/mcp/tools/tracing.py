@@ -0,0 +1,59 @@
+"""
+Server side of trace propagation, shared by the stdio and SSE servers.
+
+:func:`traced_tool` times each tool call as a server span that continues
+the trace whose ``traceparent`` the client sent in the request's
+``_meta``, so GraphDB spans recorded further down nest under the agent's
+tool call.
+"""
+
+import functools
+import inspect
+from typing import Any, Callable
+
+from mcp.server.lowlevel.server import request_ctx
+
+from my_doctor_assistant.mcp.tools.payload import error_code
+from my_doctor_assistant.utils.tracing import SpanContext, parse_traceparent, span
+
+
+def remote_parent() -> SpanContext | None:
+    """The caller's span from the current MCP request's ``_meta``, if it sent one."""
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        return None
+    value = getattr(meta, "traceparent", None) if meta is not None else None
+    return parse_traceparent(value) if isinstance(value, str) else None
+
+
+def _record_outcome(s, payload: Any) -> None:
+    code = error_code(payload)
+    if code is not None:
+        s.set_error(code)
+
+
+def traced_tool(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Wrap a FastMCP tool function in a ``mcp.tool <name>`` span; the
+    signature and docstring FastMCP reads are kept.  Error payloads mark
+    the span failed with their code.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        attributes = {"mcp.tool": name}
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def traced(*args: Any, **kwargs: Any) -> Any:
+                with span(f"mcp.tool {name}", "server", attributes, remote_parent()) as s:
+                    payload = await fn(*args, **kwargs)
+                    _record_outcome(s, payload)
+                    return payload
+        else:
+            @functools.wraps(fn)
+            def traced(*args: Any, **kwargs: Any) -> Any:
+                with span(f"mcp.tool {name}", "server", attributes, remote_parent()) as s:
+                    payload = fn(*args, **kwargs)
+                    _record_outcome(s, payload)
+                    return payload
+        return traced
+    return decorate
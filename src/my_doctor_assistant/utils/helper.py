@@ -65,6 +65,30 @@ def get_neo4j_credentials() -> tuple[str, str, str]:
     password = os.environ.get("NEO4J_PASSWORD", "")
     return (uri, user, password)
 
+def get_neo4j_driver_config() -> dict:
+    """
+    Returns the pooling options for the shared Neo4j driver.
+    Every value can be overridden from the environment:
+        NEO4J_MAX_POOL_SIZE               (default 100 connections)
+        NEO4J_MAX_CONNECTION_LIFETIME     (default 3600 seconds)
+        NEO4J_LIVENESS_CHECK_TIMEOUT      (default 30 seconds idle before a ping)
+        NEO4J_CONNECTION_ACQUISITION_TIMEOUT (default 60 seconds)
+    """
+    return {
+        "max_connection_pool_size": int(os.environ.get("NEO4J_MAX_POOL_SIZE", "100")),
+        "max_connection_lifetime": float(os.environ.get("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+        "liveness_check_timeout": float(os.environ.get("NEO4J_LIVENESS_CHECK_TIMEOUT", "30")),
+        "connection_acquisition_timeout": float(
+            os.environ.get("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60")
+        ),
+    }
+
+def get_neo4j_database() -> str:
+    """
+    Returns the Neo4j database queries run against (NEO4J_DATABASE, defaults to neo4j).
+    """
+    return os.environ.get("NEO4J_DATABASE", "neo4j")
+
 # ──────────────────────────────────────────────────────────────────────────
 #  New MCP helpers
 # ──────────────────────────────────────────────────────────────────────────
@@ -80,12 +104,281 @@ def get_mcp_url() -> str:
     """Return 'http(s)://host:port' for the MCP server."""
     return os.environ.get("MCP_URL", f"http://{get_mcp_host()}:{get_mcp_port()}")
 
+def get_mcp_call_timeout() -> float:
+    """Return seconds a client waits for one MCP response (defaults to 120)."""
+    return float(os.environ.get("MCP_CALL_TIMEOUT", "120"))
+
+# ──────────────────────────────────────────────────────────────────────────
+#  GraphDB tool execution
+# ──────────────────────────────────────────────────────────────────────────
+def get_graphdb_max_concurrency() -> int:
+    """Return how many Cypher queries may run at once (defaults to 16)."""
+    return int(os.environ.get("GRAPHDB_MAX_CONCURRENCY", "16"))
+
+def get_graphdb_queue_depth() -> int:
+    """Return how many Cypher queries may wait for a worker (defaults to 64)."""
+    return int(os.environ.get("GRAPHDB_QUEUE_DEPTH", "64"))
+
+def get_graphdb_cache_ttl() -> float:
+    """Return seconds a cached GraphDB result stays fresh (defaults to 60; 0 disables)."""
+    return float(os.environ.get("GRAPHDB_CACHE_TTL", "60"))
+
+def get_graphdb_cache_max_bytes() -> int:
+    """Return the in‑memory budget of the GraphDB result cache (defaults to 64 MiB)."""
+    return int(os.environ.get("GRAPHDB_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+def get_graphdb_cache_path() -> str:
+    """Return the SQLite file backing the result cache ('' keeps it memory‑only)."""
+    return os.environ.get("GRAPHDB_CACHE_PATH", "")
+
+def get_graphdb_max_rows() -> int:
+    """Return the most rows a GraphDB result may carry (defaults to 500)."""
+    return int(os.environ.get("GRAPHDB_MAX_ROWS", "500"))
+
+def get_graphdb_max_result_bytes() -> int:
+    """Return the most serialised bytes a GraphDB result may carry (defaults to 256 KiB)."""
+    return int(os.environ.get("GRAPHDB_MAX_RESULT_BYTES", str(256 * 1024)))
+
+def get_graphdb_cursor_ttl() -> float:
+    """Return idle seconds before a paged‑query cursor expires (defaults to 300)."""
+    return float(os.environ.get("GRAPHDB_CURSOR_TTL", "300"))
+
+def get_graphdb_max_open_cursors() -> int:
+    """
+    Return how many paged‑query cursors may be open at once.  Each one
+    pins a pooled connection, so the default is a tenth of
+    NEO4J_MAX_POOL_SIZE (at least 1).
+    """
+    default = max(1, get_neo4j_driver_config()["max_connection_pool_size"] // 10)
+    return int(os.environ.get("GRAPHDB_MAX_OPEN_CURSORS", str(default)))
+
+def get_graphdb_admission_enabled() -> bool:
+    """Return whether queries are EXPLAINed and cost‑checked first (GRAPHDB_ADMISSION_CONTROL, default true)."""
+    return os.environ.get("GRAPHDB_ADMISSION_CONTROL", "true").lower() in {"1", "true", "yes"}
+
+def get_graphdb_max_estimated_rows() -> float:
+    """Return the planner row estimate above which a query is rejected (defaults to 1,000,000)."""
+    return float(os.environ.get("GRAPHDB_MAX_ESTIMATED_ROWS", "1000000"))
+
+def get_graphdb_rejected_operators() -> set[str]:
+    """Return plan operators that cause rejection (defaults to CartesianProduct,AllNodesScan)."""
+    raw = os.environ.get("GRAPHDB_REJECTED_OPERATORS", "CartesianProduct,AllNodesScan")
+    return {op.strip() for op in raw.split(",") if op.strip()}
+
+def get_graphdb_query_timeout() -> float:
+    """Return seconds Neo4j lets one GraphDB query run before aborting it (defaults to 30; 0 disables)."""
+    return float(os.environ.get("GRAPHDB_QUERY_TIMEOUT", "30"))
+
+def get_graphdb_max_batch_size() -> int:
+    """Return the most statements one GraphDBBatch call may carry (defaults to 10)."""
+    return int(os.environ.get("GRAPHDB_MAX_BATCH_SIZE", "10"))
+
+def get_graphdb_auto_parameterize() -> bool:
+    """Return whether inline literals are lifted into query parameters (GRAPHDB_AUTO_PARAMETERIZE, default true)."""
+    return os.environ.get("GRAPHDB_AUTO_PARAMETERIZE", "true").lower() in {"1", "true", "yes"}
+
+def get_graphdb_person_cache_ttl() -> float:
+    """Return seconds a resolve_person answer stays cached (defaults to 600; 0 disables)."""
+    return float(os.environ.get("GRAPHDB_PERSON_CACHE_TTL", "600"))
+
+def get_graphdb_person_cache_max_bytes() -> int:
+    """Return the in‑memory budget of the resolve_person cache (defaults to 1 MiB)."""
+    return int(os.environ.get("GRAPHDB_PERSON_CACHE_MAX_BYTES", str(1024 * 1024)))
+
+# ──────────────────────────────────────────────────────────────────────────
+#  Agent answer cache
+# ──────────────────────────────────────────────────────────────────────────
+def get_semantic_cache_enabled() -> bool:
+    """Return whether agents reuse answers to similar questions (SEMANTIC_CACHE_ENABLED, default false)."""
+    return os.environ.get("SEMANTIC_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+def get_semantic_cache_threshold() -> float:
+    """Return the cosine similarity a cached question needs to be reused (defaults to 0.85)."""
+    return float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+
+def get_semantic_cache_ttl() -> float:
+    """Return seconds a cached answer stays usable (defaults to 3600)."""
+    return float(os.environ.get("SEMANTIC_CACHE_TTL", "3600"))
+
+def get_semantic_cache_max_entries() -> int:
+    """Return how many answers the semantic cache keeps (defaults to 1024)."""
+    return int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+
+def get_semantic_cache_revalidate() -> bool:
+    """Return whether a hit first replays the tool calls behind it (SEMANTIC_CACHE_REVALIDATE, default true)."""
+    return os.environ.get("SEMANTIC_CACHE_REVALIDATE", "true").lower() in {"1", "true", "yes"}
+
+def get_plan_cache_enabled() -> bool:
+    """Return whether agents replay cached tool‑call plans for templated questions (PLAN_CACHE_ENABLED, default false)."""
+    return os.environ.get("PLAN_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+def get_plan_cache_ttl() -> float:
+    """Return seconds a cached question plan stays usable (defaults to 86400)."""
+    return float(os.environ.get("PLAN_CACHE_TTL", "86400"))
+
+def get_plan_cache_max_entries() -> int:
+    """Return how many question plans the plan cache keeps (defaults to 512)."""
+    return int(os.environ.get("PLAN_CACHE_MAX_ENTRIES", "512"))
+
+def get_plan_cache_max_steps() -> int:
+    """Return the most tool calls one cached plan may replay (defaults to 6)."""
+    return int(os.environ.get("PLAN_CACHE_MAX_STEPS", "6"))
+
+# ──────────────────────────────────────────────────────────────────────────
+#  Tracing
+# ──────────────────────────────────────────────────────────────────────────
+def get_trace_exporters() -> set[str]:
+    """Return where finished spans go: ``file`` and/or ``otlp`` (TRACE_EXPORTER, comma‑separated; default off)."""
+    raw = os.environ.get("TRACE_EXPORTER", "")
+    return {name.strip().lower() for name in raw.split(",") if name.strip()} - {"none"}
+
+def get_trace_file() -> str:
+    """Return the JSONL file the ``file`` exporter appends spans to (defaults to traces.jsonl)."""
+    return os.environ.get("TRACE_FILE", "traces.jsonl")
+
+def get_otlp_endpoint() -> str:
+    """Return the OTLP/HTTP collector base URL (defaults to http://localhost:4318)."""
+    return os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+
+def get_trace_service_name() -> str:
+    """Return the service name spans are exported under (OTEL_SERVICE_NAME; empty means the process default)."""
+    return os.environ.get("OTEL_SERVICE_NAME", "")
+
 # ──────────────────────────────────────────────────────────────────────────
 #  Shared utility
 # ──────────────────────────────────────────────────────────────────────────
+_CYPHER_TOKEN = re.compile(
+    r"""
+      (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<ident>`(?:[^`]|``)*`)
+    | (?P<param>\$(?:\w+|`(?:[^`]|``)*`))
+    | (?P<number>(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+-]?\d+)?(?!\w))
+    | (?P<word>[^\W\d]\w*)
+    | (?P<space>\s+)
+    | (?P<punct>\.\.|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# the token kinds that may contain a quote character, for a single‑pass lower‑casing
+_QUOTED = re.compile(
+    r"""(?P<comment>//[^\n]*|/\*.*?\*/)|(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|(?P<ident>`(?:[^`]|``)*`)""",
+    re.DOTALL,
+)
+_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+# statements whose literals are part of the command, not values
+_SCHEMA_WORDS = {"SHOW", "DROP", "ALTER", "TERMINATE", "USE", "GRANT", "DENY", "REVOKE", "START", "STOP"}
+_SCHEMA_OBJECTS = {"INDEX", "CONSTRAINT", "DATABASE", "ALIAS", "USER", "ROLE"}
+
+
+def tokenize_cypher(query: str) -> list[tuple[str, str]]:
+    """
+    Split a Cypher query into ``(kind, text)`` tokens.  Kinds: comment,
+    string, ident (back‑quoted), param, number, word, space, punct.  Quotes,
+    escapes and comments are respected, and joining the texts gives back
+    the original query.
+    """
+    return [(m.lastgroup, m.group()) for m in _CYPHER_TOKEN.finditer(query)]
+
+
+def _unescape(body: str) -> str:
+    def repl(m: re.Match) -> str:
+        esc = m.group(1)
+        if esc[0] == "u" and len(esc) == 5:
+            return chr(int(esc[1:], 16))
+        return _ESCAPES.get(esc, esc)
+    return _ESCAPE.sub(repl, body)
+
+
+def _is_schema_command(tokens: list[tuple[str, str]]) -> bool:
+    words = [text.upper() for kind, text in tokens if kind == "word"][:4]
+    if not words:
+        return False
+    if words[0] in ("EXPLAIN", "PROFILE"):
+        words = words[1:]
+    return bool(words) and (
+        words[0] in _SCHEMA_WORDS
+        or (words[0] == "CREATE" and bool(_SCHEMA_OBJECTS.intersection(words[1:])))
+    )
+
+
 def lowercase_literals(query: str) -> str:
     """
     Lower‑case every quoted literal inside a Cypher query to satisfy
     prompt constraints.
     """
-    return re.sub(r"['\"]([^'\"]*)['\"]", lambda m: f"'{m.group(1).lower()}'", query)
\ No newline at end of file
+    if "'" not in query and '"' not in query:
+        return query
+    return _QUOTED.sub(lambda m: m.group().lower() if m.lastgroup == "string" else m.group(), query)
+
+
+def parameterize_literals(query: str, params: dict | None = None) -> tuple[str, dict]:
+    """
+    Lift string (lower‑cased) and numeric literals into parameters so
+    queries that differ only in their values share one Neo4j plan.
+
+    Returns the rewritten query and *params* merged with the lifted
+    values.  Bounds of variable‑length relationships (``[:R*1..5]``) and
+    of quantified path patterns (``((a)-->(b)){1,3}``) stay inline because
+    Cypher does not accept parameters there, and schema or administration
+    commands are only lower‑cased.
+    """
+    params = dict(params or {})
+    tokens = tokenize_cypher(query)
+    if _is_schema_command(tokens):
+        return lowercase_literals(query), params
+    taken = {text[1:].strip("`") for kind, text in tokens if kind == "param"} | set(params)
+    names: dict[tuple[str, object], str] = {}
+    out: list[str] = []
+    depth = 0          # [...] nesting
+    in_bounds = False  # after `*` inside brackets, until the range ends
+    in_quantifier = False  # `{n,m}` after a pattern, until the `}`
+    prev: list[str] = ["", ""]  # the last two significant tokens
+    for kind, text in tokens:
+        if kind not in ("space", "comment"):
+            before, prev = prev, [prev[1], text]
+        if kind == "punct":
+            if text == "[":
+                depth += 1
+            elif text == "]":
+                depth = max(depth - 1, 0)
+            if text == "*" and depth:
+                in_bounds = True
+            elif text != "..":
+                in_bounds = False
+            if text == "{":
+                in_quantifier = before[1] in (")", "-") or before == ["-", ">"]
+            elif text != ",":
+                in_quantifier = False
+        elif kind == "string" or (kind == "number" and not (in_bounds or in_quantifier)):
+            if kind == "string":
+                value: object = _unescape(text[1:-1]).lower()
+            else:
+                value = float(text) if any(c in text for c in ".eE") else int(text)
+            key = (type(value).__name__, value)
+            name = names.get(key)
+            if name is None:
+                name = f"lit{len(names)}"
+                while name in taken:
+                    name = "_" + name
+                names[key] = name
+                params[name] = value
+            out.append("$" + name)
+            continue
+        elif kind not in ("space", "comment"):
+            in_bounds = in_bounds and kind == "number"
+            in_quantifier = in_quantifier and kind == "number"
+        out.append(text)
+    return "".join(out), params
+
+
+def percentile(values: list[float], q: float) -> float:
+    """The *q*‑th percentile (0–100) of *values*, linearly interpolated; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
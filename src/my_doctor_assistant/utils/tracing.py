@@ -0,0 +1,521 @@
+"""
+Span tracing for the agent loop and the GraphDB tool.
+
+A span times one step (an LLM call, the output parser, an MCP round trip,
+a Cypher query) and nests under the span that was current when it
+started.  The current span lives in a context variable, so asyncio tasks
+and the GraphDB executor threads, which run with a copy of the caller's
+context, attach their spans to the right parent.  Across the MCP boundary
+the client sends a W3C ``traceparent`` in the request's ``_meta`` and the
+server continues the trace from it.
+
+Nothing is recorded unless an exporter is configured or a
+:meth:`Tracer.collect` block is open; with tracing off a hook costs one
+context‑variable lookup.  Exporters (TRACE_EXPORTER, comma‑separated):
+
+* ``file`` – one JSON object per finished span appended to TRACE_FILE;
+* ``otlp`` – batches POSTed as OTLP/HTTP JSON to
+  ``$OTEL_EXPORTER_OTLP_ENDPOINT/v1/traces`` (an OpenTelemetry Collector,
+  Jaeger, Tempo, ...).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from my_doctor_assistant.utils.helper import (
+    get_otlp_endpoint,
+    get_trace_exporters,
+    get_trace_file,
+    get_trace_service_name,
+)
+
+logger = logging.getLogger(__name__)
+
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+class SpanContext(NamedTuple):
+    """The ids a remote parent contributes: its trace and its span."""
+
+    trace_id: str
+    span_id: str
+
+
+def parse_traceparent(value: str | None) -> SpanContext | None:
+    """Parse a W3C ``traceparent`` header; ``None`` if it is missing or malformed."""
+    match = _TRACEPARENT.match(value.strip().lower()) if value else None
+    if match is None or not int(match.group(1), 16) or not int(match.group(2), 16):
+        return None
+    return SpanContext(match.group(1), match.group(2))
+
+
+@dataclass
+class Span:
+    """One timed step; use as a context manager to make it the current span."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    service: str = ""
+    _tracer: "Tracer | None" = field(default=None, repr=False, compare=False)
+    _perf_ns: int = field(default_factory=time.perf_counter_ns, repr=False, compare=False)
+    _token: Token | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self) -> None:
+        """Finish the span (idempotent) and hand it to the exporters."""
+        if self.end_ns is not None:
+            return
+        # wall‑clock start, monotonic duration
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._perf_ns)
+        if self._tracer is not None:
+            self._tracer.finish(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}" if str(exc) else exc_type.__name__
+        self.end()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "service": self.service,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Span":
+        return cls(
+            name=data["name"],
+            trace_id=data["trace_id"],
+            span_id=data["span_id"],
+            parent_id=data.get("parent_id"),
+            kind=data.get("kind", "internal"),
+            start_ns=data["start_ns"],
+            end_ns=data.get("end_ns"),
+            attributes=data.get("attributes") or {},
+            error=data.get("error"),
+            service=data.get("service", ""),
+        )
+
+
+class _NoopSpan:
+    """Stand‑in returned while tracing is off; every method does nothing."""
+
+    traceparent = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+# ── exporters ─────────────────────────────────────────────────────────
+class FileExporter:
+    """Append each finished span as one JSON line; safe to share between processes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._fh is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(line)  # one short append per span, so concurrent writers do not interleave
+            self._fh.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    out = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        out["parentSpanId"] = span.parent_id
+    return out
+
+
+_STOP = object()
+
+
+class OTLPExporter:
+    """
+    POST finished spans in batches to an OTLP/HTTP collector from a
+    background thread.  Spans are dropped, not buffered without bound,
+    while the collector is unreachable.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        batch_size: int = 256,
+        interval: float = 1.0,
+        timeout: float = 5.0,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.url = f"{endpoint}/v1/traces"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._warned = False
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        batch: list[Span] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._post(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._post(batch)
+                batch = []
+                deadline = time.monotonic() + self.interval
+
+    def _post(self, spans: list[Span]) -> None:
+        if not spans:
+            return
+        by_service: dict[str, list[Span]] = {}
+        for span in spans:
+            by_service.setdefault(span.service, []).append(span)
+        body = {"resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(service)}]},
+                "scopeSpans": [{
+                    "scope": {"name": "my_doctor_assistant"},
+                    "spans": [_otlp_span(s) for s in group],
+                }],
+            }
+            for service, group in by_service.items()
+        ]}
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body, default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+            self._warned = False
+        except OSError as exc:  # URLError and timeouts included
+            if not self._warned:
+                logger.warning("OTLP export to %s failed: %s; dropping spans", self.url, exc)
+                self._warned = True
+
+    def shutdown(self) -> None:
+        try:
+            self._queue.put(_STOP, timeout=1)
+        except queue.Full:
+            return
+        self._thread.join(self.timeout)
+
+
+# ── tracer ────────────────────────────────────────────────────────────
+class Tracer:
+    """Create spans and pass finished ones to the exporters and open collectors."""
+
+    def __init__(self, service: str, exporters: Iterable[Any] = ()) -> None:
+        self.service = service
+        self.exporters = list(exporters)
+        self._collectors: list[list[Span]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.exporters or self._collectors)
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: dict[str, Any] | None = None,
+        parent: Span | SpanContext | None = None,
+    ) -> Span | _NoopSpan:
+        """
+        Start a span under *parent*, or under the current span when *parent*
+        is ``None``; without either it starts a new trace.
+        """
+        if not self.active:
+            return NOOP_SPAN
+        if parent is None:
+            parent = _current.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else _new_id(128),
+            span_id=_new_id(64),
+            parent_id=parent.span_id if parent is not None else None,
+            kind=kind,
+            attributes=dict(attributes or {}),
+            service=self.service,
+            _tracer=self,
+        )
+
+    def finish(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as exc:  # noqa: BLE001 – tracing must never fail the traced call
+                logger.debug("span export failed: %r", exc)
+        if self._collectors:
+            with self._lock:
+                for spans in self._collectors:
+                    spans.append(span)
+
+    @contextmanager
+    def collect(self) -> Iterator[list[Span]]:
+        """Gather every span finished in this process while the block is open."""
+        spans: list[Span] = []
+        with self._lock:
+            self._collectors.append(spans)
+        try:
+            yield spans
+        finally:
+            with self._lock:
+                self._collectors = [c for c in self._collectors if c is not spans]
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+_default_service = "my-doctor-assistant"
+
+
+def _make_exporters() -> list[Any]:
+    exporters = []
+    for name in sorted(get_trace_exporters()):
+        if name == "file":
+            exporters.append(FileExporter(get_trace_file()))
+        elif name == "otlp":
+            exporters.append(OTLPExporter(get_otlp_endpoint()))
+        else:
+            logger.warning("Unknown TRACE_EXPORTER %r; expected 'file' or 'otlp'", name)
+    return exporters
+
+
+def get_tracer() -> Tracer:
+    """Return the process‑wide tracer, with exporters from the environment."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(get_trace_service_name() or _default_service, _make_exporters())
+                atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def set_service_name(name: str) -> None:
+    """Name this process's spans, unless OTEL_SERVICE_NAME already does."""
+    global _default_service
+    _default_service = name
+    if _tracer is not None and not get_trace_service_name():
+        _tracer.service = name
+
+
+def span(
+    name: str,
+    kind: str = "internal",
+    attributes: dict[str, Any] | None = None,
+    parent: Span | SpanContext | None = None,
+) -> Span | _NoopSpan:
+    """``with span("step"):`` – time a block as a child of the current span."""
+    return get_tracer().start_span(name, kind, attributes, parent)
+
+
+def current_span() -> Span | _NoopSpan:
+    """The innermost open span of this context (a no‑op span if none)."""
+    return _current.get() or NOOP_SPAN
+
+
+def use_span(span: Span | _NoopSpan | None) -> Token:
+    """Make *span* current without ending it later; undo with :func:`restore_span`."""
+    return _current.set(span if isinstance(span, Span) else None)
+
+
+def restore_span(token: Token) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:  # set in another context; nothing of ours to undo here
+        pass
+
+
+def trace_environment() -> dict[str, str]:
+    """The tracing variables of this process, for passing on to a subprocess."""
+    return {k: v for k, v in os.environ.items() if k.startswith(("TRACE_", "OTEL_"))}
+
+
+# ── reading traces back ───────────────────────────────────────────────
+def read_spans(path: str, trace_ids: set[str], offset: int = 0) -> list[Span]:
+    """Spans of *trace_ids* in a ``file`` exporter's output, from byte *offset* on."""
+    spans = []
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            for line in fh:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue  # a line another process is still writing
+                if data.get("trace_id") in trace_ids:
+                    spans.append(Span.from_dict(data))
+    except FileNotFoundError:
+        pass
+    return spans
+
+
+def timings_report(spans: list[Span]) -> str:
+    """
+    An indented tree of *spans* with their durations, followed by a split of
+    the total across the LLM, the output parser, MCP transport, the server
+    and Neo4j.
+    """
+    unique = {s.span_id: s for s in spans}
+    children: dict[str | None, list[Span]] = {}
+    for s in unique.values():
+        parent = s.parent_id if s.parent_id in unique else None
+        children.setdefault(parent, []).append(s)
+
+    lines = []
+
+    def walk(parent: str | None, depth: int) -> None:
+        for s in sorted(children.get(parent, []), key=lambda s: s.start_ns):
+            label = "  " * depth + s.name
+            lines.append(f"{label:<52}{s.duration_ms:>10.1f} ms" + (f"   ✗ {s.error}" if s.error else ""))
+            walk(s.span_id, depth + 1)
+
+    walk(None, 0)
+
+    def total(prefix: str) -> float:
+        return sum(s.duration_ms for s in unique.values() if s.name.startswith(prefix))
+
+    # server spans whose client span is missing would be counted twice
+    wall = sum(s.duration_ms for s in children.get(None, []) if s.kind != "server")
+    llm, parse, mcp = total("llm "), total("agent.parse"), total("mcp.call ")
+    server, neo4j, serialize = total("mcp.tool "), total("graphdb.execute"), total("graphdb.serialize")
+    parts = [("llm", llm), ("parser", parse)]
+    if server:
+        parts += [
+            ("mcp transport", max(0.0, mcp - server)),
+            ("server", max(0.0, server - neo4j)),
+            ("neo4j", max(0.0, neo4j - serialize)),
+            ("fetch+serialize", serialize),
+        ]
+    else:
+        parts.append(("mcp", mcp))
+    parts.append(("other", max(0.0, wall - llm - parse - mcp)))
+    split = " · ".join(
+        f"{label} {ms:,.1f} ms ({ms / wall:.0%})" if wall else f"{label} {ms:,.1f} ms"
+        for label, ms in parts
+    )
+    lines.append(f"total {wall:,.1f} ms: {split}")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from my_doctor_assistant.mcp.tools.admission import AdmissionController, QueryCostError, assess_plan
+
+REJECTED = {"CartesianProduct", "AllNodesScan"}
+
+
+def op(operator, rows=1.0, details="", *children):
+    return {
+        "operatorType": operator,
+        "args": {"EstimatedRows": rows, "Details": details},
+        "children": list(children),
+    }
+
+
+def test_cheap_plan_is_admitted():
+    plan = op("ProduceResults@neo4j", 1, "", op("NodeIndexSeek@neo4j", 1, "p:Patient(patient_id)"))
+    assert assess_plan(plan, 10_000, REJECTED) is None
+
+
+def test_rejected_operator_is_reported_once():
+    plan = op("ProduceResults", 10, "",
+              op("CartesianProduct", 10, "",
+                 op("AllNodesScan", 5), op("AllNodesScan", 5)))
+    error = assess_plan(plan, 10_000, REJECTED)
+    assert error.reasons == ["CartesianProduct in plan", "AllNodesScan in plan"]
+    assert len(error.hints) == 2
+    assert "label" in error.hints[1]
+
+
+def test_operator_name_suffixes_are_ignored():
+    plan = op("ProduceResults", 1, "", op("AllNodesScan(Pipelined)@neo4j", 1))
+    assert assess_plan(plan, 10_000, REJECTED).reasons == ["AllNodesScan in plan"]
+
+
+def test_unrejected_operator_passes():
+    plan = op("NodeByLabelScan", 50)
+    assert assess_plan(plan, 10_000, REJECTED) is None
+    assert assess_plan(plan, 10_000, REJECTED | {"NodeByLabelScan"}) is not None
+
+
+def test_estimated_rows_over_budget():
+    plan = op("ProduceResults", 12, "", op("Expand(All)", 50_000))
+    error = assess_plan(plan, 10_000, REJECTED)
+    assert error.reasons == ["estimated 50,000 rows exceeds budget of 10,000"]
+    assert error.estimated_rows == 50_000
+
+
+@pytest.mark.parametrize("details", ["(a)-[:RESCHEDULED_TO*]->(b)", "(a)-[:RESCHEDULED_TO*2..]->(b)"])
+def test_unbounded_var_length_expansion(details):
+    plan = op("ProduceResults", 1, "", op("VarLengthExpand(All)", 1, details))
+    error = assess_plan(plan, 10_000, REJECTED)
+    assert error.reasons == ["unbounded variable-length expansion (VarLengthExpand(All))"]
+    assert "*1..5" in error.hints[0]
+
+
+def test_bounded_var_length_expansion_passes():
+    plan = op("ProduceResults", 1, "", op("VarLengthExpand(All)", 1, "(a)-[:RESCHEDULED_TO*1..5]->(b)"))
+    assert assess_plan(plan, 10_000, REJECTED) is None
+
+
+def test_unbounded_pattern_found_in_query_text():
+    plan = op("ProduceResults", 1, "", op("ShortestPath", 1))
+    query = "MATCH p = shortestPath((a)-[:HAS_PARENT_PLAN*..]-(b)) RETURN p"
+    assert assess_plan(plan, 10_000, REJECTED, query) is not None
+
+
+def test_arguments_key_is_accepted():
+    plan = {"operatorType": "Expand(All)", "arguments": {"EstimatedRows": 20_000}}
+    assert assess_plan(plan, 10_000, REJECTED) is not None
+
+
+class Summary:
+    def __init__(self, plan):
+        self.plan = plan
+
+
+class ExplainSession:
+    def __init__(self, plan):
+        self.plan = plan
+        self.explained = []
+
+    def run(self, query, params):
+        self.explained.append(query)
+        plan = self.plan
+        return type("Result", (), {"consume": lambda _: Summary(plan)})()
+
+
+def test_controller_remembers_verdicts():
+    controller = AdmissionController(True, 10_000, REJECTED)
+    session = ExplainSession(op("AllNodesScan", 1))
+    for _ in range(2):
+        with pytest.raises(QueryCostError):
+            controller.check(session, "MATCH (n) RETURN n")
+    assert session.explained == ["EXPLAIN MATCH (n) RETURN n"]
+    assert controller.rejected == 2
+
+
+def test_controller_skips_schema_commands_and_when_disabled():
+    session = ExplainSession(op("AllNodesScan", 1))
+    AdmissionController(True, 10_000, REJECTED).check(session, "SHOW INDEXES")
+    AdmissionController(False, 10_000, REJECTED).check(session, "MATCH (n) RETURN n")
+    assert session.explained == []
+
+
+def test_rejections_are_counted_across_threads():
+    controller = AdmissionController(True, 10_000, REJECTED)
+    session = ExplainSession(op("AllNodesScan", 1))
+
+    def reject_many():
+        for _ in range(200):
+            with pytest.raises(QueryCostError):
+                controller.check(session, "MATCH (n) RETURN n")
+
+    threads = [threading.Thread(target=reject_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert controller.rejected == 1600
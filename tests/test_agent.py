@@ -0,0 +1,48 @@
+import pytest
+
+from my_doctor_assistant.mcp import agent as shared
+from my_doctor_assistant.mcp.agent import AgentTools, BaseMedicalQAAgent
+from my_doctor_assistant.mcp.sse import testagentMCPsse
+from my_doctor_assistant.mcp.sse.server import medical_graph_server as sse_server
+from my_doctor_assistant.mcp.stdio import testagentMCPstdio
+from my_doctor_assistant.mcp.stdio.server import medical_graph_server as stdio_server
+from test_session import manager, running
+
+
+@pytest.mark.parametrize("name", [
+    "TOOL_NAME", "PAGED_TOOL_NAME", "NEXT_PAGE_TOOL_NAME", "PREPARED_TOOL_NAME", "BATCH_TOOL_NAME",
+])
+def test_tool_names_match_both_servers(name):
+    assert getattr(shared, name) == getattr(stdio_server, name) == getattr(sse_server, name)
+
+
+def test_transports_share_the_agent():
+    for module, transport in ((testagentMCPstdio, "stdio"), (testagentMCPsse, "sse")):
+        assert issubclass(module.MedicalQAAgent, BaseMedicalQAAgent)
+        assert module.MedicalQAAgent.transport == transport
+        assert module.MedicalQAAgent.tools.get_session is module.get_session
+
+
+@pytest.fixture
+def agent_class(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    session = manager()
+
+    class Agent(BaseMedicalQAAgent):
+        tools = AgentTools(session.start)
+        transport = "test"
+
+    Agent.session_manager = session
+    yield Agent
+    session.close()
+
+
+def test_closing_one_agent_keeps_the_shared_session(agent_class):
+    first = agent_class(domain="vitals", semantic_cache=False, plan_cache=False, verbose=False)
+    second = agent_class(domain="labs", semantic_cache=False, plan_cache=False, verbose=False)
+    assert first.prompt == shared.OFFLINE_PROMPT_MAP["vitals"]  # server unreachable: baked-in prompt
+    first.close()
+    first.close()
+    assert running(agent_class.session_manager)
+    second.close()
+    assert not running(agent_class.session_manager)
@@ -0,0 +1,140 @@
+import pytest
+
+from my_doctor_assistant.mcp.tools import cache as cache_module
+from my_doctor_assistant.mcp.tools import graphdb
+from my_doctor_assistant.mcp.tools.cache import QueryResultCache, cache_key, is_write_query
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (n) RETURN n",
+    "MATCH (n) RETURN n.set",
+    "MATCH (n) RETURN n.create AS c, n.`delete`",
+    "RETURN {set: 1, merge : 2} AS m",
+    "MATCH (n:Create)-[:DELETE]->(m) RETURN m",
+    "MATCH (n) WHERE n.name CONTAINS 'set' RETURN n",
+    "MATCH (n) // create a node\nRETURN n",
+    "MATCH (n) /* MERGE */ RETURN n",
+    "CALL { MATCH (n) RETURN n } RETURN n",
+    "CALL db.labels()",
+    "CALL db.index.fulltext.queryNodes('person_name_fulltext', $q) YIELD node RETURN node",
+    "CALL db.schema.visualization()",
+])
+def test_reads(query):
+    assert not is_write_query(query)
+
+
+@pytest.mark.parametrize("query", [
+    "CREATE (n:Patient {name: 'siri'})",
+    "MATCH (n) SET n.flag = true",
+    "MATCH (n) set n:Flagged",
+    "MERGE (n:Patient {id: 1}) ON CREATE SET n.seen = 1",
+    "MATCH (n) DETACH DELETE n",
+    "MATCH (n) REMOVE n.flag",
+    "UNWIND [1, 2] AS x FOREACH (y IN [x] | CREATE ())",
+    "LOAD CSV FROM 'file:///x.csv' AS row RETURN row",
+    "CALL apoc.create.node(['Patient'], {}) YIELD node RETURN node",
+    "CALL `apoc`.refactor.rename.label('A', 'B')",
+    "CALL { CREATE (n) } RETURN 1",
+])
+def test_writes(query):
+    assert is_write_query(query)
+
+
+def test_cache_key_ignores_layout_and_literal_case():
+    assert cache_key("MATCH (n {name: 'Siri'})\n  RETURN n;") == cache_key("MATCH (n {name: 'siri'}) RETURN n")
+    assert cache_key("RETURN $x", {"x": 1}) != cache_key("RETURN $x", {"x": 2})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire(clock):
+    cache = QueryResultCache(ttl=10, max_bytes=1000)
+    cache.put("k", "v")
+    cache.put("short", "v", ttl=1)
+    clock[0] += 5
+    assert cache.get("k") == "v"
+    assert cache.get("short") is None
+    clock[0] += 6
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_by_bytes(clock):
+    cache = QueryResultCache(ttl=10, max_bytes=25)
+    cache.put("a", "x" * 9)
+    cache.put("b", "x" * 9)
+    cache.get("a")
+    cache.put("c", "x" * 9)
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == "x" * 9
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 20
+
+
+def test_oversized_values_are_not_cached(clock):
+    cache = QueryResultCache(ttl=10, max_bytes=10)
+    cache.put("k", "x" * 20)
+    assert cache.get("k") is None
+
+
+def test_disabled_cache(clock):
+    cache = QueryResultCache(ttl=0, max_bytes=1000)
+    cache.put("k", "v")
+    assert cache.get("k") is None
+    assert not cache.stats()["enabled"]
+
+
+def test_invalidate_all_and_stats(clock):
+    cache = QueryResultCache(ttl=10, max_bytes=1000)
+    cache.put("k", "v")
+    cache.get("k")
+    cache.get("missing")
+    cache.invalidate_all()
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == round(1 / 3, 4)
+
+
+def test_disk_tier_survives_a_restart(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    QueryResultCache(ttl=10, max_bytes=1000, path=path).put("k", "v")
+    restarted = QueryResultCache(ttl=10, max_bytes=1000, path=path)
+    assert restarted.get("k") == "v"
+    assert restarted.stats()["disk_hits"] == 1
+    clock[0] += 11
+    assert QueryResultCache(ttl=10, max_bytes=1000, path=path).get("k") is None
+
+
+def test_read_only_procedure_leaves_cached_entries_alone(clock, monkeypatch):
+    cache = QueryResultCache(ttl=10, max_bytes=1000)
+    cache.put("k", "v")
+    monkeypatch.setattr(graphdb, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(graphdb, "_execute", lambda query, params=None, cancel=None: "rows")
+    fulltext = "CALL db.index.fulltext.queryNodes('person_name_fulltext', $q) YIELD node RETURN node"
+    assert graphdb._execute_and_cache(fulltext, {"q": "siri~"}) == "rows"
+    assert cache.get("k") == "v"
+    assert cache.get(cache_key(fulltext, {"q": "siri~"})) == "rows"
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_read_overlapping_a_write_is_not_cached(clock, monkeypatch):
+    cache = QueryResultCache(ttl=10, max_bytes=1000)
+    monkeypatch.setattr(graphdb, "get_result_cache", lambda: cache)
+
+    def execute(query, params=None, cancel=None):
+        if query.endswith("RETURN n.bp"):  # a write lands while the read runs
+            graphdb._execute_and_cache("MATCH (n) SET n.bp = '140/90'")
+            return "stale"
+        return "written"
+
+    monkeypatch.setattr(graphdb, "_execute", execute)
+    assert graphdb._execute_and_cache("MATCH (n) RETURN n.bp") == "stale"
+    assert cache.get(cache_key("MATCH (n) RETURN n.bp")) is None
+    assert cache.generation == 1
@@ -0,0 +1,97 @@
+import pytest
+
+from my_doctor_assistant.infrastructure.database.neo4j import connection
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.mcp.tools.metrics import render_metrics
+
+
+class FakeDriver:
+    def __init__(self, uri, auth, **config):
+        self.uri, self.auth, self.config = uri, auth, config
+        self.closed = False
+
+    def verify_connectivity(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    built = []
+
+    def driver(uri, auth, **config):
+        built.append(FakeDriver(uri, auth, **config))
+        return built[-1]
+
+    monkeypatch.setattr(connection.GraphDatabase, "driver", driver)
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", None)
+    monkeypatch.setenv("NEO4J_URI", "bolt://db:7687")
+    monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "7")
+    yield built
+    Neo4jDBConnection._shared_driver = None
+
+
+def test_instances_share_one_driver(drivers):
+    first = Neo4jDBConnection().start()
+    second = Neo4jDBConnection().start()
+    assert first is second is drivers[0]
+    assert len(drivers) == 1
+    assert drivers[0].uri == "bolt://db:7687"
+    assert drivers[0].config["max_connection_pool_size"] == 7
+
+
+def test_close_releases_the_shared_driver(drivers):
+    driver = Neo4jDBConnection().start()
+    Neo4jDBConnection.close()
+    assert driver.closed
+    assert Neo4jDBConnection().start() is not driver
+
+
+def test_unreachable_server_is_not_cached(drivers, monkeypatch):
+    def refuse(self):
+        raise OSError("refused")
+
+    monkeypatch.setattr(FakeDriver, "verify_connectivity", refuse)
+    with pytest.raises(OSError):
+        Neo4jDBConnection().start()
+    assert drivers[0].closed
+    assert Neo4jDBConnection._shared_driver is None
+
+
+def test_database_comes_from_the_environment(drivers, monkeypatch):
+    monkeypatch.setenv("NEO4J_DATABASE", "clinic")
+    assert Neo4jDBConnection().get_database() == "clinic"
+
+
+@pytest.fixture
+def unconnected_driver(monkeypatch):
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver("bolt://127.0.0.1:9", auth=("neo4j", "x"), max_connection_pool_size=7)
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", driver)
+    yield driver
+    driver.close()
+
+
+def test_pool_stats_reads_the_installed_driver(unconnected_driver):
+    # guards the private attributes pool_stats relies on across neo4j upgrades
+    assert Neo4jDBConnection.pool_stats() == {"in_use": 0, "idle": 0, "max_size": 7}
+
+
+def test_pool_stats_fails_soft(monkeypatch):
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", None)
+    assert Neo4jDBConnection.pool_stats() is None  # no driver yet
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", object())
+    assert Neo4jDBConnection.pool_stats() is None
+
+    class BrokenPool:
+        lock = None  # not a context manager
+
+    class Driver:
+        _pool = BrokenPool()
+
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", Driver())
+    assert Neo4jDBConnection.pool_stats() is None
+    assert "# TYPE neo4j_pool_connections gauge" in render_metrics()  # the scrape still works
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from neo4j import Record
+
+from my_doctor_assistant.infrastructure.database.neo4j.connection import Neo4jDBConnection
+from my_doctor_assistant.mcp.tools import cursors
+from my_doctor_assistant.mcp.tools.cursors import CursorNotFoundError, CursorRegistry
+from my_doctor_assistant.utils.helper import get_graphdb_max_open_cursors
+
+
+class FakeResult:
+    def __init__(self, n):
+        self.records = [Record({"i": i}) for i in range(n)]
+
+    def keys(self):
+        return ["i"]
+
+    def peek(self):
+        return self.records[0] if self.records else None
+
+    def fetch(self, n):
+        del self.records[:n]
+
+    def consume(self):
+        self.records.clear()
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+        self.timeouts = []
+
+    def run(self, query, params):
+        self.timeouts.append(query.timeout)
+        return FakeResult(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    def __init__(self, rows):
+        self.rows = rows
+        self.sessions = []
+
+    def session(self, **config):
+        self.sessions.append(FakeSession(self.rows))
+        return self.sessions[-1]
+
+
+class Allow:
+    def check(self, session, query, params=None):
+        pass
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    driver = FakeDriver(rows=10)
+    monkeypatch.setattr(Neo4jDBConnection, "_shared_driver", driver)
+    monkeypatch.setattr(cursors, "get_admission_controller", Allow)
+    monkeypatch.setenv("GRAPHDB_QUERY_TIMEOUT", "30")
+    return driver
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cursors.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_pages_through_and_releases_the_session(driver):
+    registry = CursorRegistry(ttl=60, max_open=2, max_page_size=100)
+    page = json.loads(registry.open("MATCH (n) RETURN n", page_size=4))
+    rows = page["rows"]
+    while page["has_more"]:
+        page = json.loads(registry.next_page(page["cursor"]))
+        rows += page["rows"]
+    assert rows == [[i] for i in range(10)]
+    assert driver.sessions[0].closed
+    assert registry.open_count == 0
+
+
+def test_cap_closes_the_least_recently_used_cursor(driver):
+    registry = CursorRegistry(ttl=60, max_open=2, max_page_size=100)
+    ids = [json.loads(registry.open("MATCH (n) RETURN n", page_size=1))["cursor"] for _ in range(3)]
+    assert registry.open_count == 2
+    assert [s.closed for s in driver.sessions] == [True, False, False]
+    with pytest.raises(CursorNotFoundError):
+        registry.next_page(ids[0])
+
+
+def test_cursor_never_outlives_its_transaction(driver, clock):
+    registry = CursorRegistry(ttl=20, max_open=2, max_page_size=100)
+    cursor_id = json.loads(registry.open("MATCH (n) RETURN n", page_size=1))["cursor"]
+    assert driver.sessions[0].timeouts == [30]
+    clock[0] += 15
+    registry.next_page(cursor_id)  # still idle-fresh, but only 15s of the transaction left
+    clock[0] += 15
+    with pytest.raises(CursorNotFoundError):
+        registry.next_page(cursor_id)
+    assert driver.sessions[0].closed
+
+
+def test_default_cap_follows_the_pool_size(monkeypatch):
+    monkeypatch.delenv("GRAPHDB_MAX_OPEN_CURSORS", raising=False)
+    monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "100")
+    assert get_graphdb_max_open_cursors() == 10
+    monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "5")
+    assert get_graphdb_max_open_cursors() == 1
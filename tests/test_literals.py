@@ -0,0 +1,91 @@
+import pytest
+
+from my_doctor_assistant.utils.helper import (
+    lowercase_literals,
+    parameterize_literals,
+    tokenize_cypher,
+)
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (p:Patient {name: 'Siri'}) RETURN p.`weird name`, $x // trailing\n",
+    "RETURN 'it\\'s', \"a \\\"b\\\"\", /* block */ 1.5e3, .5, [*1..5]",
+    "",
+])
+def test_tokens_round_trip(query):
+    assert "".join(text for _, text in tokenize_cypher(query)) == query
+
+
+def test_token_kinds():
+    tokens = [t for t in tokenize_cypher("MATCH (n) WHERE n.x > .5 AND n.y = $y RETURN 'a//b' // c") if t[0] != "space"]
+    assert tokens == [
+        ("word", "MATCH"), ("punct", "("), ("word", "n"), ("punct", ")"),
+        ("word", "WHERE"), ("word", "n"), ("punct", "."), ("word", "x"), ("punct", ">"), ("number", ".5"),
+        ("word", "AND"), ("word", "n"), ("punct", "."), ("word", "y"), ("punct", "="), ("param", "$y"),
+        ("word", "RETURN"), ("string", "'a//b'"), ("comment", "// c"),
+    ]
+
+
+def test_range_dots_are_not_numbers():
+    assert tokenize_cypher("[*1..5]") == [
+        ("punct", "["), ("punct", "*"), ("number", "1"), ("punct", ".."), ("number", "5"), ("punct", "]"),
+    ]
+    assert ("number", ".5") not in tokenize_cypher("[*..5]")
+
+
+def test_lowercase_literals_leaves_identifiers_and_comments():
+    query = "MATCH (p:Patient {name: 'Siri'}) // 'Keep'\nRETURN p.`Name`, \"BP\""
+    assert lowercase_literals(query) == "MATCH (p:Patient {name: 'siri'}) // 'Keep'\nRETURN p.`Name`, \"bp\""
+
+
+def test_parameterize_strings_and_numbers():
+    query, params = parameterize_literals(
+        "MATCH (p:Patient {name: 'Siri'}) WHERE p.age > 40 AND p.bmi < 27.5 RETURN p LIMIT 40"
+    )
+    assert query == "MATCH (p:Patient {name: $lit0}) WHERE p.age > $lit1 AND p.bmi < $lit2 RETURN p LIMIT $lit1"
+    assert params == {"lit0": "siri", "lit1": 40, "lit2": 27.5}
+
+
+def test_parameterize_leading_dot_number():
+    assert parameterize_literals("MATCH (n) RETURN n.x * .5 AS y") == (
+        "MATCH (n) RETURN n.x * $lit0 AS y", {"lit0": 0.5},
+    )
+
+
+def test_parameterize_unescapes_strings():
+    _, params = parameterize_literals("RETURN 'O\\'Brien\\n', '\\u00C9'")
+    assert params == {"lit0": "o'brien\n", "lit1": "é"}
+
+
+def test_parameterize_keeps_var_length_bounds_inline():
+    query, params = parameterize_literals("MATCH (a)-[:RESCHEDULED_TO*1..5]->(b) WHERE a.n = 5 RETURN b")
+    assert query == "MATCH (a)-[:RESCHEDULED_TO*1..5]->(b) WHERE a.n = $lit0 RETURN b"
+    assert params == {"lit0": 5}
+
+
+def test_parameterize_avoids_taken_names():
+    query, params = parameterize_literals("MATCH (n {id: $lit0}) RETURN 'x'", {"lit0": 1})
+    assert query == "MATCH (n {id: $lit0}) RETURN $_lit0"
+    assert params == {"lit0": 1, "_lit0": "x"}
+
+
+def test_schema_commands_are_only_lowercased():
+    query = "CREATE INDEX patient_name FOR (p:Patient) ON (p.name) OPTIONS {indexProvider: 'RANGE-1.0'}"
+    assert parameterize_literals(query) == (query.replace("'RANGE-1.0'", "'range-1.0'"), {})
+
+
+def test_quantifier_tokens():
+    assert [t for t in tokenize_cypher("((a)-->(b)){1,3}") if t[0] == "number"] == [("number", "1"), ("number", "3")]
+
+
+@pytest.mark.parametrize("pattern", ["((a)-->(b)){1,3}", "((a)-->(b)) {2,}", "(a)-[:R]->{,4}(b)", "(a)-[:R]-{3}(b)"])
+def test_parameterize_keeps_quantifiers_inline(pattern):
+    query, params = parameterize_literals(f"MATCH {pattern} WHERE a.n = 5 RETURN b")
+    assert query == f"MATCH {pattern} WHERE a.n = $lit0 RETURN b"
+    assert params == {"lit0": 5}
+
+
+def test_parameterize_lifts_numbers_in_maps_and_subqueries():
+    query, params = parameterize_literals("MATCH (p {age: 40}) CALL (p) { RETURN 1 AS one } RETURN {n: 2}")
+    assert query == "MATCH (p {age: $lit0}) CALL (p) { RETURN $lit1 AS one } RETURN {n: $lit2}"
+    assert params == {"lit0": 40, "lit1": 1, "lit2": 2}
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from neo4j import Record
+
+from my_doctor_assistant.mcp.tools.cancellation import CancelToken, QueryCancelledError
+from my_doctor_assistant.mcp.tools.payload import (
+    ResultWriter,
+    error_code,
+    render_batch,
+    render_error,
+)
+
+
+def records(n, name="siri"):
+    return [Record({"name": name, "sys": 120 + i, "note": None}) for i in range(n)]
+
+
+def test_rows_within_budget():
+    payload = json.loads(ResultWriter(["name", "sys", "note"], 10, 10_000).consume(records(3)).payload())
+    assert payload["columns"] == [
+        {"name": "name", "type": "string"},
+        {"name": "sys", "type": "integer"},
+        {"name": "note", "type": "null"},
+    ]
+    assert payload["rows"] == [["siri", 120, None], ["siri", 121, None], ["siri", 122, None]]
+    assert payload["row_count"] == 3
+    assert payload["truncated"] is False
+    assert "truncation" not in payload
+
+
+def test_row_cap():
+    writer = ResultWriter(["name", "sys", "note"], 2, 10_000).consume(records(5))
+    payload = json.loads(writer.payload())
+    assert payload["row_count"] == 2
+    assert payload["truncated"] is True
+    assert payload["truncation"]["reason"] == "row_limit"
+    assert payload["truncation"]["limit"] == 2
+
+
+def test_exactly_max_rows_is_not_truncated():
+    payload = json.loads(ResultWriter(["name", "sys", "note"], 3, 10_000).consume(records(3)).payload())
+    assert payload["row_count"] == 3
+    assert payload["truncated"] is False
+
+
+def test_byte_cap():
+    row_bytes = len('["siri",120,null]')
+    writer = ResultWriter(["name", "sys", "note"], 100, 2 * (row_bytes + 1) + 5).consume(records(5))
+    payload = json.loads(writer.payload())
+    assert payload["row_count"] == 2
+    assert payload["truncation"]["reason"] == "byte_limit"
+    assert writer.bytes <= writer.max_bytes
+
+
+def test_byte_cap_counts_utf8_bytes():
+    row_bytes = len('["é",120,null]'.encode("utf-8"))
+    writer = ResultWriter(["name", "sys", "note"], 100, row_bytes).consume(records(2, "é"))
+    assert len(writer.rows) == 1
+    assert writer.truncation == "byte_limit"
+
+
+def test_cancel_is_checked_between_records():
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(QueryCancelledError):
+        ResultWriter(["name"], 10, 10_000).consume(records(1), token)
+
+
+def test_extra_fields_and_batches():
+    one = ResultWriter(["name", "sys", "note"], 10, 10_000).consume(records(1)).payload(cursor="c1")
+    batch = json.loads(render_batch([one, render_error("boom", code="cypher_error")], consistent=False))
+    assert batch["count"] == 2
+    assert batch["results"][0]["cursor"] == "c1"
+    assert batch["results"][1]["error"] == {"code": "cypher_error", "message": "boom"}
+
+
+def test_error_code():
+    assert error_code(render_error("slow", code="query_timeout")) == "query_timeout"
+    assert error_code('{"columns":[],"rows":[],"row_count":0,"truncated":false}') is None
+    assert error_code('{"error": nonsense') == "error"
+    assert error_code(None) is None
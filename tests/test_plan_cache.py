@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from my_doctor_assistant.agents.plan_cache import QueryPlanCache, template
+from my_doctor_assistant.agents.semantic_cache import default_vocabulary, record_tool_call, recording
+
+QUESTION = "latest BP for Siri"
+VITALS = "MATCH (p:Patient {patient_id: $pid}) RETURN p.bp AS bp"
+
+
+def rows(columns, *data):
+    return json.dumps({"columns": [{"name": c} for c in columns], "rows": [list(r) for r in data]})
+
+
+def people(*candidates):
+    return rows(["kind", "id", "name", "score"], *(("patient", pid, name, 1.0) for pid, name in candidates))
+
+
+@pytest.fixture
+def cache():
+    plans = QueryPlanCache(ttl=3600, max_entries=8)
+    with recording() as calls:
+        record_tool_call("resolve_person", {"name": "siri"}, people((7, "siri")))
+        record_tool_call("GraphDB", {"query": VITALS, "params": {"pid": 7}}, rows(["bp"], ("120/80",)))
+    assert plans.store(QUESTION, calls)
+    return plans
+
+
+class Tools:
+    def __init__(self, **results):
+        self.results = results
+        self.calls = []
+
+    def __call__(self, tool, args):
+        self.calls.append((tool, args))
+        return self.results[tool]
+
+
+def test_template():
+    assert template("What's the latest BP for Siri?", default_vocabulary()) == ("latest blood pressure <e0>", ["siri"])
+
+
+def test_replay_binds_the_new_entity_and_the_resolved_id(cache):
+    tools = Tools(resolve_person=people((9, "john")), GraphDB=rows(["bp"], ("135/85",)))
+    answer = cache.execute("latest BP for John", tools, phrase=lambda prompt: prompt)
+    assert tools.calls == [
+        ("resolve_person", {"name": "john"}),
+        ("GraphDB", {"query": VITALS, "params": {"pid": 9}}),
+    ]
+    assert "135/85" in answer
+    assert cache.stats()["hits"] == 1
+
+
+def test_several_candidates_fall_back_to_the_agent(cache):
+    tools = Tools(resolve_person=people((9, "john smith"), (10, "john smyth")), GraphDB=rows(["bp"]))
+    assert cache.execute("latest BP for John", tools, phrase=lambda prompt: prompt) is None
+    assert [tool for tool, _ in tools.calls] == ["resolve_person"]
+    stats = cache.stats()
+    assert (stats["fallbacks"], stats["entries"]) == (1, 1)  # the plan stays for unambiguous names
+
+
+def test_unknown_name_falls_back(cache):
+    tools = Tools(resolve_person=people(), GraphDB=rows(["bp"]))
+    assert cache.execute("latest BP for Zed", tools, phrase=lambda prompt: prompt) is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_failing_call_drops_the_plan(cache):
+    tools = Tools(resolve_person=people((9, "john")), GraphDB='{"error":{"code":"cypher_error"}}')
+    assert cache.execute("latest BP for John", tools, phrase=lambda prompt: prompt) is None
+    assert cache.stats()["entries"] == 0
+
+
+async def _acall(tool, args):
+    return {"resolve_person": people((9, "john"), (3, "johanna")), "GraphDB": rows(["bp"])}[tool]
+
+
+async def _aphrase(prompt):
+    return prompt
+
+
+def test_async_replay_with_several_candidates_falls_back(cache):
+    assert asyncio.run(cache.aexecute("latest BP for John", _acall, _aphrase)) is None
+
+
+def test_plans_without_the_entity_or_with_writes_are_not_stored():
+    plans = QueryPlanCache(ttl=3600, max_entries=8)
+    with recording() as calls:
+        record_tool_call("GraphDB", {"query": "MATCH (p {patient_id: 7}) RETURN p"}, rows(["p"], ({},)))
+    assert not plans.store(QUESTION, calls)
+    with recording() as calls:
+        record_tool_call("GraphDB", {"query": "CREATE (:Note {about: 'siri'})"}, rows([]), replayable=False)
+    assert not plans.store("add a note about siri", calls)
+    assert plans.stats()["skipped"] == 2
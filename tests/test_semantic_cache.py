@@ -0,0 +1,74 @@
+import pytest
+
+from my_doctor_assistant.agents.semantic_cache import (
+    SemanticAnswerCache,
+    possessives,
+    record_tool_call,
+    recording,
+    words,
+)
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(threshold=0.85, ttl=3600, max_entries=16)
+
+
+def test_words_strip_possessives_and_expand_negations():
+    assert words("What's Siri’s BP?") == ["what", "siri", "bp"]
+    assert words("meds siri isn't on") == ["meds", "siri", "is", "not", "on"]
+
+
+def test_possessives():
+    assert possessives("what's siri's latest diastolic BP") == ["siri's blood"]
+    assert possessives("latest heart rate for siri's doctor") == ["siri's doctor"]
+    assert possessives("what's the latest bp, it's urgent") == []
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("latest BP for siri", "what is the latest blood pressure for siri"),
+    ("what's siri's latest bp", "siri's latest blood pressure?"),
+])
+def test_paraphrase_hits(cache, stored, asked):
+    cache.store(stored, "120/80")
+    assert cache.lookup(asked) == "120/80"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("latest BP for siri", "latest BP for john"),
+    ("latest heart rate for siri", "latest heart rate for siri's doctor"),
+    ("latest BP for siri", "what's siri's latest diastolic bp"),
+    ("latest systolic bp for siri", "latest diastolic bp for siri"),
+    ("what medications is siri on", "what medications is siri not on"),
+    ("what medications is siri on", "what medications isn't siri on"),
+    ("list siri's medications", "list siri's medications except insulin"),
+])
+def test_near_misses_do_not_hit(cache, stored, asked):
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) is None
+
+
+def test_scope_separates_entries(cache):
+    cache.store("latest BP for siri", "120/80", scope="clinic-a")
+    assert cache.lookup("latest BP for siri", scope="clinic-b") is None
+    assert cache.lookup("latest BP for siri", scope="clinic-a") == "120/80"
+
+
+def test_changed_dependency_turns_a_hit_into_a_miss(cache):
+    with recording() as deps:
+        record_tool_call("GraphDB", {"query": "MATCH ..."}, '{"rows":[[120]]}')
+    cache.store("latest BP for siri", "120", deps)
+    assert cache.lookup("latest BP for siri", replay=lambda tool, args: '{"rows":[[120]]}') == "120"
+    assert cache.lookup("latest BP for siri", replay=lambda tool, args: '{"rows":[[140]]}') is None
+    assert cache.lookup("latest BP for siri") is None  # the stale entry was dropped
+    assert cache.stats()["stale"] == 1
+
+
+def test_writes_and_failed_calls_are_not_stored(cache):
+    with recording() as deps:
+        record_tool_call("GraphDB", {"query": "CREATE ..."}, "{}", replayable=False)
+    assert not cache.store("add a note for siri", "done", deps)
+    with recording() as deps:
+        record_tool_call("GraphDB", {"query": "MATCH ..."}, '{"error":{"code":"cypher_error"}}')
+    assert not cache.store("latest BP for siri", "unknown", deps)
+    assert cache.stats()["skipped"] == 2
@@ -0,0 +1,124 @@
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_client_server_memory_streams
+
+from my_doctor_assistant.mcp import session as session_module
+from my_doctor_assistant.mcp.session import MCPSessionManager, first_text
+
+server = FastMCP("test")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    return text
+
+
+@asynccontextmanager
+async def in_memory():
+    async with create_client_server_memory_streams() as (client_streams, (read, write)):
+        async with anyio.create_task_group() as tg:
+            lowlevel = server._mcp_server
+            tg.start_soon(lowlevel.run, read, write, lowlevel.create_initialization_options())
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
+
+
+@asynccontextmanager
+async def unreachable():
+    raise ConnectionRefusedError("no server")
+    yield  # pragma: no cover
+
+
+def manager(connect=unreachable):
+    return MCPSessionManager(connect, name="test", connect_timeout=2, reconnect_delay=0.01)
+
+
+def running(session):
+    return session._thread is not None
+
+
+def test_last_release_closes_the_session():
+    session = manager()
+    session.acquire()
+    session.acquire()
+    session.release()
+    assert running(session)
+    session.release()
+    assert not running(session)
+
+
+def test_extra_release_is_harmless():
+    session = manager()
+    session.release()
+    session.acquire()
+    session.release()
+    session.release()
+    assert not running(session)
+
+
+def test_calls_work_after_the_session_is_reacquired():
+    session = manager(in_memory)
+    try:
+        for text in ("first", "second"):
+            session.acquire()
+            assert first_text(session.call_tool("echo", {"text": text})) == text
+            session.release()
+            assert not running(session)
+        session.start()  # plain start() after a release, as get_session() does
+        assert first_text(session.call_tool("echo", {"text": "third"})) == "third"
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    """Make the first tool call fail with the given transport error."""
+    calls = []
+    call_tool = session_module._call_tool
+
+    def install(error):
+        async def first_call_fails(*args):
+            calls.append(args[1])
+            if len(calls) == 1:
+                raise error
+            return await call_tool(*args)
+        monkeypatch.setattr(session_module, "_call_tool", first_call_fails)
+        return calls
+    return install
+
+
+def test_call_lost_after_sending_is_not_retried(flaky):
+    calls = flaky(anyio.EndOfStream())
+    session = manager(in_memory)
+    try:
+        with pytest.raises(anyio.EndOfStream):
+            session.call_tool("echo", {"text": "write"})
+        assert calls == ["echo"]
+        assert first_text(session.call_tool("echo", {"text": "next"})) == "next"
+    finally:
+        session.close()
+
+
+def test_idempotent_call_is_retried(flaky):
+    calls = flaky(anyio.EndOfStream())
+    session = manager(in_memory)
+    try:
+        assert first_text(session.call_tool("echo", {"text": "read"}, idempotent=True)) == "read"
+        assert calls == ["echo", "echo"]
+    finally:
+        session.close()
+
+
+def test_unsent_call_is_retried(flaky):
+    calls = flaky(anyio.ClosedResourceError())
+    session = manager(in_memory)
+    try:
+        assert first_text(session.call_tool("echo", {"text": "write"})) == "write"
+        assert calls == ["echo", "echo"]
+    finally:
+        session.close()